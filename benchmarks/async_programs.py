@@ -0,0 +1,48 @@
+"""Runs several long programs concurrently on one event loop and measures how
+long they take and how responsive the event loop stays. Interleaving, timeouts
+and cancellation are tested in tests/test_async.py."""
+import asyncio
+import contextlib
+import io
+import time
+
+from common import compile_program, inter
+
+PROGRAMS = 8
+CHECKPOINT_INTERVAL = 1000
+
+PROGRAM = """
+x = 0;
+for j = 0:5 {{
+    for i = 0:20000 x = i;
+    print {number}, j;
+}}
+"""
+
+
+async def heartbeat(delays):
+    """Measures how late the event loop wakes up a task sleeping 1 ms."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        delays.append(time.perf_counter() - start - 0.001)
+
+
+async def main():
+    delays = []
+    beat = asyncio.create_task(heartbeat(delays))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(inter.run_async(compile_program(PROGRAM.format(number=number)),
+                                           checkpoint_interval=CHECKPOINT_INTERVAL)
+                           for number in range(PROGRAMS)))
+    elapsed = time.perf_counter() - start
+    beat.cancel()
+    return elapsed, max(delays)
+
+
+if __name__ == '__main__':
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed, max_delay = asyncio.run(main())
+    print(f'{PROGRAMS} programs interleaved in {elapsed * 1000:.1f} ms, '
+          f'longest event loop delay {max_delay * 1000:.1f} ms')
@@ -0,0 +1,120 @@
+"""Measures checking indices of array elements in for loops once before the
+loops start and checks that programs print the same, end with the same
+variables and fail with the same errors with and without it: the test
+programs, loops whose indices leave the arrays and generated ones. Loops are
+not compiled (tiered), so that elements are accessed by the tree walker. Edge
+cases are also tested in tests/test_bounds.py.
+
+Usage: python bounds.py [generated programs]"""
+import glob
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import compile_program, inter
+from generator import ProgramGenerator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROGRAM = """
+n = 150;
+A = zeros(n, n);
+for i = 0:n
+    for j = 0:n
+        A[i, j] = i * j + 1;
+s = 0;
+for i = 1:n
+    for j = 0:n
+        s += A[i, j] - A[i - 1, j];
+print s;
+"""
+
+EDGE_CASES = [
+    # Indices leaving the array in the last iterations, with and without offsets
+    'A = ones(3, 3);\ns = 0;\nfor i = 0:4 {\n    s += A[i, 0];\n    print s;\n}\n',
+    'A = ones(3, 3);\nfor i = 0:3 {\n    A[i + 1, i] = 5;\n    print A;\n}\n',
+    # Negative indices count from the end
+    'A = [[1, 2, 3], [4, 5, 6]];\nfor i = 0:6 print A[1, i - 3];\n',
+    # Indices and arrays bound to new values in the loop are checked on every access
+    'A = ones(3, 3);\nk = 0;\nfor i = 0:5 {\n    print A[k, 0];\n    k += 1;\n}\n',
+    'A = ones(2, 2);\nfor i = 0:3 {\n    print A[1, 1];\n    A = ones(1, 1);\n}\n',
+    # Indices stepped by inner loops
+    'A = zeros(3, 3);\nfor i = 0:3 {\n    j = 0;\n    while (j <= i) {\n        A[i, j] = j + 1;\n        j += 1;\n    }\n}\n'
+    'print A;\n',
+    # Strings, read-only matrices and elements read in conditions and ranges
+    's = "abcd";\nfor i = 0:3 {\n    s[i] = "X";\n    print s[0, i];\n}\n',
+    'A = ones(3, 3);\nB = A\';\nfor i = 0:3 {\n    if (A[i, i] > 0) print A[i, i];\n    for j = 0:A[i, i] B[j, i] += 1;\n}\n'
+    'print A, B;\n',
+    # Elements in parfor loops and indices which are elements of integer matrices
+    'M = zeros(4, 2);\nparfor i = 0:4 {\n    for j = 0:2 M[i, j] = i + j;\n}\nprint M;\n',
+    'A = ones(2, 2);\nk = A[0, 1];\nfor i = 0:2 print A[i, k], A[k + 1, i];\n',
+]
+
+
+def run(program, eliminate_range_checks):
+    """Returns output of <program>, its global variables and errors."""
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1, tier_threshold=None,
+                                    eliminate_range_checks=eliminate_range_checks)
+    error = None
+    try:
+        interpreter.visit(program)
+    except inter.ProgramError as program_error:
+        error = program_error
+    except inter.exceptions.ReturnValueException:
+        pass
+    except Exception as other_error:
+        error = f'{type(other_error).__name__}: {other_error}'
+    variables = {name: repr(value) for name, value in interpreter.memory_stack.stack[0].variables.items()}
+    return interpreter.output.target.getvalue(), variables, repr(error)
+
+
+def compare(text):
+    """Returns whether program <text> runs the same with and without checking
+    indices before loops, None if it is not valid."""
+    try:
+        program, errors = inter.compile_program(text, output=open(os.devnull, 'w'))
+    except Exception:
+        # Type checker fails on some of the old test programs
+        return None
+    if errors:
+        return None
+    return run(program, True) == run(program, False)
+
+
+def count_bounded(program):
+    return sum(len(node.bounded) for node in inter.invariants.statements(program.instructions_opt)
+               if hasattr(node, 'bounded'))
+
+
+if __name__ == '__main__':
+    generated = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    np.seterr(all='ignore')
+    programs = {}
+    for filename in sorted(glob.glob(os.path.join(ROOT, 'tests*', '*.m'))):
+        with open(filename) as file:
+            programs[os.path.relpath(filename, ROOT)] = file.read()
+    for i, text in enumerate(EDGE_CASES):
+        programs[f'edge case {i}'] = text
+    for seed in range(generated):
+        programs[f'generated {seed}'] = ProgramGenerator(seed).generate(2000)
+
+    results = {name: compare(text) for name, text in programs.items()}
+    differing = [name for name, result in results.items() if result is False]
+    print(f'{len(programs)} programs ({sum(result is not None for result in results.values())} valid) compared, '
+          f'{len(differing)} differ {differing if differing else ""}')
+
+    program = compile_program(PROGRAM)
+    print(f'{count_bounded(program)} elements checked before their loops in the benchmark program')
+    for eliminate_range_checks in [False, True]:
+        elapsed = []
+        for _ in range(3):
+            interpreter = inter.Interpreter(output=io.StringIO(), tier_threshold=None,
+                                            eliminate_range_checks=eliminate_range_checks)
+            start = time.perf_counter()
+            interpreter.visit(program)
+            elapsed.append(time.perf_counter() - start)
+        print(f'{"checked once" if eliminate_range_checks else "checked always":<16} {min(elapsed) * 1000:10.1f} ms  '
+              f'{interpreter.output.target.getvalue().strip()}')
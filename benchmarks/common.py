@@ -0,0 +1,42 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import interpreter as inter  # noqa: E402
+
+
+def compile_program(text, variables=None):
+    """Parses and type checks program <text> using variables <variables> bound
+    before it starts, returns its AST."""
+    ast, errors = inter.compile_program(text, variables)
+    if errors:
+        raise ValueError(f'benchmark program is not valid: {errors}')
+    return ast
+
+
+def measure(function, *args):
+    """Calls <function> and returns its result, wall time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(text, **options):
+    """Executes program <text> and returns its wall time and peak memory.
+
+    Keyword arguments <options> are passed to the interpreter."""
+    ast = compile_program(text)
+    _, elapsed, peak = measure(inter.Interpreter(**options).visit, ast)
+    return elapsed, peak
+
+
+def report(name, elapsed, peak):
+    print(f'{name:<40} {elapsed * 1000:10.1f} ms {peak / 2 ** 20:10.1f} MiB')
@@ -0,0 +1,51 @@
+"""Parses, type checks, prints and runs long chains of operations, which give
+expressions as deep as the number of terms, with the default recursion limit.
+
+Usage: python deep_expressions.py [terms ...]"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+from common import inter
+
+PROGRAMS = {
+    'sum': lambda terms: 'a = 1;\nx = ' + ' + '.join(['a'] * terms) + ';\nprint x;\n',
+    'element_wise': lambda terms: 'A = ones(3, 3);\nX = ' + ' .+ '.join(['A'] * terms) + ';\nprint X[0, 0];\n',
+    'nested': lambda terms: 'a = 2;\nx = ' + '(a - ' * terms + 'a' + ')' * terms + ';\nprint x;\n',
+    'parfor': lambda terms: ('a = 1;\ns = 0;\nparfor i = 0:4 reduce s {\n    s += '
+                             + ' + '.join(['a'] * terms) + ';\n}\nprint s;\n'),
+}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(text):
+    scanner = inter.Scanner()
+    parser = inter.Parser(lexer=scanner)
+    ast, parse_time = timed(parser.parse, text)
+    errors, check_time = timed(lambda: inter.TypeChecker(output=io.StringIO()).visit(ast) or None)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _, print_time = timed(ast.printTree)
+    output = io.StringIO()
+    _, run_time = timed(inter.Interpreter(output=output, processes=2).visit, ast)
+    return output.getvalue().strip(), (parse_time, check_time, print_time, run_time)
+
+
+if __name__ == '__main__':
+    import interpreter.tree_printer  # noqa: F401
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    print(f'{"program":<14} {"terms":>8} {"parse ms":>10} {"check ms":>10} {"print ms":>10} {"run ms":>10}'
+          f' {"run us/term":>12}  output')
+    for name, program in PROGRAMS.items():
+        for terms in sizes:
+            output, (parse_time, check_time, print_time, run_time) = run(program(terms))
+            print(f'{name:<14} {terms:>8} {parse_time * 1000:>10.1f} {check_time * 1000:>10.1f} '
+                  f'{print_time * 1000:>10.1f} {run_time * 1000:>10.1f} {run_time / terms * 1e6:>12.2f}  '
+                  f'{output.splitlines()[-1][:20]}', flush=True)
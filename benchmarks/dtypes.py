@@ -0,0 +1,15 @@
+"""Compares memory footprint of matrix programs run with different element types."""
+from common import report, run
+
+N = 3000
+
+PROGRAM = f"""
+A = zeros({N}, {N});
+B = ones({N}, {N});
+A[0, 0] = 0.5;
+C = A .+ B;
+"""
+
+if __name__ == '__main__':
+    for dtype in ['int64', 'float64', 'float32']:
+        report(f'dtype={dtype}', *run(PROGRAM, dtype=dtype))
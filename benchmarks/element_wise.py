@@ -0,0 +1,22 @@
+"""Measures element-wise expressions on multi-million element matrices."""
+from common import report, run
+
+N = 2000
+ITERATIONS = 10
+
+SETUP = f"""
+A = ones({N}, {N});
+B = ones({N}, {N});
+C = ones({N}, {N});
+D = ones({N}, {N});
+"""
+
+PROGRAMS = {
+    'A .+ B .* C .- D': SETUP + f'for i = 0:{ITERATIONS} E = A .+ B .* C .- D;',
+    '(A .* B) .+ (C .* D)': SETUP + f'for i = 0:{ITERATIONS} E = (A .* B) .+ (C .* D);',
+    '-(A .+ B) ./ C': SETUP + f'for i = 0:{ITERATIONS} E = -(A .+ B) ./ C;',
+}
+
+if __name__ == '__main__':
+    for name, program in PROGRAMS.items():
+        report(name, *run(program))
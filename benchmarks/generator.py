@@ -0,0 +1,149 @@
+"""Generator of large random programs, which are valid, type check and run
+without runtime errors, for scaling tests of the interpreter phases.
+
+Usage: python generator.py statements [--seed N] [--depth N] [--variables N]
+                           [--matrix-fraction F] > program.m"""
+import argparse
+import random
+
+
+class ProgramGenerator:
+    """Generates programs deterministically for a given <seed>.
+
+    Programs use <variables> scalar variables (half int, half float) and, when
+    <matrix_fraction> is positive, as many matrices of shape
+    <matrix_size>x<matrix_size>; that fraction of simple statements are matrix
+    ones. Loops, while loops and conditional instructions are nested up to
+    <max_depth> levels, loops run <loop_iterations> times. All variables are
+    assigned at the beginning, so statements in nested scopes only update them,
+    and int variables are only changed by constants, so they never become big
+    Python integers (matrix elements can overflow, as numpy integers do)."""
+
+    def __init__(self, seed=0, variables=20, max_depth=3, matrix_fraction=0.2, matrix_size=4,
+                 loop_iterations=2, compound_fraction=0.05):
+        self.random = random.Random(seed)
+        self.ints = [f'n{i}' for i in range(max(1, variables // 2))]
+        self.floats = [f'f{i}' for i in range(max(1, variables - variables // 2))]
+        self.matrices = [f'M{i}' for i in range(max(1, variables // 2))] if matrix_fraction > 0 else []
+        self.max_depth = max_depth
+        self.matrix_fraction = matrix_fraction
+        self.matrix_size = matrix_size
+        self.loop_iterations = loop_iterations
+        self.compound_fraction = compound_fraction
+        self.lines = []
+        self.loop_count = 0
+
+    def generate(self, statements):
+        """Returns text of program having about <statements> statements."""
+        self.lines = []
+        self.loop_count = 0
+        for name in self.ints:
+            self.lines.append(f'{name} = {self.random.randint(-9, 9)};')
+        for name in self.floats:
+            self.lines.append(f'{name} = {self.random.uniform(-9, 9):.3f};')
+        for name in self.matrices:
+            function = self.random.choice(['ones', 'zeros', 'eye'])
+            if function == 'eye':
+                self.lines.append(f'{name} = eye({self.matrix_size});')
+            else:
+                self.lines.append(f'{name} = {function}({self.matrix_size}, {self.matrix_size});')
+        # Counters of while loops, one for every nesting level
+        for depth in range(self.max_depth):
+            self.lines.append(f'w{depth} = 0;')
+        remaining = statements - len(self.lines)
+        while remaining > 0:
+            remaining -= self.statement(0, [], remaining)
+        return '\n'.join(self.lines) + '\n'
+
+    def emit(self, depth, line):
+        self.lines.append('    ' * depth + line)
+
+    def statement(self, depth, loop_variables, budget):
+        """Emits statement of at most <budget> statements (counting nested ones),
+        returns their number."""
+        if depth < self.max_depth and budget > 3 and self.random.random() < self.compound_fraction:
+            return self.compound(depth, loop_variables, budget)
+        if self.matrices and self.random.random() < self.matrix_fraction:
+            self.emit(depth, self.matrix_statement())
+        else:
+            self.emit(depth, self.scalar_statement(loop_variables))
+        return 1
+
+    def block(self, depth, loop_variables, budget):
+        size = self.random.randint(1, min(budget, 8))
+        count = 0
+        while count < size:
+            count += self.statement(depth, loop_variables, size - count)
+        return count
+
+    def compound(self, depth, loop_variables, budget):
+        kind = self.random.choice(['for', 'while', 'if'])
+        budget -= 1
+        if kind == 'for':
+            variable = f'i{self.loop_count}'
+            self.loop_count += 1
+            self.emit(depth, f'for {variable} = 0:{self.loop_iterations} {{')
+            count = self.block(depth + 1, loop_variables + [variable], budget)
+        elif kind == 'while':
+            counter = f'w{depth}'
+            self.emit(depth, f'{counter} = 0;')
+            self.emit(depth, f'while ({counter} < {self.loop_iterations}) {{')
+            count = self.block(depth + 1, loop_variables, budget - 2) + 2
+            self.emit(depth + 1, f'{counter} += 1;')
+        else:
+            self.emit(depth, f'if ({self.scalar(loop_variables)} < {self.scalar(loop_variables)}) {{')
+            count = self.block(depth + 1, loop_variables, budget)
+            if budget - count > 0 and self.random.random() < 0.5:
+                self.emit(depth, '} else {')
+                count += self.block(depth + 1, loop_variables, budget - count)
+        self.emit(depth, '}')
+        return count + 1
+
+    def scalar(self, loop_variables):
+        return self.random.choice(self.ints + self.floats + loop_variables)
+
+    def scalar_statement(self, loop_variables):
+        choice = self.random.random()
+        if choice < 0.4:
+            name = self.random.choice(self.ints)
+            source = self.random.choice(self.ints + loop_variables)
+            operator = self.random.choice(['+', '-'])
+            return f'{name} = {source} {operator} {self.random.randint(1, 9)};'
+        if choice < 0.5:
+            name = self.random.choice(self.ints)
+            return f'{name} {self.random.choice(["+=", "-="])} {self.random.randint(1, 9)};'
+        if choice < 0.6 and self.matrices:
+            # Type checker may not know type of elements of computed matrices,
+            # so they are not assigned to int variables, which are updated by +=
+            name = self.random.choice(self.floats)
+            row, col = self.random.randrange(self.matrix_size), self.random.randrange(self.matrix_size)
+            return f'{name} = {self.random.choice(self.matrices)}[{row}, {col}];'
+        name = self.random.choice(self.floats)
+        left, right = self.scalar(loop_variables), self.random.choice(self.floats)
+        operator = self.random.choice(['+', '-', '*'])
+        return f'{name} = {left} {operator} {right} / {self.random.uniform(1, 9):.2f};'
+
+    def matrix_statement(self):
+        name = self.random.choice(self.matrices)
+        left, right = self.random.choice(self.matrices), self.random.choice(self.matrices)
+        choice = self.random.random()
+        if choice < 0.5:
+            return f'{name} = {left} {self.random.choice([".+", ".-", ".*"])} {right};'
+        if choice < 0.7:
+            return f'{name} = {left} * {right};'
+        if choice < 0.8:
+            return f"{name} = {left}';"
+        row, col = self.random.randrange(self.matrix_size), self.random.randrange(self.matrix_size)
+        return f'{name}[{row}, {col}] = {self.random.randint(-9, 9)};'
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('statements', type=int)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--depth', type=int, default=3)
+    arg_parser.add_argument('--variables', type=int, default=20)
+    arg_parser.add_argument('--matrix-fraction', type=float, default=0.2)
+    args = arg_parser.parse_args()
+    print(ProgramGenerator(args.seed, args.variables, args.depth, args.matrix_fraction).generate(args.statements),
+          end='')
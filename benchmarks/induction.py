@@ -0,0 +1,102 @@
+"""Measures running counted while loops in closed form on tests5/primes.m (with
+a larger bound) and checks that programs print the same and execute the same
+number of steps with and without it: the test programs, loops which must run
+iteration by iteration (floats, never ending steps) and generated ones. Edge
+cases are also tested in tests/test_induction.py.
+
+Usage: python induction.py [bound] [generated programs]"""
+import glob
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import compile_program, inter
+from generator import ProgramGenerator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PRIMES = os.path.join(ROOT, 'tests5', 'primes.m')
+
+EDGE_CASES = [
+    # All relations, both steps and block bodies
+    'n = 17;\nwhile (n > 0) n -= 5;\nprint n;\nk = -3;\nwhile (k <= 20) {\n    k += 4;\n}\nprint k;\n'
+    'm = 40;\nwhile (m >= 7) m += -6;\nprint m;\nj = 0;\nwhile (j < 9) j -= -3;\nprint j;\n',
+    # Loops which never run do not evaluate the step
+    'z = 0;\nn = 0;\nwhile (n > 0) n -= 1 / z;\nprint n;\n',
+    # Bounds given by expressions, steps by variables
+    'd = 3;\nn = 10;\nwhile (n < d * d + 7) n += d;\nprint n;\n',
+    # Floats are stepped one by one, as their sums round differently
+    'x = 0.0;\nwhile (x < 1) x += 0.1;\nprint x;\n',
+    # Loops doing something else are not counted loops
+    'n = 5;\nwhile (n > 0) {\n    n -= 2;\n    print n;\n}\n',
+    'n = 5;\nm = 1;\nwhile (n > m) n -= 1;\nprint n, m;\n',
+]
+
+
+def run(program, counted_loops):
+    """Returns output of <program> and number of steps it executed."""
+    interpreter = inter.Interpreter(output=io.StringIO(), counted_loops=counted_loops)
+    steps = [0]
+    step = interpreter.step
+
+    def counted_step(count=1):
+        steps[0] += count
+        step(count)
+
+    # Checkpoints are made once for all steps of a loop run in closed form, so
+    # the steps are counted by wrapping step (compiled loops count them only
+    # when there is a checkpoint)
+    interpreter.step = counted_step
+    interpreter.checkpoint = lambda: None
+    try:
+        interpreter.visit(program)
+    except inter.ProgramError as error:
+        return f'{interpreter.output.target.getvalue()}{error}', steps[0]
+    return interpreter.output.target.getvalue(), steps[0]
+
+
+def compare(text):
+    """Returns whether program <text> prints the same and executes the same number
+    of steps with and without counted loops, None if it is not valid."""
+    try:
+        program, errors = inter.compile_program(text, output=open(os.devnull, 'w'))
+    except Exception:
+        # Type checker fails on some of the old test programs
+        return None
+    if errors:
+        return None
+    return run(program, True) == run(program, False)
+
+
+def timed(program, counted_loops):
+    interpreter = inter.Interpreter(output=io.StringIO(), counted_loops=counted_loops)
+    start = time.perf_counter()
+    interpreter.visit(program)
+    return time.perf_counter() - start, interpreter.output.target.getvalue()
+
+
+if __name__ == '__main__':
+    bound = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    generated = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    np.seterr(all='ignore')
+    programs = {}
+    for filename in sorted(glob.glob(os.path.join(ROOT, 'tests*', '*.m'))):
+        with open(filename) as file:
+            programs[os.path.relpath(filename, ROOT)] = file.read()
+    for i, text in enumerate(EDGE_CASES):
+        programs[f'edge case {i}'] = text
+    for seed in range(generated):
+        programs[f'generated {seed}'] = ProgramGenerator(seed).generate(2000)
+
+    differing = [name for name, text in programs.items() if compare(text) is False]
+    print(f'{len(programs)} programs compared, {len(differing)} differ {differing if differing else ""}')
+
+    with open(PRIMES) as file:
+        program = compile_program(file.read().replace('2:100', f'2:{bound}'))
+    results = {}
+    for counted_loops in [False, True]:
+        elapsed, results[counted_loops] = min(timed(program, counted_loops) for _ in range(3))
+        print(f'{"closed form" if counted_loops else "iterated":<12} {elapsed * 1000:10.1f} ms')
+    print('outputs identical' if results[True] == results[False] else 'OUTPUTS DIFFER')
@@ -0,0 +1,20 @@
+"""Compares operation assignment on large matrices with its allocating equivalent."""
+from common import report, run
+
+N = 2000
+ITERATIONS = 50
+
+SETUP = f"""
+A = zeros({N}, {N});
+B = ones({N}, {N});
+"""
+
+PROGRAMS = {
+    'A += B': SETUP + f'for i = 0:{ITERATIONS} A += B;',
+    'A = A .+ B': SETUP + f'for i = 0:{ITERATIONS} A = A .+ B;',
+    'A[1:N-1, 1:N-1] *= 3': SETUP + f'for i = 0:{ITERATIONS} A[1:{N - 1}, 1:{N - 1}] *= 3;',
+}
+
+if __name__ == '__main__':
+    for name, program in PROGRAMS.items():
+        report(name, *run(program))
@@ -0,0 +1,96 @@
+"""Measures hoisting of loop invariant operations and checks that programs print
+the same with and without it: the test programs, programs in which hoisting
+must not happen (variables sharing data, values bound to variables) and
+generated ones. The test programs and these edge cases are also tested in
+tests/test_invariants.py.
+
+Usage: python invariants.py [generated programs]"""
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import inter
+from generator import ProgramGenerator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROGRAM = """
+A = ones(150, 150);
+B = eye(150);
+D = zeros(150, 150);
+n = 20;
+s = 0;
+for i = 0:n {
+    D = (A' * B) .+ D;
+    for j = 0:300 {
+        s += n * 2 - 1 + j;
+    }
+}
+print s, D[0, 0];
+"""
+
+EDGE_CASES = [
+    # B shares data of A, so A' changes with B
+    'A = ones(3, 3);\nB = A;\nE = eye(3);\nfor i = 0:3 {\n    C = A\' .+ E;\n    B[0, 1] = i;\n    print C;\n}\n',
+    # Transposes bound to variables are views of cached values
+    'A = ones(2, 2);\nfor i = 0:3 {\n    C = (A .+ A)\';\n    C[0, 1] = i;\n    print C;\n}\n',
+    # Values bound to variables are new arrays
+    'A = ones(2, 2);\nfor i = 0:3 {\n    C = A .* A;\n    C += A;\n    print C;\n}\n',
+    # Loops which never run do not evaluate invariants
+    'z = 0;\nfor i = 1:0 {\n    print 1 / z;\n}\nprint 1;\n',
+    # Invariants of inner loops are evaluated again in each run of them
+    'x = 1;\nfor i = 0:3 {\n    x = i;\n    for j = 0:2 print x * 10 + j;\n}\n',
+    # While loops re-evaluate their conditions
+    'n = 3;\nk = 0;\nwhile (k < n * 2) {\n    k += 1;\n    print k + n * n;\n}\n',
+]
+
+
+def output(program, hoist_invariants):
+    result = inter.run_program(program, hoist_invariants=hoist_invariants)
+    return result.output
+
+
+def compare(text):
+    """Returns whether program <text> prints the same with and without hoisting,
+    None if it is not valid."""
+    try:
+        program, errors = inter.compile_program(text, output=open(os.devnull, 'w'))
+    except Exception:
+        # Type checker fails on some of the old test programs
+        return None
+    if errors:
+        return None
+    hoisted = output(program, True)
+    return hoisted == output(program, False)
+
+
+def count_invariants(program):
+    return sum(len(node.invariants) for node in inter.invariants.statements(program.instructions_opt)
+               if hasattr(node, 'invariants'))
+
+
+if __name__ == '__main__':
+    generated = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    np.seterr(all='ignore')
+    programs = {}
+    for filename in sorted(glob.glob(os.path.join(ROOT, 'tests*', '*.m'))):
+        with open(filename) as file:
+            programs[os.path.relpath(filename, ROOT)] = file.read()
+    for i, text in enumerate(EDGE_CASES):
+        programs[f'edge case {i}'] = text
+    for seed in range(generated):
+        programs[f'generated {seed}'] = ProgramGenerator(seed).generate(2000)
+
+    differing = [name for name, text in programs.items() if compare(text) is False]
+    print(f'{len(programs)} programs compared, {len(differing)} differ {differing if differing else ""}')
+
+    program = inter.compile_program(PROGRAM)[0]
+    print(f'{count_invariants(program)} invariants hoisted in the benchmark program')
+    for hoist_invariants in [False, True]:
+        start = time.perf_counter()
+        result = output(program, hoist_invariants)
+        elapsed = time.perf_counter() - start
+        print(f'{"hoisted" if hoist_invariants else "not hoisted":<12} {elapsed * 1000:10.1f} ms  {result.strip()}')
@@ -0,0 +1,116 @@
+"""Lowers programs to the SSA form, runs the optimization passes over them and
+checks that the compiled functions print the same as the interpreter: the test
+programs, programs covering the lowering of each instruction and generated
+ones. Reports the time of each pass and of running tests5/primes.m both ways.
+tests/test_ir.py runs the edge cases and the valid example programs with pytest.
+
+Usage: python ir.py [generated programs] [statements]"""
+import glob
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import compile_program, inter
+from generator import ProgramGenerator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PRIMES = os.path.join(ROOT, 'tests5', 'primes.m')
+
+EDGE_CASES = [
+    # Loops with break and continue, loop variables after loops
+    'k = 0;\nfor i = 0:10 {\n    if (i == 2) continue;\n    if (i == 7) break;\n    k += i;\n}\nprint k;\n'
+    'i = 5;\nfor i = 0:3 print i;\nprint i;\nj = 3;\nwhile (j > 0) {\n    j -= 1;\n    if (j == 1) continue;\n'
+    '    print j;\n}\n',
+    # Both branches leave the loop, constant conditions
+    'n = 0;\nwhile (n < 10) {\n    n += 1;\n    if (n > 3) break; else continue;\n    print n;\n}\nprint n;\n'
+    'if (1 < 2) print 1; else print 2;\nx = 2 * 3 + 4;\nprint x, x * 2 + 1, -x;\n',
+    # Matrices sharing data, element assignments, operation assignments of elements
+    'A = ones(3, 3);\nB = A;\nB[0, 1] = 5;\nA[1, 1] += 2;\nprint A;\nC = A\';\nC[2, 0] = 7;\nprint A;\n'
+    'D = [1, 2, 3];\nD[0, 1:3] = [7, 8];\nprint D, D[0, 2];\n',
+    # Strings and their elements
+    's = "abcdef";\nprint s[0, 1:3];\ns[1] = "X";\nprint s;\n',
+    # Chains of products, element-wise operations and unary minus of matrices
+    'A = ones(2, 3);\nB = ones(3, 4);\nC = ones(4, 2);\nprint A * B * C, -(A .+ A) .* A;\n',
+    # Reductions and sliced matrices of parfor loops
+    's = 0;\nM = zeros(4, 2);\nparfor i = 0:4 reduce s {\n    s += i * i;\n    M[i, 0] = i;\n}\nprint s, M;\n',
+    # Returns leave the program
+    'x = 1;\nfor i = 0:5 {\n    x *= 2;\n    if (x > 4) return;\n}\nprint x;\n',
+    # Deep expressions
+    'a = 1;\nx = ' + ' + '.join(['a'] * 300) + ';\nprint x;\n',
+]
+
+
+def output(run):
+    """Returns what <run> prints, with the error which stopped it."""
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1)
+    try:
+        run(interpreter)
+    except inter.ProgramError as error:
+        return f'{interpreter.output.target.getvalue()}{error}\n'
+    except inter.exceptions.ReturnValueException:
+        pass
+    except Exception as error:
+        return f'{interpreter.output.target.getvalue()}{type(error).__name__}: {error}\n'
+    return interpreter.output.target.getvalue()
+
+
+def compare(text, passes):
+    """Returns whether program <text> prints the same when its IR is run after
+    passes <passes>, None if it is not valid."""
+    try:
+        program, errors = inter.compile_program(text, output=open(os.devnull, 'w'))
+    except Exception:
+        # Type checker fails on some of the old test programs
+        return None
+    if errors:
+        return None
+    function = inter.PassManager(passes, verify=True).run(inter.lower_program(program))
+    expected = output(lambda interpreter: interpreter.visit(program))
+    return expected == output(lambda interpreter: inter.compile_function(function, interpreter).run())
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    generated = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    np.seterr(all='ignore')
+    programs = {}
+    for filename in sorted(glob.glob(os.path.join(ROOT, 'tests*', '*.m'))):
+        with open(filename) as file:
+            programs[os.path.relpath(filename, ROOT)] = file.read()
+    for i, text in enumerate(EDGE_CASES):
+        programs[f'edge case {i}'] = text
+    for seed in range(generated):
+        programs[f'generated {seed}'] = ProgramGenerator(seed).generate(2000)
+
+    for passes in [[], inter.DEFAULT_PASSES]:
+        results = {name: compare(text, passes) for name, text in programs.items()}
+        differing = [name for name, result in results.items() if result is False]
+        print(f'{len(programs)} programs ({sum(result is not None for result in results.values())} valid) compared '
+              f'with passes {passes}, {len(differing)} differ {differing if differing else ""}')
+
+    program = compile_program(ProgramGenerator(0).generate(statements))
+    function, lower_time = timed(inter.lower_program, program)
+    size = sum(1 for _ in function.values())
+    print(f'\ngenerated program of {statements} statements lowered in {lower_time * 1000:.1f} ms '
+          f'to {len(function.blocks)} blocks, {size} values')
+    manager = inter.PassManager()
+    manager.run(function)
+    print(manager.report(), end='')
+    print(f'after passes: {len(function.blocks)} blocks, {sum(1 for _ in function.values())} values\n')
+
+    with open(PRIMES) as file:
+        program = compile_program(file.read())
+    function = inter.PassManager().run(inter.lower_program(program))
+    print(function.dump())
+    _, interpreted = timed(output, lambda interpreter: interpreter.visit(program))
+    _, compiled = timed(output, lambda interpreter: inter.compile_function(function, interpreter).run())
+    print(f'primes.m interpreted {interpreted * 1000:.1f} ms, compiled IR {compiled * 1000:.1f} ms')
@@ -0,0 +1,60 @@
+"""Compares overhead of running a small program in-process through the library
+API with spawning main.py for it, and checks that both give the same output."""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import inter
+
+RUNS = 20
+
+PROGRAM = """
+A = ones(3, 3);
+s = 0;
+for i = 0:3 s += i;
+print s, A[1, 1];
+"""
+FAILING_PROGRAM = """
+A = zeros(3);
+k = 5;
+A[k, k] = 1;
+"""
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main.py')
+
+
+def spawn(filename):
+    return subprocess.run([sys.executable, MAIN, filename], capture_output=True, text=True,
+                          cwd=os.path.dirname(MAIN)).stdout
+
+
+def per_run(function, *args):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        result = function(*args)
+    return result, (time.perf_counter() - start) / RUNS
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for name, text in [('program', PROGRAM), ('failing program', FAILING_PROGRAM)]:
+            filename = os.path.join(directory, 'program.m')
+            with open(filename, 'w') as file:
+                file.write(text)
+
+            result, library_time = per_run(inter.run_program, text)
+            program, _ = inter.compile_program(text)
+            _, compiled_time = per_run(inter.run_program, program)
+            output, spawn_time = per_run(spawn, filename)
+            assert result.output == output, (result.output, output)
+
+            print(f'{name}: {result}')
+            print(f'{"  spawning main.py":<30} {spawn_time * 1000:10.2f} ms per run')
+            print(f'{"  run_program(source)":<30} {library_time * 1000:10.2f} ms per run')
+            print(f'{"  run_program(compiled)":<30} {compiled_time * 1000:10.2f} ms per run')
+
+
+if __name__ == '__main__':
+    main()
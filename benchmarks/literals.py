@@ -0,0 +1,121 @@
+"""Measures building array literals with constant elements from templates and
+checks that programs print the same and end with the same variables as when
+the literals are evaluated element by element: the test programs, literals
+which are changed after they are built and generated ones. Copies of
+templates are tested in tests/test_literals.py.
+
+Usage: python literals.py [generated programs] [size of the large literal]"""
+import glob
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import compile_program, inter
+from generator import ProgramGenerator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+LOOP = """
+s = 0;
+A = zeros(3, 3);
+for i = 0:20000 {
+    A = [[1, 2, 3], [4, 5, 6], [7, 8, 9]];
+    A[0, 0] = i;
+    s += i;
+}
+print s, A;
+"""
+
+EDGE_CASES = [
+    # Literals changed after they are built, in loops and by operation assignments
+    'for i = 0:3 {\n    A = [[1, 2], [3, 4]];\n    A[0, 0] += i;\n    B = A .+ [[1, 1], [1, 1]];\n    print A, B;\n}\n',
+    # Negative and float elements, strings
+    'A = [[-1, -2], [3, -4]];\nF = [[1.5, -2.5], [0.5, 1.0]];\nB = ["ab", "c"];\nprint A, F, B, [-1, -2];\n',
+    # Literals with computed elements are evaluated every time
+    'for i = 0:3 print [[i, i], [i, i]], [[1, 2], [3, 4]], [i, i];\n',
+    # Literals in compiled loops
+    'A = zeros(2, 2);\nfor i = 0:3000 {\n    A = [[1, 2], [3, 4]];\n    A[1, 1] = i;\n    print A[0, 0];\n}\nprint A;\n',
+]
+
+
+def plain(program):
+    """Makes <program> evaluate all its array literals element by element."""
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, inter.ast.Array) and hasattr(node, 'values'):
+            del node.values
+        stack.extend(child for _, _, child in inter.deep_expressions.slots(node) if isinstance(child, inter.ast.Node))
+    return program
+
+
+def run(program):
+    """Returns output of <program>, its global variables and errors."""
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1)
+    error = None
+    try:
+        interpreter.visit(program)
+    except inter.ProgramError as program_error:
+        error = program_error
+    except inter.exceptions.ReturnValueException:
+        pass
+    variables = {name: repr(value) for name, value in interpreter.memory_stack.stack[0].variables.items()}
+    return interpreter.output.target.getvalue(), variables, repr(error)
+
+
+def compare(text):
+    """Returns whether program <text> runs the same with and without templates
+    of its literals, None if it is not valid."""
+    try:
+        program, errors = inter.compile_program(text, output=open(os.devnull, 'w'))
+    except Exception:
+        # Type checker fails on some of the old test programs
+        return None
+    if errors:
+        return None
+    return run(program) == run(plain(inter.compile_program(text)[0]))
+
+
+def timed(program, **options):
+    elapsed = []
+    for _ in range(3):
+        interpreter = inter.Interpreter(output=io.StringIO(), **options)
+        start = time.perf_counter()
+        interpreter.visit(program)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+
+if __name__ == '__main__':
+    generated = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    np.seterr(all='ignore')
+    programs = {}
+    for filename in sorted(glob.glob(os.path.join(ROOT, 'tests*', '*.m'))):
+        with open(filename) as file:
+            programs[os.path.relpath(filename, ROOT)] = file.read()
+    for i, text in enumerate(EDGE_CASES):
+        programs[f'edge case {i}'] = text
+    for seed in range(generated):
+        programs[f'generated {seed}'] = ProgramGenerator(seed).generate(2000)
+
+    results = {name: compare(text) for name, text in programs.items()}
+    differing = [name for name, result in results.items() if result is False]
+    print(f'{len(programs)} programs ({sum(result is not None for result in results.values())} valid) compared, '
+          f'{len(differing)} differ {differing if differing else ""}')
+
+    rows = ', '.join('[' + ', '.join(str(i * size + j) for j in range(size)) + ']' for i in range(size))
+    large = f'A = [{rows}];\nprint A[{size - 1}, {size - 1}];\n'
+    for name, text, options in [('literal in a loop', LOOP, {'tier_threshold': None}),
+                                ('literal in a compiled loop', LOOP, {}),
+                                (f'{size}x{size} literal', large, {})]:
+        start = time.perf_counter()
+        program = compile_program(text)
+        compiled = time.perf_counter() - start
+        templates = timed(program, **options)
+        elements = timed(plain(program), **options)
+        print(f'{name:<28} compiled in {compiled * 1000:8.1f} ms, run element by element {elements * 1000:8.1f} ms, '
+              f'from templates {templates * 1000:8.1f} ms ({elements / templates:.1f}x)')
@@ -0,0 +1,57 @@
+"""Processes a matrix file several times larger than the memory the interpreter may allocate.
+
+The program runs in a child process whose data segment is limited with
+RLIMIT_DATA, so any attempt to read the whole matrix into memory fails. A
+smaller version of it is tested in tests/test_load_save.py."""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from common import compile_program, inter, measure, report
+
+ROWS = 8192
+COLS = 8192
+MEMORY_CAP = 128 * 2 ** 20
+
+PROGRAM = """
+A = load("{matrix}");
+s = 0.0;
+for i = 0:{rows} s += A[i, 7];
+print s;
+save("{output}", A[0:100, 0:100]);
+"""
+
+
+def create_matrix(filename):
+    """Writes ROWS x COLS float matrix with A[i, j] = i to <filename> in row blocks."""
+    array = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float64, shape=(ROWS, COLS))
+    for start in range(0, ROWS, 256):
+        array[start:start + 256] = np.arange(start, min(start + 256, ROWS))[:, None]
+    array.flush()
+    del array
+
+
+def run_child(directory):
+    resource.setrlimit(resource.RLIMIT_DATA, (MEMORY_CAP, MEMORY_CAP))
+    program = PROGRAM.format(matrix=os.path.join(directory, 'matrix.npy'),
+                             output=os.path.join(directory, 'output.npy'), rows=ROWS)
+    ast = compile_program(program)
+    # Read-only mapping does not count to the data segment, unlike copy-on-write one
+    _, elapsed, peak = measure(inter.Interpreter(mmap_mode='r').visit, ast)
+    report(f'{ROWS}x{COLS} matrix, {MEMORY_CAP >> 20} MiB cap', elapsed, peak)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        run_child(sys.argv[2])
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            create_matrix(os.path.join(directory, 'matrix.npy'))
+            environment = dict(os.environ, OPENBLAS_NUM_THREADS='1')
+            subprocess.run([sys.executable, __file__, '--child', directory], env=environment, check=True)
+            output = np.load(os.path.join(directory, 'output.npy'))
+            assert output.shape == (100, 100) and output[99, 0] == 99
@@ -0,0 +1,24 @@
+"""Measures chains of matrix products whose operands have mismatched dimensions."""
+from common import report, run
+
+ITERATIONS = 5
+
+PROGRAMS = {
+    'tall-skinny vector at the end': """
+A = ones(2000, 50);
+B = ones(50, 2000);
+C = ones(2000, 2000);
+x = ones(2000, 1);
+""" + f'for i = 0:{ITERATIONS} y = A * B * C * x;',
+    'outer product in the middle': """
+A = ones(1000, 1000);
+u = ones(1000, 1);
+v = ones(1, 1000);
+B = ones(1000, 1000);
+""" + f'for i = 0:{ITERATIONS} y = A * u * v * B;',
+}
+
+if __name__ == '__main__':
+    for name, program in PROGRAMS.items():
+        report(f'{name}, left to right', *run(program, dtype='float64', order_products=False))
+        report(f'{name}, ordered', *run(program, dtype='float64'))
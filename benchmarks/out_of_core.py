@@ -0,0 +1,53 @@
+"""Runs a program on matrices several times larger than the memory the interpreter may allocate.
+
+The program runs in a child process whose data segment is limited with
+RLIMIT_DATA. In the out-of-core mode it has to finish with the right results,
+without it the interpreter runs out of memory. A smaller version of it is
+tested in tests/test_out_of_core.py."""
+import os
+import resource
+import subprocess
+import sys
+
+from common import compile_program, inter, measure, report
+
+MEMORY_CAP = 256 * 2 ** 20
+ELEMENT_WISE_SIZE = 8192
+PRODUCT_SIZE = 4096
+
+PROGRAM = f"""
+A = ones({ELEMENT_WISE_SIZE}, {ELEMENT_WISE_SIZE});
+B = A .+ A';
+B *= 3;
+C = -(B .- A);
+print C[{ELEMENT_WISE_SIZE - 1}, 0];
+D = ones({PRODUCT_SIZE}, {PRODUCT_SIZE});
+E = D * D';
+print E[0, {PRODUCT_SIZE - 1}];
+"""
+EXPECTED_OUTPUT = f'-5.0\n{float(PRODUCT_SIZE)}\n'
+
+
+def run_child(out_of_core_size):
+    resource.setrlimit(resource.RLIMIT_DATA, (MEMORY_CAP, MEMORY_CAP))
+    ast = compile_program(PROGRAM)
+    interpreter = inter.Interpreter(dtype='float64', out_of_core_size=out_of_core_size)
+    _, elapsed, peak = measure(interpreter.visit, ast)
+    report(f'{ELEMENT_WISE_SIZE}x{ELEMENT_WISE_SIZE}, {MEMORY_CAP >> 20} MiB cap', elapsed, peak)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        run_child(None if sys.argv[2] == 'None' else int(sys.argv[2]))
+    else:
+        environment = dict(os.environ, OPENBLAS_NUM_THREADS='1')
+        for out_of_core_size in [2 ** 22, None]:
+            print(f'out_of_core_size={out_of_core_size}:')
+            child = subprocess.run([sys.executable, __file__, '--child', str(out_of_core_size)],
+                                   env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            if out_of_core_size is not None:
+                assert child.returncode == 0 and child.stdout.startswith(EXPECTED_OUTPUT), child.stdout + child.stderr
+                print(child.stdout[len(EXPECTED_OUTPUT):], end='')
+            else:
+                assert child.returncode != 0, 'program fitted into memory without the out-of-core mode'
+                print(f'    fails: {child.stderr.strip().splitlines()[-1]}')
@@ -0,0 +1,23 @@
+"""Measures printing in a tight loop with and without output buffering and
+peak memory of printing a large matrix in the csv format."""
+import os
+
+from common import report, run
+
+ITERATIONS = 200000
+N = 2000
+
+LOOP_PROGRAM = f"""
+for i = 0:{ITERATIONS} print i, i;
+"""
+MATRIX_PROGRAM = f"""
+A = ones({N}, {N});
+print A;
+"""
+
+if __name__ == '__main__':
+    with open(os.devnull, 'w') as devnull:
+        report(f'{ITERATIONS} prints, unbuffered', *run(LOOP_PROGRAM, output=devnull, output_buffer_size=0))
+        report(f'{ITERATIONS} prints, buffered', *run(LOOP_PROGRAM, output=devnull))
+        report(f'{N}x{N} matrix, text', *run(MATRIX_PROGRAM, output=devnull))
+        report(f'{N}x{N} matrix, csv', *run(MATRIX_PROGRAM, output=devnull, matrix_format='csv'))
@@ -0,0 +1,26 @@
+"""Compares for and parfor versions of the square root program from tests5/sqrt.m.
+
+Usage: python parfor.py [processes], processes defaults to the number of processors."""
+import os
+import sys
+
+from common import report, run
+
+ITERATIONS = 10000
+
+PROGRAM = """
+s = 0.0;
+{loop} x = 1:17 {reduction} {{
+    sqrt_x = 1.0;
+    for i = 1:{iterations} sqrt_x = (sqrt_x + x / sqrt_x) / 2;
+    s += sqrt_x;
+    print x, sqrt_x;
+}}
+print s;
+"""
+
+if __name__ == '__main__':
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    report('for', *run(PROGRAM.format(loop='for', reduction='', iterations=ITERATIONS)))
+    report(f'parfor, {processes} process(es)',
+           *run(PROGRAM.format(loop='parfor', reduction='reduce s', iterations=ITERATIONS), processes=processes))
@@ -0,0 +1,37 @@
+"""Measures overhead of the per line profiler on a loop-heavy program."""
+import io
+import time
+
+from common import compile_program, inter
+
+PROGRAM = """
+for n = 2:150 {
+    p = 1;
+    for d = 2:n-1 {
+        nc = n;
+        while (nc > 0) nc -= d;
+        if (nc == 0) {
+            p = 0;
+            break;
+        }
+    }
+}
+"""
+
+
+def timed(ast, **options):
+    start = time.perf_counter()
+    inter.Interpreter(**options).visit(ast)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    ast = compile_program(PROGRAM)
+    disabled = min(timed(ast) for _ in range(3))
+    profiler = inter.Profiler()
+    enabled = min(timed(ast, profiler=profiler) for _ in range(3))
+    print(f'{"profiler disabled":<20} {disabled * 1000:10.1f} ms')
+    print(f'{"profiler enabled":<20} {enabled * 1000:10.1f} ms ({enabled / disabled:.2f}x)')
+    report = io.StringIO()
+    profiler.report(PROGRAM, report)
+    print(report.getvalue(), end='')
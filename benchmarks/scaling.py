@@ -0,0 +1,78 @@
+"""Measures how time and memory of every interpreter phase grow with the size of
+generated programs. Slope of log(time) against log(size) between consecutive
+sizes is reported, a phase with slope above the threshold scales super-linearly.
+
+Usage: python scaling.py [--sizes 1000 10000 ...] [--seed N] [--plot scaling.png]"""
+import argparse
+import math
+
+import numpy as np
+
+from generator import ProgramGenerator
+from suite import Phases, measure
+
+try:
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+# Slope above which time grows faster than linearly, with margin for noise
+SUPER_LINEAR_SLOPE = 1.2
+
+
+def slope(small, large):
+    (size_small, time_small), (size_large, time_large) = small, large
+    if time_small <= 0 or time_large <= 0:
+        return float('nan')
+    return math.log(time_large / time_small) / math.log(size_large / size_small)
+
+
+def plot(results, sizes, filename):
+    figure, (time_axes, memory_axes) = plt.subplots(1, 2, figsize=(12, 5))
+    for phase, rows in results.items():
+        time_axes.loglog(sizes, [row['time'] for row in rows], marker='o', label=phase)
+        memory_axes.loglog(sizes, [max(row['peak_memory'], 1) for row in rows], marker='o', label=phase)
+    time_axes.set(xlabel='statements', ylabel='time [s]')
+    memory_axes.set(xlabel='statements', ylabel='peak memory [B]')
+    time_axes.legend()
+    figure.savefig(filename)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--repetitions', type=int, default=1)
+    arg_parser.add_argument('--plot', default=None, help='file to which plots are saved (needs matplotlib)')
+    args = arg_parser.parse_args()
+
+    # Generated programs let numpy integers overflow
+    np.seterr(all='ignore')
+    phases = Phases()
+    results = {phase: [] for phase in phases.all()}
+    for size in args.sizes:
+        text = ProgramGenerator(args.seed).generate(size)
+        for phase, (prepare, _, process, _) in phases.all().items():
+            times, peak = measure(prepare, process, text, 0, args.repetitions)
+            results[phase].append({'size': size, 'time': min(times), 'peak_memory': peak})
+
+    print(f'{"phase":<12} {"statements":>12} {"time ms":>12} {"us/statement":>14} {"peak MiB":>10} {"slope":>7}')
+    for phase, rows in results.items():
+        for i, row in enumerate(rows):
+            growth = slope((rows[i - 1]['size'], rows[i - 1]['time']), (row['size'], row['time'])) if i else None
+            flag = '  super-linear' if growth is not None and growth > SUPER_LINEAR_SLOPE else ''
+            print(f'{phase:<12} {row["size"]:>12} {row["time"] * 1000:>12.1f} '
+                  f'{row["time"] / row["size"] * 1e6:>14.2f} {row["peak_memory"] / 2 ** 20:>10.2f} '
+                  f'{"" if growth is None else f"{growth:.2f}":>7}{flag}')
+    if args.plot:
+        if plt is None:
+            print('matplotlib is not installed, no plot saved')
+        else:
+            plot(results, args.sizes, args.plot)
+
+
+if __name__ == '__main__':
+    main()
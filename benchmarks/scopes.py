@@ -0,0 +1,64 @@
+"""Compares running tests5/primes.m (with a larger bound) with and without
+eliding memories of loops and conditional instructions which create no
+variables, and checks that both print the same.
+
+Usage: python scopes.py [bound]"""
+import io
+import os
+import sys
+import time
+
+from common import compile_program, inter
+
+PRIMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests5', 'primes.m')
+
+
+def scope_nodes(node):
+    """Yields loops and conditional instructions of program <node>."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (inter.ast.If, inter.ast.For, inter.ast.ParFor, inter.ast.While)):
+            yield node
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, inter.ast.Instruction) or isinstance(node, (inter.ast.Program, inter.ast.List)):
+            stack.extend(vars(node).values())
+
+
+def timed(ast):
+    interpreter = inter.Interpreter(output=io.StringIO())
+    pushes = [0]
+    push = interpreter.memory_stack.push
+
+    def counted_push(name):
+        pushes[0] += 1
+        push(name)
+
+    interpreter.memory_stack.push = counted_push
+    start = time.perf_counter()
+    interpreter.visit(ast)
+    return time.perf_counter() - start, pushes[0], interpreter.output.target.getvalue()
+
+
+if __name__ == '__main__':
+    bound = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with open(PRIMES) as file:
+        text = file.read().replace('2:100', f'2:{bound}')
+    ast = compile_program(text)
+    scopes = list(scope_nodes(ast))
+    print(f'{sum(not node.new_scope for node in scopes)} of {len(scopes)} scopes elided')
+
+    results = {}
+    for name, elided in [('all scopes', False), ('elided scopes', True)]:
+        marks = [node.new_scope for node in scopes]
+        if not elided:
+            for node in scopes:
+                node.new_scope = True
+        results[name] = min((timed(ast) for _ in range(3)), key=lambda result: result[0])
+        for node, mark in zip(scopes, marks):
+            node.new_scope = mark
+        elapsed, pushes, _ = results[name]
+        print(f'{name:<16} {elapsed * 1000:10.1f} ms {pushes:10} memories pushed')
+    outputs = {output for _, _, output in results.values()}
+    print('outputs identical' if len(outputs) == 1 else 'OUTPUTS DIFFER')
@@ -0,0 +1,58 @@
+"""Compares memory used by worker processes reading the same matrix when it is
+shared and when each worker gets its own (pickled) copy.
+
+Usage: python shared_matrix.py [workers], workers defaults to 4."""
+import contextlib
+import io
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from common import compile_program, inter
+
+ROWS = 4096
+COLS = 8192
+
+PROGRAM = f"""
+v = ones({COLS}, 1);
+x = A * v;
+"""
+
+
+def memory_usage():
+    """Returns proportional set size and private memory of this process in bytes."""
+    usage = {}
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            fields = line.split()
+            if fields[0] in ('Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                usage[fields[0]] = int(fields[1]) * 1024
+    return usage['Pss:'], usage['Private_Clean:'] + usage['Private_Dirty:']
+
+
+def run_worker(matrix):
+    variables = {'A': matrix}
+    ast = compile_program(PROGRAM, variables)
+    with contextlib.redirect_stdout(io.StringIO()):
+        inter.Interpreter(dtype='float64', variables=variables).visit(ast)
+    return memory_usage()
+
+
+def report(name, usages):
+    pss = sum(usage[0] for usage in usages)
+    private = sum(usage[1] for usage in usages)
+    print(f'{name:<20} total PSS {pss / 2 ** 20:8.1f} MiB, total private {private / 2 ** 20:8.1f} MiB')
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    array = np.random.default_rng(0).random((ROWS, COLS))
+    print(f'{workers} workers, {array.nbytes / 2 ** 20:.0f} MiB matrix')
+    shared = inter.SharedMatrix.publish(array)
+    try:
+        for name, matrix in [('shared', shared), ('pickled copies', array)]:
+            with ProcessPoolExecutor(workers) as pool:
+                report(name, list(pool.map(run_worker, [matrix] * workers)))
+    finally:
+        shared.unlink()
@@ -0,0 +1,21 @@
+"""Compares sparse and dense matrices created by eye and zeros."""
+from common import report, run
+
+N = 4000
+
+PROGRAM = f"""
+A = eye({N});
+Z = zeros({N}, {N});
+Z[0, 1] = 5;
+Z[2, 3] = 7;
+B = A';
+C = A * Z;
+D = A .* Z;
+v = ones({N}, 1);
+w = A * v;
+"""
+
+if __name__ == '__main__':
+    report('dense', *run(PROGRAM, dtype='float64'))
+    report('sparse', *run(PROGRAM, dtype='float64', sparse_size=10 ** 6))
+    report('sparse, eye(20000)', *run(PROGRAM.replace(str(N), '20000'), dtype='float64', sparse_size=10 ** 6))
@@ -0,0 +1,23 @@
+"""Builds a 10 MB string by concatenation and substring assignment in a loop."""
+from common import report, run
+
+PIECE = 'abcdefghij' * 10
+ITERATIONS = 100000
+
+PROGRAMS = {
+    'concatenation': f"""
+s = "";
+for i = 0:{ITERATIONS} s += "{PIECE}";
+""",
+    'concatenation, substring assignment': f"""
+s = "{PIECE}";
+for i = 0:{ITERATIONS} {{
+    s = s + "{PIECE}";
+    s[50:53] = "xyz";
+}}
+""",
+}
+
+if __name__ == '__main__':
+    for name, program in PROGRAMS.items():
+        report(name, *run(program))
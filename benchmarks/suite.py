@@ -0,0 +1,221 @@
+"""Runs workloads through every phase of the interpreter (scanning, parsing, type
+checking and interpretation) separately and measures wall time, throughput and
+peak memory of each phase. Results can be saved as JSON and compared against a
+saved baseline, any phase slower than the baseline by more than the threshold
+is reported as a regression (and the script exits with status 1).
+
+Usage: python suite.py [--repetitions N] [--warmup N] [--output results.json]
+                       [--baseline baseline.json] [--threshold 0.1] [workload ...]"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import inter
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests5')
+TEST_WORKLOADS = ['pi', 'primes', 'sqrt', 'matrix', 'fibonacci']
+
+
+def synthetic_statements(count):
+    """Straight-line program of <count> arithmetic assignments."""
+    lines = [f'v{i} = {i};' for i in range(50)]
+    lines += [f'v{i % 50} = {i} * 2 + v{(i + 49) % 50} - v{(i + 7) % 50} / 3;' for i in range(count)]
+    return '\n'.join(lines) + '\n'
+
+
+def synthetic_loops(size):
+    """Two nested loops of <size> iterations each."""
+    return f's = 0;\nfor i = 0:{size} {{\n    for j = 0:{size} {{\n        s += i * j - j;\n    }}\n}}\nprint s;\n'
+
+
+def synthetic_matrices(size):
+    """Element-wise operations and products of <size>x<size> matrices."""
+    return (f'A = ones({size}, {size});\nB = eye({size});\n'
+            f'for i = 0:20 {{\n    C = A .+ B .* A;\n    D = C * B;\n    A = D .- B;\n}}\n')
+
+
+def workloads():
+    """Returns names of workloads mapped to their programs."""
+    programs = {}
+    for name in TEST_WORKLOADS:
+        with open(os.path.join(TESTS_DIR, f'{name}.m')) as file:
+            programs[name] = file.read()
+    programs['statements_10000'] = synthetic_statements(10000)
+    programs['loops_300'] = synthetic_loops(300)
+    programs['matrices_300'] = synthetic_matrices(300)
+    return programs
+
+
+class Phases:
+    """Functions running phases of the interpreter. Every phase has a function
+    preparing its input from program text and a function counting units of work
+    in the text, which are not measured, and a function processing the input."""
+
+    def __init__(self):
+        self.scanner = inter.Scanner()
+        self.parser = inter.Parser(lexer=self.scanner)
+        self.devnull = open(os.devnull, 'w')
+
+    def tokens(self, text):
+        lexer = self.scanner.lexer
+        lexer.lineno = 1
+        lexer.input(text)
+        return sum(1 for _ in iter(lexer.token, None))
+
+    def parse(self, text):
+        ast = self.parser.parse(text)
+        if ast is None or self.parser.errors or self.scanner.errors:
+            raise ValueError('workload is not a valid program')
+        return ast
+
+    def type_check(self, ast):
+        type_checker = inter.TypeChecker(output=self.devnull)
+        type_checker.visit(ast)
+        return type_checker.errors
+
+    def compile(self, text):
+        ast = self.parse(text)
+        errors = self.type_check(ast)
+        if errors:
+            raise ValueError(f'workload does not type check: {errors}')
+        return ast
+
+    def interpret(self, ast):
+        inter.Interpreter(output=self.devnull).visit(ast)
+
+    def executed_statements(self, ast):
+        """Counts statements and loop iterations executed by program <ast>."""
+        interpreter = inter.Interpreter(output=self.devnull)
+        counter = [0]
+        step = interpreter.step
+
+        def count(steps=1):
+            counter[0] += steps
+            step(steps)
+
+        # Loops run in closed form count all their iterations at once, compiled
+        # loops count them only when there is a checkpoint
+        interpreter.step = count
+        interpreter.checkpoint = lambda: None
+        interpreter.visit(ast)
+        return counter[0]
+
+    def all(self):
+        """Returns names of phases mapped to their preparing, counting and
+        processing functions and names of units."""
+        return {
+            'scan': (str, self.tokens, self.tokens, 'tokens'),
+            'parse': (str, self.tokens, self.parse, 'tokens'),
+            'type_check': (self.parse, lambda text: count_nodes(self.parse(text)), self.type_check, 'nodes'),
+            'interpret': (self.compile, lambda text: self.executed_statements(self.compile(text)), self.interpret,
+                          'statements'),
+        }
+
+
+def count_nodes(node):
+    if isinstance(node, list):
+        return sum(count_nodes(element) for element in node)
+    if isinstance(node, inter.ast.Node):
+        return 1 + sum(count_nodes(value) for value in vars(node).values())
+    return 0
+
+
+def measure(prepare, process, text, warmup, repetitions):
+    """Returns wall times of <repetitions> runs of <process> (after <warmup>
+    ones) and peak traced memory."""
+    for _ in range(warmup):
+        process(prepare(text))
+    times = []
+    for _ in range(repetitions):
+        argument = prepare(text)
+        start = time.perf_counter()
+        process(argument)
+        times.append(time.perf_counter() - start)
+    argument = prepare(text)
+    tracemalloc.start()
+    process(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak
+
+
+def run_suite(names, warmup, repetitions):
+    phases = Phases()
+    programs = workloads()
+    results = {}
+    for name in names:
+        text = programs[name]
+        results[name] = {}
+        for phase, (prepare, count, process, unit) in phases.all().items():
+            if phase == 'interpret' and phases.type_check(phases.parse(text)):
+                print(f'{name:<20} {phase:<12} skipped, the program does not type check')
+                continue
+            units = count(text)
+            times, peak = measure(prepare, process, text, warmup, repetitions)
+            median = statistics.median(times)
+            results[name][phase] = {
+                'median': median,
+                'min': min(times),
+                'repetitions': repetitions,
+                'units': units,
+                'unit': unit,
+                'throughput': units / median if median else None,
+                'peak_memory': peak,
+            }
+            print(f'{name:<20} {phase:<12} {median * 1000:10.2f} ms {units / median if median else 0:14.0f} '
+                  f'{unit}/s {peak / 2 ** 20:10.2f} MiB', flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints ratios of median times to the baseline, returns list of regressions."""
+    regressions = []
+    for name, phases in results.items():
+        for phase, result in phases.items():
+            reference = baseline.get(name, {}).get(phase)
+            if reference is None:
+                continue
+            ratio = result['median'] / reference['median']
+            regressed = ratio > 1 + threshold
+            if regressed:
+                regressions.append((name, phase, ratio))
+            print(f'{name:<20} {phase:<12} {ratio:8.2f}x{"  REGRESSION" if regressed else ""}')
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('workloads', nargs='*', help='workloads to run, all by default')
+    arg_parser.add_argument('--repetitions', type=int, default=5)
+    arg_parser.add_argument('--warmup', type=int, default=1)
+    arg_parser.add_argument('--output', default=None, help='file to which results are written as JSON')
+    arg_parser.add_argument('--baseline', default=None, help='JSON file with results to compare against')
+    arg_parser.add_argument('--threshold', type=float, default=0.1,
+                            help='fraction by which a phase can be slower than the baseline')
+    args = arg_parser.parse_args()
+
+    names = args.workloads or list(workloads())
+    results = run_suite(names, args.warmup, args.repetitions)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'python': platform.python_version(), 'numpy': np.__version__, 'results': results},
+                      file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) above {args.threshold:.0%}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
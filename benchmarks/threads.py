@@ -0,0 +1,27 @@
+"""Measures scaling of element-wise operations on large matrices with the number of threads.
+
+Usage: python threads.py [max_threads], max_threads defaults to the number of processors."""
+import os
+import sys
+
+from common import report, run
+
+N = 4000
+ITERATIONS = 10
+
+PROGRAM = f"""
+A = ones({N}, {N});
+B = ones({N}, {N});
+C = ones({N}, {N});
+for i = 0:{ITERATIONS} {{
+    D = A .+ B .* C;
+    D *= 2;
+}}
+"""
+
+if __name__ == '__main__':
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    threads = 1
+    while threads <= max_threads:
+        report(f'{N}x{N}, {threads} thread(s)', *run(PROGRAM, dtype='float64', workers=threads))
+        threads *= 2
@@ -0,0 +1,126 @@
+"""Measures compiling hot loops (tiered execution) on loop-heavy programs and
+checks that programs print the same, end with the same variables and errors
+and execute the same number of steps as in the tree walker, when loops are
+compiled after a few back edges: the test programs, loops which deoptimize or
+fail inside compiled code and generated ones. Edge cases are also tested in
+tests/test_tiering.py.
+
+Usage: python tiering.py [generated programs] [threshold]"""
+import glob
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import compile_program, inter
+from generator import ProgramGenerator
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+EDGE_CASES = [
+    # Variables changing type between runs of a compiled loop
+    'x = 1;\nfor k = 0:4 {\n    if (k == 2) x = 0.5;\n    s = 0;\n    for i = 0:20 s += x;\n    print s;\n}\n',
+    # Errors inside compiled loops leave variables as they were before the statement
+    's = 0;\nA = ones(2, 2);\nfor i = 0:50 {\n    s += i;\n    if (i > 30) t = A[0, i];\n}\n',
+    'n = 10;\nx = 100;\nwhile (n > -5) {\n    n -= 1;\n    x /= n;\n}\n',
+    # Returns, breaks and continues
+    's = 0;\nfor i = 0:100 {\n    s += i;\n    if (s > 1000) return;\n}\nprint s;\n',
+    'n = 0;\nm = 0;\nwhile (n < 500) {\n    n += 1;\n    if (n == 300) break;\n    if (n > 100) continue;\n'
+    '    m += n;\n}\nprint n, m;\n',
+    # Loop invariants of the compiled loop and of enclosing ones
+    'A = ones(3, 3);\nB = eye(3);\ns = 0;\nfor i = 0:100 {\n    C = A * B;\n    s += C[0, 0];\n}\nprint s;\n'
+    'n = 4;\nfor k = 0:5 {\n    t = 0;\n    for j = 0:50 t += n * 3 + A[1, 1] + k;\n    print t;\n}\n',
+    # Counted loops inside compiled loops, the step is not computed when they do not start
+    'z = 0;\nfor k = 0:20 {\n    n = k;\n    while (n > 0) n -= 3;\n    m = 0;\n    while (m > 0) m -= 1 / z;\n'
+    '    print n, m;\n}\n',
+    # Element assignments, strings and parfor loops inside compiled loops
+    'A = zeros(20, 20);\nfor i = 0:20\n    for j = 0:20\n        A[i, j] = i * j + 1;\nprint A[19, 19], A;\n'
+    'w = "a";\nfor i = 0:30 {\n    w[0] = "b";\n    print w;\n}\n'
+    't = 0;\nfor k = 0:20 {\n    s = 0;\n    parfor i = 0:4 reduce s {\n        s += i * k;\n    }\n    t += s;\n}\nprint t;\n',
+]
+
+BENCHMARKS = {
+    'square roots': os.path.join(ROOT, 'tests5', 'sqrt.m'),
+    'matrix fill': 'n = 120;\nA = zeros(n, n);\nfor i = 0:n\n    for j = 0:n\n        A[i, j] = i * j + 1;\n'
+                   's = 0;\nfor i = 0:n\n    for j = 0:n\n        s += A[i, j];\nprint s;\n',
+    'recurrence': 'x = 0.5;\nk = 0;\nwhile (k < 100000) {\n    x = 3.7 * x * (1 - x);\n    k += 1;\n}\nprint x;\n',
+}
+
+
+def run(program, threshold):
+    """Returns output of <program>, its global variables, errors and number of steps it executed."""
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1, tier_threshold=threshold)
+    steps = [0]
+    step = interpreter.step
+
+    def counted_step(count=1):
+        steps[0] += count
+        step(count)
+
+    # Compiled loops count steps only when there is a checkpoint
+    interpreter.step = counted_step
+    interpreter.checkpoint = lambda: None
+    error = None
+    try:
+        interpreter.visit(program)
+    except inter.ProgramError as program_error:
+        error = program_error
+    except inter.exceptions.ReturnValueException:
+        pass
+    variables = {name: repr(value) for name, value in interpreter.memory_stack.stack[0].variables.items()}
+    return interpreter.output.target.getvalue(), variables, repr(error), steps[0]
+
+
+def compare(text, threshold):
+    """Returns whether program <text> runs the same with loops compiled after
+    <threshold> back edges as without compiling, None if it is not valid."""
+    try:
+        program, errors = inter.compile_program(text, output=open(os.devnull, 'w'))
+    except Exception:
+        # Type checker fails on some of the old test programs
+        return None
+    if errors:
+        return None
+    return run(program, threshold) == run(program, None)
+
+
+def timed(program, threshold):
+    interpreter = inter.Interpreter(output=io.StringIO(), tier_threshold=threshold)
+    start = time.perf_counter()
+    interpreter.visit(program)
+    return time.perf_counter() - start, interpreter
+
+
+if __name__ == '__main__':
+    generated = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    np.seterr(all='ignore')
+    programs = {}
+    for filename in sorted(glob.glob(os.path.join(ROOT, 'tests*', '*.m'))):
+        with open(filename) as file:
+            programs[os.path.relpath(filename, ROOT)] = file.read()
+    for i, text in enumerate(EDGE_CASES):
+        programs[f'edge case {i}'] = text
+    for seed in range(generated):
+        programs[f'generated {seed}'] = ProgramGenerator(seed).generate(2000)
+
+    for compiled_after in [1, threshold]:
+        results = {name: compare(text, compiled_after) for name, text in programs.items()}
+        differing = [name for name, result in results.items() if result is False]
+        print(f'{len(programs)} programs ({sum(result is not None for result in results.values())} valid) compared '
+              f'compiling loops after {compiled_after} back edges, {len(differing)} differ '
+              f'{differing if differing else ""}')
+
+    for name, text in BENCHMARKS.items():
+        if os.path.exists(text):
+            with open(text) as file:
+                text = file.read()
+        program = compile_program(text)
+        interpreted, walker = min((timed(program, None) for _ in range(3)), key=lambda result: result[0])
+        compiled, tiered = min((timed(program, 1000) for _ in range(3)), key=lambda result: result[0])
+        same = walker.output.target.getvalue() == tiered.output.target.getvalue()
+        print(f'\n{name}: tree walker {interpreted * 1000:.1f} ms, tiered {compiled * 1000:.1f} ms '
+              f'({interpreted / compiled:.1f}x){"" if same else ", OUTPUTS DIFFER"}')
+        print(tiered.tiers.report(), end='')
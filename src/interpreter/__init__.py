@@ -1,4 +1,12 @@
+from .asynchronous import *
+from .exceptions import ProgramError
 from .interpreter import *
+from .ir_builder import *
+from .ir_compiler import *
+from .ir_passes import *
+from .library import *
 from .parser import *
+from .profiler import *
 from .scanner import *
+from .shared import *
 from .type_checker import *
@@ -38,6 +38,17 @@ class For(Instruction):
         self.instruction = instruction
 
 
+# noinspection PyShadowingBuiltins
+class ParFor(Instruction):
+    def __init__(self, variable, range, instruction, reductions=None):
+        super().__init__()
+        self.type = 'PARFOR'
+        self.variable = variable
+        self.range = range
+        self.instruction = instruction
+        self.reductions = reductions if reductions is not None else []
+
+
 class While(Instruction):
     def __init__(self, condition, instruction):
         super().__init__()
@@ -81,6 +92,14 @@ class Print(Instruction):
         self.args = args
 
 
+class Save(Instruction):
+    def __init__(self, filename, value):
+        super().__init__()
+        self.type = 'SAVE'
+        self.filename = filename
+        self.value = value
+
+
 class ArrayElement(Expression):
     def __init__(self, array, ids):
         super().__init__()
@@ -89,6 +108,19 @@ class ArrayElement(Expression):
         self.ids = ids
 
 
+class BoundedElement(ArrayElement):
+    """Element of array <array> in a for loop whose indices <ids> stay the same
+    (or are the loop variable) in the whole loop. <indices> are their variables
+    (None for constants) with constants added to them. When the loop checks
+    before it starts that they are within the dimensions of the array in all
+    iterations, the element is accessed without checks."""
+
+    def __init__(self, array, ids, indices, written):
+        super().__init__(array, ids)
+        self.indices = indices
+        self.written = written
+
+
 # Expressions
 class Value(Expression):
     pass
@@ -158,6 +190,22 @@ class MatrixFunction(Expression):
         self.parameter = parameter
 
 
+class Load(Expression):
+    def __init__(self, filename):
+        super().__init__()
+        self.type = 'load'
+        self.filename = filename
+
+
+class BoundValue(Expression):
+    def __init__(self, num_rows='unknown', num_cols='unknown', element_type='unknown'):
+        super().__init__()
+        self.type = 'bound_value'
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.element_type = element_type
+
+
 class UnaryMinus(Expression):
     def __init__(self, value):
         super().__init__()
@@ -172,6 +220,60 @@ class Transpose(Expression):
         self.value = value
 
 
+class DeepExpression(Expression):
+    """Expression <expression> with subexpressions <temporaries> split out of it,
+    so that none of them is deeper than a fixed limit. Temporaries are evaluated
+    in order and every later one (and <expression>) refers to the values of the
+    earlier ones by Temporary nodes. Other attributes are those of <expression>."""
+
+    def __init__(self, expression, temporaries):
+        super().__init__()
+        self.type = expression.type
+        self.expression = expression
+        self.temporaries = temporaries
+
+    def __getattr__(self, name):
+        if name.startswith('__') or 'expression' not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.expression, name)
+
+
+class Temporary(Expression):
+    """Value of <index>-th temporary of enclosing DeepExpression, which is
+    <expression>. Other attributes are those of <expression>, which is not
+    pickled, so pickled trees are not deeper than the split expressions."""
+
+    def __init__(self, index, expression):
+        super().__init__()
+        self.type = expression.type
+        self.index = index
+        self.expression = expression
+        if hasattr(expression, 'lineno'):
+            self.lineno = expression.lineno
+
+    def __getattr__(self, name):
+        if name.startswith('__') or 'expression' not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.expression, name)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('expression', None)
+        return state
+
+
+class LoopInvariant(Expression):
+    """Operation <expression> whose value does not change during a run of the
+    loop it was hoisted to, so it is evaluated once per run of the loop."""
+
+    def __init__(self, expression):
+        super().__init__()
+        self.type = expression.type
+        self.expression = expression
+        if hasattr(expression, 'lineno'):
+            self.lineno = expression.lineno
+
+
 # Other
 class Program(Node):
     def __init__(self, instructions_opt):
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import weakref
+
+from .exceptions import ExecutionCancelled
+from .interpreter import Interpreter
+
+__all__ = ['AsyncExecution', 'run_async']
+
+
+class AsyncExecution:
+    """Execution of program <ast> by <interpreter> driven by a coroutine.
+
+    The interpreter runs in its own thread, but only while the coroutine waits
+    for it: every <checkpoint_interval> statements and loop iterations it stops
+    in its checkpoint and the coroutine gives the control back to the event
+    loop. Statements being run are kept on the generator stack of
+    Interpreter.execute, so the paused thread holds a few frames however deep
+    the statements are nested, and the statement (or compiled loop) which
+    reached the checkpoint continues when it is resumed. Programs of one event
+    loop take turns in running their slices, so the event loop shares the
+    interpreter lock with at most one of them and each program waits at most
+    as long as the others need to execute one slice each."""
+
+    # Event loops mapped to locks letting one of their programs run at a time
+    running_locks = weakref.WeakKeyDictionary()
+
+    def __init__(self, ast, interpreter=None, checkpoint_interval=1000):
+        self.ast = ast
+        self.interpreter = Interpreter() if interpreter is None else interpreter
+        self.interpreter.checkpoint = self.checkpoint
+        self.interpreter.checkpoint_interval = checkpoint_interval
+        self.interpreter.steps_to_checkpoint = checkpoint_interval
+        self.thread = threading.Thread(target=self.execute, daemon=True)
+        self.resume = threading.Event()
+        self.loop = None
+        # Future set by the interpreter thread when it pauses or finishes
+        self.slice_done = None
+        self.cancelled = False
+        self.finished = False
+
+    def execute(self):
+        self.wait_for_resume()
+        try:
+            self.interpreter.visit(self.ast)
+            outcome = None
+        except BaseException as error:
+            outcome = error
+        self.finished = True
+        self.report(outcome)
+
+    def checkpoint(self):
+        self.interpreter.output.flush()
+        self.report(None)
+        self.wait_for_resume()
+
+    def wait_for_resume(self):
+        self.resume.wait()
+        self.resume.clear()
+        if self.cancelled:
+            raise ExecutionCancelled
+
+    def report(self, outcome):
+        """Tells the coroutine that the thread paused, finished or failed with <outcome>."""
+        self.loop.call_soon_threadsafe(self.set_outcome, outcome)
+
+    def set_outcome(self, outcome):
+        if not self.slice_done.done():
+            self.slice_done.set_result(outcome)
+
+    async def run_slice(self):
+        """Lets the interpreter run until the next checkpoint, returns exception
+        it failed with (or None)."""
+        async with self.running_locks.setdefault(self.loop, asyncio.Lock()):
+            self.slice_done = self.loop.create_future()
+            self.resume.set()
+            return await asyncio.shield(self.slice_done)
+
+    async def run(self, timeout=None):
+        """Runs the program, raises TimeoutError if it does not finish within
+        <timeout> seconds. Cancelling the coroutine stops the program."""
+        self.loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else self.loop.time() + timeout
+        self.thread.start()
+        try:
+            while True:
+                error = await self.run_slice()
+                if self.finished:
+                    if error is not None:
+                        raise error
+                    return self.interpreter.global_variables()
+                if deadline is not None and self.loop.time() >= deadline:
+                    raise TimeoutError(f'program did not finish in {timeout} s')
+        except (asyncio.CancelledError, TimeoutError):
+            await self.stop()
+            raise
+
+    async def stop(self):
+        """Stops the interpreter at its current or next checkpoint."""
+        self.cancelled = True
+        if self.slice_done is not None and not self.slice_done.done():
+            await self.slice_done
+        if not self.finished:
+            await self.run_slice()
+
+
+async def run_async(ast, interpreter=None, checkpoint_interval=1000, timeout=None):
+    """Runs program <ast> as a coroutine, see AsyncExecution. Returns global variables."""
+    return await AsyncExecution(ast, interpreter, checkpoint_interval).run(timeout)
@@ -0,0 +1,114 @@
+from . import ast
+from .deep_expressions import run_nested, set_slot, slots
+from .invariants import statements
+
+
+def index_of(node):
+    """Returns variable (None for a constant) and constant whose sum is index
+    <node>, None if it is not an identifier, integer or their sum or difference."""
+    if isinstance(node, ast.IntNum):
+        return None, node.value
+    if isinstance(node, ast.Identifier):
+        return node.name, 0
+    if isinstance(node, ast.NumberBinaryOperation) and node.operator in ('+', '-'):
+        if isinstance(node.left, ast.Identifier) and isinstance(node.right, ast.IntNum):
+            return node.left.name, node.right.value if node.operator == '+' else -node.right.value
+        if node.operator == '+' and isinstance(node.left, ast.IntNum) and isinstance(node.right, ast.Identifier):
+            return node.right.name, node.left.value
+    return None
+
+
+def rebound(loop):
+    """Returns variables bound to new values in the body of <loop>."""
+    names = set()
+    for statement in statements(loop.instruction):
+        if isinstance(statement, ast.Assignment) and isinstance(statement.left, ast.Identifier):
+            names.add(statement.left.name)
+        elif isinstance(statement, (ast.For, ast.ParFor)):
+            names.add(statement.variable.name)
+    return names
+
+
+class RangeCheckElimination:
+    """Replaces elements of arrays in for loops of <program> whose indices are
+    variables not bound to new values in the loop (like its loop variable) or
+    constants, either plus or minus a constant, with BoundedElements listed in
+    bounded attribute of the outermost such loop. The array must not be bound
+    to a new value in the loop either, so its dimensions do not change.
+
+    Parfor loops run in other interpreters, elements in them are left to for
+    loops nested in them."""
+
+    def __init__(self, program):
+        # Enclosing for loops with variables bound in them
+        self.loops = []
+        run_nested(self.statement(program.instructions_opt))
+
+    def statement(self, node):
+        """Generator run by run_nested, which yields the nested instructions."""
+        if isinstance(node, ast.List):
+            for instruction in node.elements:
+                yield self.statement(instruction)
+        elif isinstance(node, ast.Block):
+            yield self.statement(node.instructions)
+        elif isinstance(node, ast.Assignment):
+            if isinstance(node.left, ast.ArrayElement):
+                self.expressions(node.left.ids)
+                self.bound(node, 'left', node.left, True)
+            self.expressions(node)
+        elif isinstance(node, ast.If):
+            self.expressions(node)
+            yield self.statement(node.if_block)
+            yield self.statement(node.else_block)
+        elif isinstance(node, ast.For):
+            self.expressions(node.range)
+            node.bounded = []
+            self.loops.append((node, rebound(node)))
+            yield self.statement(node.instruction)
+            self.loops.pop()
+        elif isinstance(node, ast.ParFor):
+            self.expressions(node.range)
+            loops, self.loops = self.loops, []
+            yield self.statement(node.instruction)
+            self.loops = loops
+        elif isinstance(node, ast.While):
+            self.expressions(node)
+            yield self.statement(node.instruction)
+        elif isinstance(node, ast.Node) and self.loops:
+            self.expressions(node)
+
+    def expressions(self, node):
+        """Bounds elements in expressions which are attributes of <node>."""
+        if not self.loops:
+            return
+        for container, key, child in list(slots(node)):
+            # Targets of assignments are bounded as written, temporaries through their deep expressions
+            if not isinstance(child, ast.Node) or isinstance(child, (ast.Temporary, ast.Instruction)) \
+                    or key == 'left' and isinstance(node, ast.Assignment):
+                continue
+            self.expressions(child)
+            if type(child) is ast.ArrayElement:
+                self.bound(container, key, child, False)
+
+    def bound(self, container, key, element, written):
+        """Replaces <element> kept in <container> under <key> with a
+        BoundedElement if a loop can check its indices before it starts."""
+        if not self.loops or type(element) is not ast.ArrayElement or not isinstance(element.array, ast.Identifier):
+            return
+        indices = tuple(index_of(index) for index in element.ids.elements)
+        if None in indices:
+            return
+        names = {name for name, _ in indices if name is not None} | {element.array.name}
+        for loop, written_names in self.loops:
+            if not names & written_names:
+                bounded = ast.BoundedElement(element.array, element.ids, indices, written)
+                if hasattr(element, 'lineno'):
+                    bounded.lineno = element.lineno
+                set_slot(container, key, bounded)
+                loop.bounded.append(bounded)
+                return
+
+
+def eliminate_range_checks(program):
+    if program.instructions_opt is not None:
+        RangeCheckElimination(program)
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class BufferPool:
+    """Arrays which are no longer used by the interpreter, grouped by shape and type,
+    so that temporary results can be computed without new allocations.
+
+    The pool keeps at most <max_buffers> arrays of each shape and type and at
+    most <max_bytes> bytes in total, dropping the arrays put into it least
+    recently when it gets full."""
+
+    def __init__(self, max_buffers=2, max_bytes=2 ** 28):
+        self.max_buffers = max_buffers
+        self.max_bytes = max_bytes
+        self.buffers = {}
+        # Ids of pooled arrays mapped to them, least recently put first
+        self.recent = OrderedDict()
+        self.bytes = 0
+
+    def get(self, shape, dtype):
+        """Gets from pool (or allocates) uninitialized array of shape <shape> and type <dtype>."""
+        buffers = self.buffers.get((shape, dtype))
+        if not buffers:
+            return np.empty(shape, dtype)
+        array = buffers.pop()
+        if not buffers:
+            del self.buffers[(shape, dtype)]
+        del self.recent[id(array)]
+        self.bytes -= array.nbytes
+        return array
+
+    def put(self, array):
+        """Puts array <array> into pool. It cannot be used by anything else afterwards."""
+        if array.nbytes > self.max_bytes:
+            return
+        buffers = self.buffers.setdefault((array.shape, array.dtype), [])
+        if len(buffers) >= self.max_buffers:
+            return
+        buffers.append(array)
+        self.recent[id(array)] = array
+        self.bytes += array.nbytes
+        while self.bytes > self.max_bytes:
+            _, evicted = self.recent.popitem(last=False)
+            self.bytes -= evicted.nbytes
+            key = (evicted.shape, evicted.dtype)
+            buffers = self.buffers[key]
+            buffers[:] = [buffer for buffer in buffers if buffer is not evicted]
+            if not buffers:
+                del self.buffers[key]
+
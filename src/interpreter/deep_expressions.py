@@ -0,0 +1,162 @@
+from .ast import DeepExpression, Expression, Node, Temporary
+
+# Maximal depth of expressions evaluated recursively, deeper subexpressions
+# are evaluated beforehand as temporaries
+DEPTH_LIMIT = 64
+
+
+def slots(node):
+    """Yields attributes of <node> and elements of its list attributes as triples
+    of the object holding them, key and value."""
+    for name, value in vars(node).items():
+        if isinstance(value, list):
+            for i, element in enumerate(value):
+                yield value, i, element
+        else:
+            yield node, name, value
+
+
+def set_slot(container, key, value):
+    if isinstance(container, list):
+        container[key] = value
+    else:
+        setattr(container, key, value)
+
+
+def split_expression(root, limit):
+    """Splits subexpressions of <root> at least <limit> deep into temporaries.
+    Returns the new root and nodes below the expression (lists, ranges and
+    identifiers), which start expressions of their own."""
+    boundary = []
+    # Expressions in preorder, each with slots of its subexpressions
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        children = []
+        for container, key, child in slots(node):
+            if isinstance(child, Expression):
+                children.append((container, key, child))
+                stack.append(child)
+            elif isinstance(child, Node):
+                boundary.append(child)
+        order.append((node, children))
+
+    heights = {}
+    temporaries = []
+    # Subexpressions come before the expressions containing them
+    for node, children in reversed(order):
+        height = 1
+        for container, key, child in children:
+            child_height = heights[id(child)]
+            if child_height >= limit:
+                set_slot(container, key, Temporary(len(temporaries), child))
+                temporaries.append(child)
+                child_height = 1
+            height = max(height, child_height + 1)
+        heights[id(node)] = height
+    if temporaries:
+        root = DeepExpression(root, temporaries)
+    return root, boundary
+
+
+def split_deep_expressions(tree, limit=DEPTH_LIMIT):
+    """Splits expressions of <tree> deeper than <limit>, so that visitors can
+    evaluate them recursively regardless of the depth of the program text.
+    Nested statements are left as they are, passes visit them with run_nested."""
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        for container, key, child in list(slots(node)):
+            if isinstance(child, Expression):
+                root, boundary = split_expression(child, limit)
+                if root is not child:
+                    set_slot(container, key, root)
+                stack.extend(boundary)
+            elif isinstance(child, Node):
+                stack.append(child)
+    return tree
+
+
+def run_nested(generator):
+    """Runs <generator> of a pass over a statement, returns what it returns.
+
+    Instead of calling itself for the statements nested in the one it visits,
+    a pass yields generators visiting them, and the yield evaluates to what
+    they return (exceptions they raise are raised there). The generators are
+    kept on an explicit stack, so passes visit statements nested however deep
+    without recursing on the Python stack, like Interpreter.execute runs them."""
+    stack = [generator]
+    value = error = None
+    while stack:
+        try:
+            if error is None:
+                nested = stack[-1].send(value)
+            else:
+                error, raised = None, error
+                nested = stack[-1].throw(raised)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        except BaseException as raised:
+            stack.pop()
+            if not stack:
+                raise
+            error = raised
+            continue
+        stack.append(nested)
+        value = None
+    return value
+
+
+class NodeReference:
+    """Index of node in a pickled FlatTree."""
+    __slots__ = ['index']
+
+    def __init__(self, index):
+        self.index = index
+
+
+class FlatTree:
+    """Tree of nodes <root> which is pickled as a list of its nodes with the
+    nodes they refer to replaced by NodeReferences, so that pickling does not
+    recurse as deep as statements are nested. Nodes referred to from several
+    places stay the same object."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def __getstate__(self):
+        nodes = [self.root]
+        indices = {id(self.root): 0}
+
+        def reference(value):
+            if isinstance(value, Node):
+                if id(value) not in indices:
+                    indices[id(value)] = len(nodes)
+                    nodes.append(value)
+                return NodeReference(indices[id(value)])
+            if isinstance(value, (list, tuple)):
+                return type(value)(reference(element) for element in value)
+            return value
+
+        states = []
+        # Nodes are appended while the list is iterated
+        for node in nodes:
+            states.append((type(node), {name: reference(value) for name, value in node.__getstate__().items()}))
+        return states
+
+    def __setstate__(self, states):
+        nodes = [cls.__new__(cls) for cls, _ in states]
+
+        def resolve(value):
+            if isinstance(value, NodeReference):
+                return nodes[value.index]
+            if isinstance(value, (list, tuple)):
+                return type(value)(resolve(element) for element in value)
+            return value
+
+        for node, (_, state) in zip(nodes, states):
+            node.__dict__.update((name, resolve(value)) for name, value in state.items())
+        self.root = nodes[0]
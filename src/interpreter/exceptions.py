@@ -10,3 +10,23 @@ class BreakException(Exception):
 
 class ContinueException(Exception):
     pass
+
+
+# Derives from BaseException, so that no handler in the interpreter stops it
+class ExecutionCancelled(BaseException):
+    pass
+
+
+class ProgramError(Exception):
+    """Error found in a program: <kind> is 'lexical', 'syntax', 'type' or 'runtime'."""
+
+    def __init__(self, kind, message, lineno=None):
+        super().__init__(kind, message, lineno)
+        self.kind = kind
+        self.message = message
+        self.lineno = lineno
+
+    def __str__(self):
+        if self.lineno is None:
+            return self.message
+        return f'{self.message}: line {self.lineno}'
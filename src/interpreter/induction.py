@@ -0,0 +1,72 @@
+from . import ast
+from .deep_expressions import slots
+from .invariants import PURE, statements
+
+# Relations in conditions of counted loops mapped to the direction in which
+# the compared variable has to move for the loop to end
+RELATIONS = {'<': 1, '<=': 1, '>': -1, '>=': -1}
+
+
+def reads(node):
+    """Returns variables read by expression <node>, None if evaluating it may have side effects."""
+    names = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Identifier):
+            names.add(node.name)
+        elif isinstance(node, PURE):
+            stack.extend(child for _, _, child in slots(node) if isinstance(child, ast.Node))
+        else:
+            return None
+    return names
+
+
+def induction_variables(loop):
+    """Returns basic induction variables of <loop>, which it changes only with
+    += and -= by values not changing in it, mapped to these assignments."""
+    assignments = {}
+    for statement in statements(loop.instruction):
+        if isinstance(statement, ast.Assignment):
+            target = statement.left.array if isinstance(statement.left, ast.ArrayElement) else statement.left
+            assignments.setdefault(target.name, []).append(statement)
+        elif isinstance(statement, (ast.For, ast.ParFor)):
+            assignments.setdefault(statement.variable.name, []).append(statement)
+    variables = {}
+    for name, updates in assignments.items():
+        if all(isinstance(update, ast.Assignment) and isinstance(update.left, ast.Identifier)
+               and update.operator in ('+=', '-=') for update in updates):
+            amounts = [reads(update.right) for update in updates]
+            if all(amount is not None and not amount & assignments.keys() for amount in amounts):
+                variables[name] = updates
+    return variables
+
+
+def counted_update(loop):
+    """Returns the only instruction of while loop <loop> if it moves the variable
+    compared in the condition (with a value not changing in the loop) by a
+    constant step, None otherwise."""
+    condition = loop.condition
+    if not (isinstance(condition, ast.BooleanExpression) and condition.operator in RELATIONS
+            and isinstance(condition.left, ast.Identifier)):
+        return None
+    body = loop.instruction
+    if isinstance(body, ast.Block) and isinstance(body.instructions, ast.List) and len(body.instructions.elements) == 1:
+        body = body.instructions.elements[0]
+    updates = induction_variables(loop).get(condition.left.name)
+    if updates != [body]:
+        return None
+    bound = reads(condition.right)
+    if bound is None or condition.left.name in bound:
+        return None
+    return body
+
+
+def lower_counted_loops(program):
+    """Marks while loops of <program> which only step the variable compared in
+    their condition (like while (n > 0) n -= d;) with update, that assignment,
+    so that they can be run in closed form."""
+    if program.instructions_opt is not None:
+        for node in statements(program.instructions_opt):
+            if isinstance(node, ast.While):
+                node.update = counted_update(node)
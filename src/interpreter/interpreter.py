@@ -1,21 +1,60 @@
+import io
 import operator as op
-import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 
 from .ast import *
+from .buffer_pool import BufferPool
+from .deep_expressions import FlatTree
+from .matrix_chain import is_chain, multiply_chain
+from .out_of_core import OutOfCore
+from .output import Output
+from .rope import Rope, plain
+from .shared import SharedMatrix
+from .sparse import SparseMatrix
+from .tiering import TieredLoops
+from .tiling import TiledExecutor
 from .exceptions import *
+from .induction import RELATIONS
 from .memory import *
 from .visit import *
 
-sys.setrecursionlimit(10000)
+MATRIX_TYPES = (np.ndarray, SparseMatrix)
+
+
+def is_integer(value):
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
 
 
 # noinspection PyBroadException
 class Interpreter(object):
 
-    def __init__(self):
+    def __init__(self, dtype=int, sparse_size=None, mmap_mode='c', order_products=True,
+                 workers=None, parallel_size=2 ** 20, out_of_core_size=None, scratch_dir=None, processes=None,
+                 variables=None, output=None, output_buffer_size=2 ** 16, matrix_format='text', profiler=None,
+                 hoist_invariants=True, counted_loops=True, tier_threshold=1000, eliminate_range_checks=True):
         self.memory_stack = MemoryStack()
+        # Ids of attached shared matrices mapped to their handles and the arrays
+        self.shared_matrices = {}
+        # Variables bound before the program starts are put into the global memory
+        for name, value in (variables or {}).items():
+            if isinstance(value, SharedMatrix):
+                handle, value = value, value.attach()
+                self.shared_matrices[id(value)] = (handle, value)
+            self.memory_stack.insert(name, value)
+        # Type of elements of created matrices, float matrices use float_dtype
+        self.dtype = np.dtype(dtype)
+        self.float_dtype = self.dtype if self.dtype.kind == 'f' else np.dtype(float)
+        # Matrices created by eye and zeros having at least that many elements
+        # are sparse, by default (None) there are no sparse matrices
+        self.sparse_size = sparse_size
+        # Mode in which loaded matrices are mapped into memory, by default
+        # assignments to them are not written back to the file
+        self.mmap_mode = mmap_mode
+        # Chains of matrix products are multiplied in the cheapest order
+        self.order_products = order_products
         self.operators = {
             '+': op.add,
             '-': op.sub,
@@ -32,110 +71,637 @@ class Interpreter(object):
             '!=': op.ne,
             '==': op.eq,
         }
+        self.in_place_operators = {
+            '+': np.add,
+            '-': np.subtract,
+            '*': np.multiply,
+            '/': np.true_divide,
+        }
+        # Variables mapped to ids of arrays which are referenced only by them
+        self.owned_arrays = {}
+        self.buffer_pool = BufferPool()
+        # Element-wise operations on arrays having at least parallel_size elements
+        # are split between <workers> threads (by default one per processor)
+        self.tiled = TiledExecutor(workers, parallel_size)
+        # Created matrices having at least out_of_core_size elements are kept in
+        # scratch files in scratch_dir, None turns the out-of-core mode off
+        self.out_of_core = OutOfCore(out_of_core_size, directory=scratch_dir)
+        # Iterations of parfor loops are run by <processes> processes (by default
+        # one per processor), which get interpreters with the same options (worker_options)
+        self.processes = os.cpu_count() if processes is None else processes
+        self.process_pool = None
+        # Function called every checkpoint_interval executed statements and
+        # loop iterations, it lets embedding code pause or stop the program
+        self.checkpoint = None
+        self.checkpoint_interval = 1000
+        self.steps_to_checkpoint = self.checkpoint_interval
+        # Print instructions write to <output> file (None stands for sys.stdout)
+        # through a buffer, which is flushed when the program finishes or pauses
+        self.output = Output(output, output_buffer_size, matrix_format)
+        # Line of the statement being executed
+        self.lineno = None
+        # Values of temporaries of deep expressions being evaluated, innermost last
+        self.temporary_values = []
+        # Statements with statements nested in them mapped to methods returning
+        # generators which run them, see execute
+        self.statement_runners = {
+            Block: self.run_block,
+            For: self.run_for,
+            ParFor: self.run_parfor,
+            While: self.run_while,
+            If: self.run_if,
+        }
+        # Loop invariants (found by the type checker) are evaluated once per run
+        # of their loop, their values are kept until the loop ends
+        self.hoist_invariants = hoist_invariants
+        self.invariant_values = {}
+        # While loops which only step an integer variable until it passes a bound
+        # (found by the type checker) are run in closed form
+        self.counted_loops = counted_loops
+        # Elements of arrays whose indices were checked by the running for
+        # loops (found by the type checker) before they started
+        self.eliminate_range_checks = eliminate_range_checks
+        self.unchecked_elements = set()
+        # Array literals with constant elements mapped to read-only matrices
+        # which are copied when they are evaluated
+        self.array_templates = {}
+        # For and while loops which take tier_threshold back edges are compiled
+        # into functions specialized for the types of their variables, None
+        # keeps the program in the tree walker (which profiled runs need)
+        self.tiers = TieredLoops(self, tier_threshold) if tier_threshold is not None and profiler is None else None
+        # Profiler gets hooked into visit and nested_statement methods only when it is given
+        if profiler is not None:
+            profiler.attach(self)
+
+    def assign_in_place(self, node, right):
+        """Executes operation assignment <node> by overwriting the target array.
+
+        Returns False if the target is not an array which can be safely updated in
+        place or the result would not fit into it (different shape or dtype)."""
+        if isinstance(node.left, Identifier):
+            target = self.memory_stack.get(node.left.name)
+            if not isinstance(target, np.ndarray) or self.owned_arrays.get(node.left.name) != id(target):
+                return False
+        else:
+            array = self.memory_stack.get(node.left.array.name)
+            if not isinstance(array, np.ndarray):
+                return False
+            ids = self.visit(node.left.ids)
+            try:
+                target = array[tuple(slice(idx.start, idx.stop) if isinstance(idx, range) else idx for idx in ids)]
+            except IndexError:
+                raise ProgramError('runtime', 'Wrong indexing', node.lineno)
+            if not isinstance(target, np.ndarray):
+                return False
+
+        ufunc = self.in_place_operators[node.operator[0]]
+        try:
+            # Operands are cast to the type of the result (like integers added to
+            # floats), which has to be the type of the target
+            dtype = ufunc.resolve_dtypes((target.dtype, right.dtype if hasattr(right, 'dtype') else type(right),
+                                          None))[-1]
+            if dtype != target.dtype:
+                return False
+            self.apply_ufunc(ufunc, target, right, out=target, casting='same_kind')
+        except (TypeError, ValueError):
+            return False
+        return True
+
+    def apply_ufunc(self, ufunc, *values, out, **kwargs):
+        """Computes ufunc(*<values>, out=<out>, **<kwargs>), tile by tile if <out> is large."""
+        if self.out_of_core.is_large(out.shape):
+            return self.out_of_core.element_wise(self.tiled, ufunc, *values, out=out, **kwargs)
+        return self.tiled(ufunc, *values, out=out, **kwargs)
+
+    def matmul(self, left, right):
+        if (isinstance(left, np.ndarray) and isinstance(right, np.ndarray) and left.ndim == right.ndim == 2 and
+                left.shape[1] == right.shape[0] and
+                self.out_of_core.is_large(left.shape, right.shape, (left.shape[0], right.shape[1]))):
+            return self.out_of_core.matmul(left, right)
+        return left @ right
+
+    def evaluate_element_wise(self, node):
+        """Evaluates tree of element-wise operations and unary minuses rooted at <node>.
+
+        Returns the value and whether it is a temporary array created during this
+        evaluation. Temporary arrays are reused as outputs of the operations above
+        them and the ones which are not needed anymore go back to the buffer pool,
+        so the whole tree allocates at most one array."""
+        if isinstance(node, MatrixBinaryOperation):
+            operands = [self.evaluate_element_wise(node.left), self.evaluate_element_wise(node.right)]
+            ufunc = self.in_place_operators[node.operator[1]]
+        elif isinstance(node, UnaryMinus):
+            operands = [self.evaluate_element_wise(node.value)]
+            ufunc = np.negative
+        else:
+            return self.visit(node), False
+
+        values = [value for value, _ in operands]
+        try:
+            if (not any(isinstance(value, np.ndarray) for value in values) or
+                    any(isinstance(value, SparseMatrix) for value in values)):
+                raise TypeError('not a dense array operation')
+            dtype = ufunc.resolve_dtypes(tuple(value.dtype if hasattr(value, 'dtype') else type(value)
+                                               for value in values) + (None,))[-1]
+            shape = np.broadcast_shapes(*(np.shape(value) for value in values))
+        except (TypeError, ValueError):
+            # Numbers, sparse matrices or invalid operands, which are handled
+            # (or reported) by the operator itself
+            if len(values) == 1:
+                return -values[0], False
+            return self.operators[node.operator](*values), False
+
+        temporaries = [value for value, is_temporary in operands if is_temporary]
+        reusable = [value for value in temporaries if value.shape == shape and value.dtype == dtype]
+        if reusable:
+            out = reusable[0]
+        elif self.out_of_core.is_large(shape):
+            out = self.out_of_core.empty(shape, dtype)
+        else:
+            out = self.buffer_pool.get(shape, dtype)
+        self.apply_ufunc(ufunc, *values, out=out)
+        for value in temporaries:
+            # Scratch files are freed instead of being kept in the pool
+            if value is not out and not self.out_of_core.is_large(value.shape):
+                self.buffer_pool.put(value)
+        return out, True
+
+    def track_ownership(self, node, value):
+        """Updates owned_arrays after assignment <node> of <value> to a variable."""
+        # Result of operation assignment is always a new object, while plain
+        # assignment may bind the data (or a view of the data) of another variable
+        right = node.right.expression if isinstance(node.right, DeepExpression) else node.right
+        is_new = node.operator != '=' or not isinstance(right, (Identifier, Transpose, ArrayElement))
+        if not is_new:
+            source = right
+            while isinstance(source, Transpose):
+                source = source.value
+            if isinstance(source, ArrayElement):
+                source = source.array
+            if isinstance(source, Identifier):
+                self.owned_arrays.pop(source.name, None)
+            elif isinstance(source, Temporary):
+                # Transposes of a long chain may view any variable
+                self.owned_arrays.clear()
+
+        if is_new and isinstance(value, np.ndarray):
+            self.owned_arrays[node.left.name] = id(value)
+        else:
+            self.owned_arrays.pop(node.left.name, None)
 
     @on('node')
     def visit(self, node):
         pass
 
+    def execute(self, statements):
+        """Runs generator <statements> of a statement with the statements nested in it.
+
+        Generators of statement_runners yield the nested statements which they
+        run, the ones having nested statements of their own get generators too.
+        The generators are kept on an explicit stack, so statements nested
+        however deep never recurse on the Python stack. Exceptions raised by
+        nested statements (errors, break, continue and return) are thrown into
+        the generators of the enclosing ones."""
+        runners = self.statement_runners
+        nested_statement = self.nested_statement
+        stack = [statements]
+        error = None
+        while stack:
+            try:
+                if error is None:
+                    nested = next(stack[-1])
+                else:
+                    error, raised = None, error
+                    nested = stack[-1].throw(raised)
+            except StopIteration:
+                stack.pop()
+                continue
+            except BaseException as raised:
+                stack.pop()
+                if not stack:
+                    raise
+                error = raised
+                continue
+            if type(nested) in runners:
+                stack.append(nested_statement(nested))
+            else:
+                try:
+                    self.visit(nested)
+                except BaseException as raised:
+                    error = raised
+
+    def nested_statement(self, node):
+        """Returns generator running statement <node> nested in the executed one."""
+        return self.statement_runners[type(node)](node)
+
+    def run_instructions(self, node):
+        """Runs instructions <node> (None if there are none), yielding the ones
+        which have statements nested in them."""
+        if node is None:
+            return
+        runners = self.statement_runners
+        for element in node.elements:
+            self.step()
+            self.lineno = element.lineno
+            if type(element) in runners:
+                yield element
+            else:
+                self.visit(element)
+
     # Instructions
     @when(Block)
     def visit(self, node):
-        self.visit(node.instructions)
+        self.execute(self.run_block(node))
+
+    def run_block(self, node):
+        return self.run_instructions(node.instructions)
 
     @when(Assignment)
     def visit(self, node):
         right = self.visit(node.right)
 
         if len(node.operator) == 2:  # operator of type: +=, -=, *=, /=
-            left = self.visit(node.left)
-            try:
-                right = self.operators[node.operator[0]](left, right)
-            except:
-                print(f'Runtime error: Invalid types {type(left)} {type(right)} with {node.operator}: line {node.lineno}')
-                sys.exit(0)
+            # Unchecked elements are numbers, which are never updated in place
+            if node.left not in self.unchecked_elements and self.assign_in_place(node, right):
+                return
+            right = self.operation_assignment(node, self.visit(node.left), right)
 
         if isinstance(node.left, Identifier):
             self.memory_stack.insert(node.left.name, right)
+            self.track_ownership(node, right)
+        elif node.left in self.unchecked_elements:
+            self.memory_stack.get(node.left.array.name)[self.bounded_index(node.left)] = right
         else:
             self.visit(node.left)
             ids = self.visit(node.left.ids)
             array = self.memory_stack.get(node.left.array.name)
-
-            if isinstance(array, str):
-                if len(ids) == 2:
-                    if ids[0] != 0:
-                        print(f'Runtime error: Wrong indexing: line {node.lineno}')
-                        sys.exit(0)
-                    else:
-                        ids = ids[1]
-                if isinstance(ids[0], range):
-                    fst_idx = ids[0].start
-                    snd_idx = ids[0].stop
+            stored = self.store_element(node, array, ids, right)
+            if stored is not array:
+                self.memory_stack.insert(node.left.array.name, stored)
+
+    def operation_assignment(self, node, left, right):
+        """Returns value which operation assignment <node> gives <left> updated with <right>."""
+        try:
+            return self.operators[node.operator[0]](left, right)
+        except:
+            raise ProgramError('runtime', f'Invalid types {type(plain(left))} {type(plain(right))} with {node.operator}',
+                               node.lineno)
+
+    def store_element(self, node, array, ids, right):
+        """Assigns <right> to elements <ids> of <array> for assignment <node>.
+
+        Returns the array holding the result, which is a new one for strings.
+        Sparse matrices stay sparse however dense they get, as other variables
+        may refer to them."""
+        if isinstance(array, (str, Rope)):
+            if len(ids) == 2:
+                if ids[0] != 0:
+                    raise ProgramError('runtime', 'Wrong indexing', node.lineno)
+                else:
+                    ids = ids[1]
+            if isinstance(ids[0], range):
+                fst_idx = ids[0].start
+                snd_idx = ids[0].stop
+            else:
+                fst_idx = ids[0]
+                snd_idx = fst_idx + 1
+            try:
+                if isinstance(array, Rope):
+                    result = array.splice(fst_idx, snd_idx, right)
                 else:
-                    fst_idx = ids[0]
-                    snd_idx = fst_idx + 1
-                try:
                     result = array[:fst_idx] + right + array[snd_idx:]
-                except IndexError:
-                    print(f'Runtime error: Wrong indexing: line {node.lineno}')
-                    sys.exit(0)
-                self.memory_stack.insert(node.left.array.name, result)
+            except IndexError:
+                raise ProgramError('runtime', 'Wrong indexing', node.lineno)
+            return result
+        if len(ids) == 2:
+            if isinstance(ids[0], range):
+                fst_idx = slice(ids[0].start, ids[0].stop)
             else:
-                if len(ids) == 2:
-                    if isinstance(ids[0], range):
-                        fst_idx = slice(ids[0].start, ids[0].stop)
-                    else:
-                        fst_idx = ids[0]
-                    if isinstance(ids[1], range):
-                        snd_idx = slice(ids[1].start, ids[1].stop)
+                fst_idx = ids[0]
+            if isinstance(ids[1], range):
+                snd_idx = slice(ids[1].start, ids[1].stop)
+            else:
+                snd_idx = ids[1]
+            index = (fst_idx, snd_idx)
+        else:
+            index = tuple(ids)
+        if isinstance(array, np.ndarray) and not array.flags.writeable:
+            raise ProgramError('runtime', f'Cannot assign to read-only matrix {node.left.array.name}',
+                               node.lineno)
+        try:
+            array[index] = right
+        except IndexError:
+            raise ProgramError('runtime', 'Wrong indexing', node.lineno)
+        return array
+
+    def global_variables(self):
+        """Returns global variables of the program, with ropes turned into str."""
+        return {name: plain(value) for name, value in self.memory_stack.stack[0].variables.items()}
+
+    def step(self, count=1):
+        """Counts <count> executed statements or loop iterations, calls checkpoint
+        if it is due. Checkpoints passed by loops run in closed form are made
+        once, the next one is due as if each of them was made."""
+        if self.checkpoint is not None:
+            self.steps_to_checkpoint -= count
+            if self.steps_to_checkpoint <= 0:
+                overshoot = -self.steps_to_checkpoint
+                self.steps_to_checkpoint = self.checkpoint_interval - overshoot % self.checkpoint_interval
+                self.checkpoint()
+
+    def forget_invariants(self, loop):
+        """Drops values of invariants of <loop>, which has ended."""
+        for invariant in getattr(loop, 'invariants', ()):
+            self.invariant_values.pop(invariant, None)
+
+    def run_loop(self, node, iterations, sliced_rows=None):
+        """Runs iterations <iterations> of for (or parfor) loop <node>, yielding
+        its body (see execute).
+
+        If <sliced_rows> is given, rows of arrays written by parfor loop are
+        collected in it after each iteration."""
+        # Scopes which never create variables (marked by the type checker) are
+        # not given memories of their own
+        scoped = getattr(node, 'new_scope', True)
+        if scoped:
+            self.memory_stack.push('for_loop')
+        name = node.variable.name
+        # Variables of the memory holding the loop variable, which is found in
+        # the first iteration, later ones assign it directly
+        variables = None
+        # Back edges left before the loop is compiled, parfor loops never are
+        tiers = self.tiers if type(node) is For and sliced_rows is None else None
+        budget = -1
+        try:
+            if tiers is not None:
+                if tiers.run(node, iterations):
+                    return
+                budget = tiers.budget(node)
+            if getattr(node, 'bounded', None) and self.eliminate_range_checks:
+                self.check_bounds(node, iterations)
+            for i in iterations:
+                self.step()
+                if variables is None:
+                    self.memory_stack.insert(name, i)
+                    variables = self.memory_stack.memory_of(name).variables
+                else:
+                    variables[name] = i
+                try:
+                    yield node.instruction
+                except BreakException:
+                    break
+                except ContinueException:
+                    pass
+                if sliced_rows is not None:
+                    for name in node.sliced:
+                        sliced_rows[name][i] = np.array(self.memory_stack.get(name)[i])
+                if budget > 0:
+                    budget -= 1
+                    if not budget and tiers.promote(node, range(i + 1, iterations.stop)):
+                        break
+        finally:
+            if budget > 0:
+                tiers.budgets[node] = budget
+            # Memories are popped also when break or return leaves the scope
+            if scoped:
+                self.memory_stack.pop()
+            self.forget_invariants(node)
+            self.unchecked_elements.difference_update(getattr(node, 'bounded', ()))
+
+    def check_bounds(self, node, iterations):
+        """Adds elements bounded by for loop <node> whose indices are within the
+        dimensions of their arrays in all <iterations> to unchecked_elements."""
+        if not iterations:
+            return
+        variable = node.variable.name
+        for element in node.bounded:
+            try:
+                array = self.memory_stack.get(element.array.name)
+                if not (isinstance(array, np.ndarray) and array.ndim == len(element.indices)):
+                    continue
+                if element.written and not array.flags.writeable:
+                    continue
+                for (name, offset), size in zip(element.indices, array.shape):
+                    if name == variable:
+                        low, high = iterations.start + offset, iterations[-1] + offset
                     else:
-                        snd_idx = ids[1]
-                    try:
-                        array[fst_idx, snd_idx] = right
-                    except IndexError:
-                        print(f'Runtime error: Wrong indexing: line {node.lineno}')
-                        sys.exit(0)
+                        value = offset if name is None else self.memory_stack.get(name)
+                        if not is_integer(value):
+                            break
+                        low = high = value if name is None else value + offset
+                    if low < -size or high >= size:
+                        break
                 else:
-                    try:
-                        array[tuple(ids)] = right
-                    except IndexError:
-                        print(f'Runtime error: Wrong indexing: line {node.lineno}')
-                        sys.exit(0)
+                    self.unchecked_elements.add(element)
+            except KeyError:
+                # Variables which are not bound fail when the element is accessed
+                pass
+
+    def bounded_index(self, node):
+        """Returns index of unchecked element <node> into its array."""
+        get = self.memory_stack.get
+        return tuple(offset if name is None else get(name) + offset for name, offset in node.indices)
+
+    def run_counted_loop(self, node, update):
+        """Runs while loop <node>, whose body only steps the compared variable with
+        <update>, in closed form.
+
+        Returns False if the values are not integers or the loop would never end,
+        then it has to run iteration by iteration."""
+        value = self.visit(node.condition.left)
+        distance = self.counted_distance(node, value, self.visit(node.condition.right))
+        if distance is None:
+            return False
+        result = self.counted_result(node, distance, value, self.visit(update.right))
+        if result is None:
+            return False
+        self.memory_stack.insert(update.left.name, result)
+        self.owned_arrays.pop(update.left.name, None)
+        return True
+
+    def counted_distance(self, node, value, bound):
+        """Returns how far <value> of the variable compared in the condition of
+        counted loop <node> is from <bound>, None if they are not integers or
+        the loop does not start (then it is left to be run iteration by iteration)."""
+        if not (self.counted_loops and is_integer(value) and is_integer(bound)):
+            return None
+        distance = (int(bound) - int(value)) * RELATIONS[node.condition.operator]
+        strict = len(node.condition.operator) == 1
+        if distance < 0 or strict and distance == 0:
+            return None
+        return distance
+
+    def counted_result(self, node, distance, value, step):
+        """Returns value which the variable of counted loop <node> starting at
+        <value> <distance> from the bound ends with, when it is moved by <step>,
+        and counts the iterations. Returns None if the step is not an integer or
+        the loop would never end."""
+        update = node.update
+        if not is_integer(step):
+            return None
+        direction = RELATIONS[node.condition.operator]
+        stride = (int(step) if update.operator == '+=' else -int(step)) * direction
+        if stride <= 0:
+            return None
+        iterations = -(-distance // stride) if len(node.condition.operator) == 1 else distance // stride + 1
+        result = int(value) + stride * iterations * direction
+        if isinstance(value, np.integer) or isinstance(step, np.integer):
+            result = np.result_type(value, step).type(result)
+        if update is node.instruction:
+            self.step(iterations)
+        else:
+            # Iterations of a block body count also its statement
+            self.step(2 * iterations)
+            self.lineno = update.lineno
+        return result
+
+    def worker_options(self):
+        """Returns options of interpreters running iterations of parfor loops in
+        processes, read from this interpreter, which they run single threaded."""
+        return dict(dtype=self.dtype, sparse_size=self.sparse_size, mmap_mode=self.mmap_mode,
+                    order_products=self.order_products, workers=1, parallel_size=self.tiled.threshold,
+                    out_of_core_size=self.out_of_core.threshold, scratch_dir=self.out_of_core.directory,
+                    processes=1, output_buffer_size=self.output.buffer_size, matrix_format=self.output.matrix_format,
+                    hoist_invariants=self.hoist_invariants, counted_loops=self.counted_loops,
+                    tier_threshold=None if self.tiers is None else self.tiers.threshold,
+                    eliminate_range_checks=self.eliminate_range_checks)
+
+    @staticmethod
+    def run_parfor_chunk(options, tree, iterations, environment):
+        """Runs iterations <iterations> of parfor loop (root of FlatTree <tree>)
+        in a new interpreter with options <options> and variables <environment>.
+
+        Returns printed (encoded) output, values of reduction variables, rows
+        written to sliced arrays and ProgramError which stopped the iterations
+        (or None)."""
+        node = tree.root
+        output = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        interpreter = Interpreter(**options, variables=environment, output=output)
+        sliced_rows = {name: {} for name in node.sliced}
+        error = None
+        try:
+            interpreter.execute(interpreter.run_loop(node, iterations, sliced_rows))
+        except ProgramError as program_error:
+            error = program_error
+        interpreter.output.flush()
+        reductions = {name: interpreter.memory_stack.get(name) for name in node.reduction_operators}
+        return output.buffer.getvalue(), reductions, sliced_rows, error
+
+    @staticmethod
+    def reduction_identity(value, operator):
+        """Returns value which does not change <value> when combined with it by <operator>."""
+        if operator == '*':
+            return 1
+        return Rope() if isinstance(value, (str, Rope)) else 0
 
     @when(For)
     def visit(self, node):
-        self.memory_stack.push('for_loop')
-        loop_range = self.visit(node.range)
-        for i in loop_range:
-            self.memory_stack.insert(node.variable.name, i)
-            try:
-                self.visit(node.instruction)
-            except BreakException:
-                break
-            except ContinueException:
-                pass
-        self.memory_stack.pop()
+        self.execute(self.run_for(node))
+
+    def run_for(self, node):
+        return self.run_loop(node, self.visit(node.range))
+
+    @when(ParFor)
+    def visit(self, node):
+        self.execute(self.run_parfor(node))
+
+    def run_parfor(self, node):
+        iterations = self.visit(node.range)
+        chunk_count = min(len(iterations), 4 * self.processes)
+        if self.processes < 2 or chunk_count < 2 or \
+                not all(isinstance(self.memory_stack.get(name), MATRIX_TYPES) for name in node.sliced):
+            yield from self.run_loop(node, iterations)
+            return
+
+        environment = {name: self.memory_stack.get(name) for name in node.free_variables}
+        # Workers attach shared matrices instead of getting their copies
+        for name, value in environment.items():
+            if id(value) in self.shared_matrices:
+                environment[name] = self.shared_matrices[id(value)][0]
+        reductions = {}
+        for name, operator in node.reduction_operators.items():
+            reductions[name] = environment[name]
+            environment[name] = self.reduction_identity(environment[name], operator)
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(self.processes)
+        # Forked workers would print what is left in the buffer once more
+        self.output.flush()
+        # Iterations are split in the same way regardless of scheduling, so
+        # reductions are combined in the same order every time
+        bounds = [len(iterations) * k // chunk_count for k in range(chunk_count + 1)]
+        # Deeply nested loop bodies are pickled without deep recursion
+        tree = FlatTree(node)
+        options = self.worker_options()
+        futures = [self.process_pool.submit(self.run_parfor_chunk, options, tree, iterations[start:stop], environment)
+                   for start, stop in zip(bounds, bounds[1:])]
+
+        for future in futures:
+            output, partial_reductions, sliced_rows, error = future.result()
+            self.output.write_bytes(output)
+            if error is not None:
+                raise error
+            for name, value in partial_reductions.items():
+                reductions[name] = self.operators[node.reduction_operators[name]](reductions[name], value)
+            for name, rows in sliced_rows.items():
+                array = self.memory_stack.get(name)
+                for i, row in rows.items():
+                    array[i] = row
+        for name, value in reductions.items():
+            self.memory_stack.insert(name, value)
+            self.owned_arrays.pop(name, None)
 
     @when(While)
     def visit(self, node):
-        self.memory_stack.push('while_loop')
-        while self.visit(node.condition):
-            try:
-                self.visit(node.instruction)
-            except BreakException:
-                break
-            except ContinueException:
-                pass
-        self.memory_stack.pop()
+        self.execute(self.run_while(node))
+
+    def run_while(self, node):
+        scoped = getattr(node, 'new_scope', True)
+        if scoped:
+            self.memory_stack.push('while_loop')
+        budget = -1
+        try:
+            update = getattr(node, 'update', None)
+            if update is not None and self.counted_loops and self.run_counted_loop(node, update):
+                return
+            if self.tiers is not None:
+                if self.tiers.run(node):
+                    return
+                budget = self.tiers.budget(node)
+            while self.visit(node.condition):
+                self.step()
+                try:
+                    yield node.instruction
+                except BreakException:
+                    break
+                except ContinueException:
+                    pass
+                if budget > 0:
+                    budget -= 1
+                    if not budget and self.tiers.promote(node):
+                        break
+        finally:
+            if budget > 0:
+                self.tiers.budgets[node] = budget
+            if scoped:
+                self.memory_stack.pop()
+            self.forget_invariants(node)
 
     @when(If)
     def visit(self, node):
-        self.memory_stack.push('if')
-        if self.visit(node.condition):
-            self.visit(node.if_block)
-        elif node.else_block is not None:
-            self.visit(node.else_block)
-        self.memory_stack.pop()
+        self.execute(self.run_if(node))
+
+    def run_if(self, node):
+        scoped = getattr(node, 'new_scope', True)
+        if scoped:
+            self.memory_stack.push('if')
+        try:
+            if self.visit(node.condition):
+                yield node.if_block
+            elif node.else_block is not None:
+                yield node.else_block
+        finally:
+            if scoped:
+                self.memory_stack.pop()
 
     @when(Break)
     def visit(self, node):
@@ -152,13 +718,52 @@ class Interpreter(object):
     @when(Print)
     def visit(self, node):
         visited_args = self.visit(node.args)
-        print(', '.join([str(arg) for arg in visited_args]))
+        self.output.print_values(visited_args)
+
+    @when(Save)
+    def visit(self, node):
+        self.save(node, self.visit(node.filename), self.visit(node.value))
+
+    def save(self, node, filename, value):
+        """Writes <value> to file <filename> for save instruction <node>. It is
+        written to a new file which then replaces <filename>, so that saving a
+        matrix loaded (mapped) from the same file does not truncate it."""
+        filename = str(filename)
+        if not isinstance(value, SparseMatrix) and not filename.endswith('.npy'):
+            # Named like np.save names files
+            filename += '.npy'
+        # Processes of parfor loops may save at the same time
+        path = f'{filename}.{os.getpid()}.tmp'
+        try:
+            if isinstance(value, SparseMatrix):
+                # Only non-zero elements are written, the rest of the file stays empty
+                array = np.lib.format.open_memmap(path, mode='w+', dtype=value.dtype, shape=value.shape)
+                rows, cols, data = value.coordinates()
+                array[rows, cols] = data
+                array.flush()
+                del array
+            else:
+                with open(path, 'wb') as file:
+                    np.save(file, value)
+            os.replace(path, filename)
+        except OSError as error:
+            if os.path.exists(path):
+                os.remove(path)
+            raise ProgramError('runtime', f'Cannot save {filename}: {error}', node.lineno)
 
     @when(ArrayElement)
     def visit(self, node):
-        array = self.visit(node.array)
-        ids = self.visit(node.ids)
-        if isinstance(array, str):
+        return self.element(node, self.visit(node.array), self.visit(node.ids))
+
+    @when(BoundedElement)
+    def visit(self, node):
+        if node in self.unchecked_elements:
+            return self.memory_stack.get(node.array.name)[self.bounded_index(node)]
+        return self.element(node, self.visit(node.array), self.visit(node.ids))
+
+    def element(self, node, array, ids):
+        """Returns elements <ids> of <array> read by <node>."""
+        if isinstance(array, (str, Rope)):
             if len(ids) == 2:
                 ids = ids[1]
             else:
@@ -172,8 +777,7 @@ class Interpreter(object):
             try:
                 result = array[start:end]
             except IndexError:
-                print(f'Runtime error: Wrong indexing: line {node.lineno}')
-                sys.exit(0)
+                raise ProgramError('runtime', 'Wrong indexing', node.lineno)
             return result
         else:
             if len(ids) == 2:
@@ -188,15 +792,13 @@ class Interpreter(object):
                 try:
                     result = array[fst_idx, snd_idx]
                 except IndexError:
-                    print(f'Runtime error: Wrong indexing: line {node.lineno}')
-                    sys.exit(0)
+                    raise ProgramError('runtime', 'Wrong indexing', node.lineno)
                 return result
             else:
                 try:
                     result = array[tuple(ids)]
                 except IndexError:
-                    print(f'Runtime error: Wrong indexing: line {node.lineno}')
-                    sys.exit(0)
+                    raise ProgramError('runtime', 'Wrong indexing', node.lineno)
                 return result
 
     # Expressions
@@ -210,27 +812,79 @@ class Interpreter(object):
 
     @when(String)
     def visit(self, node):
-        return node.value
+        return Rope.from_str(node.value)
 
     @when(Array)
     def visit(self, node):
-        return np.array(self.visit(node.list))
+        if hasattr(node, 'values'):
+            return self.literal(node)
+        return self.make_array(self.visit(node.list))
+
+    def literal(self, node):
+        """Returns new matrix of array literal <node> with constant elements, a
+        copy of its template built the first time it is evaluated."""
+        template = self.array_templates.get(node)
+        if template is None:
+            template = self.array_templates[node] = self.constant_array(node.values)
+            template.flags.writeable = False
+        return template.copy()
+
+    def constant_array(self, values):
+        """Returns matrix of nested tuples <values> of an array literal, built as
+        if its elements were evaluated."""
+        return self.make_array([self.constant_array(value) if isinstance(value, tuple) else value
+                                for value in values])
+
+    def make_array(self, elements):
+        """Returns matrix of nested lists <elements>."""
+        array = np.array(elements)
+        if array.dtype.kind == 'i':
+            return array.astype(self.dtype, copy=False)
+        elif array.dtype.kind == 'f':
+            return array.astype(self.float_dtype, copy=False)
+        return array
+
+    def product_operands(self, node):
+        """Returns operands of chain of products <node>, e.g. [A, B, C] for A * B * C."""
+        if isinstance(node, NumberBinaryOperation) and node.operator == '*':
+            return self.product_operands(node.left) + self.product_operands(node.right)
+        return [node]
+
+    def multiply(self, node, values):
+        """Computes chain of products <node> in its own order, taking values of
+        operands from iterator <values>."""
+        if isinstance(node, NumberBinaryOperation) and node.operator == '*':
+            left = self.multiply(node.left, values)
+            right = self.multiply(node.right, values)
+            return self.binary_operation('*', left, right)
+        return next(values)
+
+    def binary_operation(self, operator, left, right):
+        if isinstance(left, MATRIX_TYPES) and isinstance(right, MATRIX_TYPES) and operator == '*':
+            return self.matmul(left, right)
+
+        return self.operators[operator](left, right)
+
+    def product(self, node, values):
+        """Multiplies <values> of operands of chain of products <node>."""
+        if self.order_products and all(isinstance(value, MATRIX_TYPES) for value in values) and is_chain(values):
+            return multiply_chain(values, self.matmul)
+        return self.multiply(node, iter(values))
 
     @when(NumberBinaryOperation)
     def visit(self, node):
+        if node.operator == '*' and self.order_products:
+            operands = self.product_operands(node)
+            if len(operands) > 2:
+                return self.product(node, [self.visit(operand) for operand in operands])
+
         left = self.visit(node.left)
         right = self.visit(node.right)
-
-        if isinstance(left, np.ndarray) and isinstance(right, np.ndarray) and node.operator == '*':
-            return left @ right
-
-        return self.operators[node.operator](left, right)
+        return self.binary_operation(node.operator, left, right)
 
     @when(MatrixBinaryOperation)
     def visit(self, node):
-        left = self.visit(node.left)
-        right = self.visit(node.right)
-        return self.operators[node.operator](left, right)
+        return self.evaluate_element_wise(node)[0]
 
     @when(BooleanExpression)
     def visit(self, node):
@@ -240,34 +894,84 @@ class Interpreter(object):
 
     @when(MatrixFunction)
     def visit(self, node):
-        parameter = self.visit(node.parameter)
+        return self.matrix_function(node, self.visit(node.parameter))
+
+    def matrix_function(self, node, parameter):
+        """Returns matrix created by <node> with dimensions <parameter>."""
         num_rows = parameter[0]
         num_cols = parameter[1] if len(parameter) > 1 else None
+        # Type checker marks matrices which later get float elements
+        dtype = self.float_dtype if getattr(node, 'element_type', None) == 'FLOATNUM' else self.dtype
+        is_sparse = self.sparse_size is not None and num_rows * (num_cols if num_cols is not None else num_rows) >= self.sparse_size
+        shape = (num_rows, num_cols) if num_cols is not None else (num_rows,)
         if node.function == 'eye':
-            return np.eye(num_rows, dtype=int)
+            if is_sparse:
+                return SparseMatrix.eye(num_rows, dtype=dtype)
+            if self.out_of_core.is_large((num_rows, num_rows)):
+                return self.out_of_core.eye(num_rows, dtype)
+            return np.eye(num_rows, dtype=dtype)
         elif node.function == 'ones':
-            if num_cols is not None:
-                return np.ones((num_rows, num_cols), dtype=int)
-            else:
-                return np.ones(num_rows, dtype=int)
+            if self.out_of_core.is_large(shape):
+                return self.out_of_core.full(shape, 1, dtype)
+            return np.ones(shape, dtype=dtype)
         elif node.function == 'zeros':
-            if num_cols is not None:
-                return np.zeros((num_rows, num_cols), dtype=int)
-            else:
-                return np.zeros(num_rows, dtype=int)
+            if num_cols is not None and is_sparse:
+                return SparseMatrix(shape, dtype=dtype)
+            if self.out_of_core.is_large(shape):
+                return self.out_of_core.full(shape, 0, dtype)
+            return np.zeros(shape, dtype=dtype)
+
+    @when(Load)
+    def visit(self, node):
+        return self.load(node, self.visit(node.filename))
+
+    def load(self, node, filename):
+        """Returns matrix read from file <filename> by <node>."""
+        filename = str(filename)
+        try:
+            return np.load(filename, mmap_mode=self.mmap_mode)
+        except (OSError, ValueError) as error:
+            raise ProgramError('runtime', f'Cannot load {filename}: {error}', node.lineno)
 
     @when(UnaryMinus)
     def visit(self, node):
-        return -self.visit(node.value)
+        return self.evaluate_element_wise(node)[0]
 
     @when(Transpose)
     def visit(self, node):
         return self.visit(node.value).T
 
+    @when(DeepExpression)
+    def visit(self, node):
+        values = []
+        self.temporary_values.append(values)
+        try:
+            for temporary in node.temporaries:
+                values.append(self.visit(temporary))
+            return self.visit(node.expression)
+        finally:
+            self.temporary_values.pop()
+
+    @when(Temporary)
+    def visit(self, node):
+        return self.temporary_values[-1][node.index]
+
+    @when(LoopInvariant)
+    def visit(self, node):
+        if not self.hoist_invariants:
+            return self.visit(node.expression)
+        value = self.invariant_values.get(node)
+        if value is None:
+            value = self.invariant_values[node] = self.visit(node.expression)
+        return value
+
     # Other
     @when(Program)
     def visit(self, node):
-        self.visit(node.instructions_opt)
+        try:
+            self.execute(self.run_instructions(node.instructions_opt))
+        finally:
+            self.output.flush()
 
     @when(Identifier)
     def visit(self, node):
@@ -284,6 +988,8 @@ class Interpreter(object):
         visited_list = []
         for element in node.elements:
             element = self.visit(element)
+            if isinstance(element, Rope):
+                element = str(element)
             visited_list.append(element)
         return visited_list
 
@@ -305,5 +1011,4 @@ class Interpreter(object):
 
     @when(Instructions)
     def visit(self, node):
-        for element in node.elements:
-            self.visit(element)
+        self.execute(self.run_instructions(node))
@@ -0,0 +1,168 @@
+from . import ast
+from .deep_expressions import run_nested, set_slot, slots
+
+# Operations hoisted out of loops in which their operands do not change
+HOISTED = (ast.NumberBinaryOperation, ast.MatrixBinaryOperation, ast.Transpose, ast.MatrixFunction)
+# Nodes hoisted operations can be made of, evaluating them has no side effects
+PURE = HOISTED + (ast.UnaryMinus, ast.IntNum, ast.FloatNum, ast.Identifier, ast.List)
+LOOPS = (ast.For, ast.ParFor, ast.While)
+
+
+def statements(node):
+    """Yields instruction <node> and all instructions nested in it."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.List):
+            stack.extend(node.elements)
+        elif isinstance(node, ast.Block):
+            stack.append(node.instructions)
+        elif node is not None:
+            yield node
+            if isinstance(node, ast.If):
+                stack.extend([node.if_block, node.else_block])
+            elif isinstance(node, LOOPS):
+                stack.append(node.instruction)
+
+
+def is_product(node):
+    return isinstance(node, ast.NumberBinaryOperation) and node.operator == '*'
+
+
+class Aliases:
+    """Groups of variables of <program> which may share data, because one of
+    them was assigned another one or a view of it (a transpose or a slice)."""
+
+    def __init__(self, program):
+        self.parents = {}
+        for node in statements(program.instructions_opt):
+            if isinstance(node, ast.Assignment) and node.operator == '=' and isinstance(node.left, ast.Identifier):
+                source = node.right.expression if isinstance(node.right, ast.DeepExpression) else node.right
+                while isinstance(source, (ast.Transpose, ast.Temporary)):
+                    source = source.value if isinstance(source, ast.Transpose) else source.expression
+                if isinstance(source, ast.ArrayElement):
+                    source = source.array
+                if isinstance(source, ast.Identifier):
+                    self.parents[self.find(node.left.name)] = self.find(source.name)
+        self.groups = {}
+        for name in set(self.parents) | set(self.parents.values()):
+            self.groups.setdefault(self.find(name), set()).add(name)
+
+    def find(self, name):
+        root = name
+        while self.parents.get(root, root) != root:
+            root = self.parents[root]
+        while name != root:
+            self.parents[name], name = root, self.parents[name]
+        return root
+
+    def expand(self, names):
+        """Returns variables <names> with all variables which may share data with them."""
+        expanded = set(names)
+        for name in names:
+            expanded |= self.groups.get(self.find(name), set())
+        return expanded
+
+
+class InvariantHoisting:
+    """Wraps operations in loops of <program> which read only variables not
+    written in the loop (or in variables sharing data with them) in
+    LoopInvariant nodes, listed in invariants attribute of the outermost such
+    loop. Values bound to variables (directly or through transposes) are never
+    hoisted, as they are new arrays every time, nor inner products of a chain,
+    which is multiplied in its own order."""
+
+    def __init__(self, program):
+        self.aliases = Aliases(program)
+        # Enclosing loops with variables written in them
+        self.loops = []
+        # Ids of analysed expressions mapped to whether they are pure and the variables they read
+        self.analysed = {}
+        run_nested(self.statement(program.instructions_opt))
+
+    def statement(self, node):
+        """Generator run by run_nested, which yields the nested instructions."""
+        if isinstance(node, ast.List):
+            for instruction in node.elements:
+                yield self.statement(instruction)
+        elif isinstance(node, ast.Block):
+            yield self.statement(node.instructions)
+        elif isinstance(node, ast.Assignment):
+            if isinstance(node.left, ast.ArrayElement):
+                self.expressions(node.left.ids)
+            # Operation assignments only read the value
+            self.place(node, 'right', node.right, node.operator == '=', len(self.loops))
+        elif isinstance(node, ast.If):
+            self.place(node, 'condition', node.condition, False, len(self.loops))
+            yield self.statement(node.if_block)
+            yield self.statement(node.else_block)
+        elif isinstance(node, LOOPS):
+            if not isinstance(node, ast.While):
+                self.expressions(node.range)
+            written = {statement.left.array.name if isinstance(statement.left, ast.ArrayElement)
+                       else statement.left.name
+                       for statement in statements(node) if isinstance(statement, ast.Assignment)}
+            written |= {statement.variable.name for statement in statements(node)
+                        if isinstance(statement, (ast.For, ast.ParFor))}
+            node.invariants = []
+            self.loops.append((node, self.aliases.expand(written)))
+            if isinstance(node, ast.While):
+                self.place(node, 'condition', node.condition, False, len(self.loops))
+            yield self.statement(node.instruction)
+            self.loops.pop()
+        elif isinstance(node, ast.Node):
+            self.expressions(node)
+
+    def expressions(self, node):
+        """Hoists operations from expressions which are attributes of <node>."""
+        for container, key, child in list(slots(node)):
+            if isinstance(child, ast.Node):
+                self.place(container, key, child, False, len(self.loops))
+
+    def analyse(self, node):
+        """Returns whether expression <node> is pure and variables it reads."""
+        result = self.analysed.get(id(node))
+        if result is None:
+            if isinstance(node, ast.Identifier):
+                result = True, {node.name}
+            elif isinstance(node, PURE):
+                pure, reads = True, set()
+                for _, _, child in slots(node):
+                    if isinstance(child, ast.Node):
+                        child_pure, child_reads = self.analyse(child)
+                        pure = pure and child_pure
+                        reads |= child_reads
+                result = pure, reads
+            else:
+                result = False, set()
+            self.analysed[id(node)] = result
+        return result
+
+    def level(self, reads):
+        """Returns index of the outermost enclosing loop not writing <reads>."""
+        for level, (_, written) in enumerate(self.loops):
+            if not reads & written:
+                return level
+        return len(self.loops)
+
+    def place(self, container, key, node, aliased, limit, parent=None):
+        """Hoists expression <node> kept in <container> under <key> (with its
+        subexpressions) to loops outer than the one with index <limit>."""
+        if isinstance(node, ast.Temporary) or not isinstance(node, ast.Node):
+            return
+        if isinstance(node, HOISTED) and not aliased and not (is_product(node) and is_product(parent)):
+            pure, reads = self.analyse(node)
+            level = self.level(reads) if pure else limit
+            if level < limit:
+                invariant = ast.LoopInvariant(node)
+                set_slot(container, key, invariant)
+                self.loops[level][0].invariants.append(invariant)
+                limit = level
+        # Transposes are views, so they are bound to variables as their values are
+        aliased = aliased and isinstance(node, (ast.Transpose, ast.DeepExpression))
+        for child_container, child_key, child in list(slots(node)):
+            self.place(child_container, child_key, child, aliased, limit, node)
+
+
+def hoist_invariants(program):
+    InvariantHoisting(program)
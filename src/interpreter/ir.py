@@ -0,0 +1,226 @@
+class Value:
+    """Value of the intermediate representation, defined once: a constant or
+    the result of an operation. <users> are operations reading it (once per
+    operand)."""
+
+    def __init__(self, type='unknown'):
+        self.type = type
+        self.users = []
+
+
+class Constant(Value):
+    """Value <value> known before the program runs, None stands for a variable
+    read before it is assigned."""
+
+    def __init__(self, value, type=None):
+        super().__init__(type if type is not None else constant_type(value))
+        self.value = value
+
+
+class Operation(Value):
+    """Operation <opcode> of <operands> in a basic block. <node> is the AST node
+    it comes from, <attribute> an opcode specific detail (an operator, a name),
+    <targets> blocks which a terminator (jump, branch, exit or return) leads to."""
+
+    def __init__(self, opcode, operands=(), type='unknown', node=None, attribute=None, targets=()):
+        super().__init__(type)
+        self.opcode = opcode
+        self.operands = []
+        for value in operands:
+            self.add_operand(value)
+        self.node = node
+        self.attribute = attribute
+        self.targets = list(targets)
+        self.block = None
+        # Variables the result was assigned to, for the dump
+        self.names = []
+        # Values of variables before the statement of the operation started,
+        # kept only for lowered loops (see lower_loop)
+        self.state = None
+
+    def add_operand(self, value):
+        self.operands.append(value)
+        value.users.append(self)
+
+    def set_operand(self, index, value):
+        self.operands[index].users.remove(self)
+        self.operands[index] = value
+        value.users.append(self)
+
+    def remove_operand(self, index):
+        self.operands.pop(index).users.remove(self)
+
+    def drop_operands(self):
+        """Removes all operands, before the operation is deleted."""
+        for value in self.operands:
+            value.users.remove(self)
+        self.operands = []
+
+    @property
+    def lineno(self):
+        return getattr(self.node, 'lineno', None)
+
+
+class Phi(Operation):
+    """Value of variable <variable> at the start of <block>, which is its
+    operand for the predecessor of the same index."""
+
+    def __init__(self, block, variable):
+        super().__init__('phi')
+        self.block = block
+        self.variable = variable
+        self.names.append(variable)
+        # Value which replaced the phi, if it turned out to be trivial
+        self.replacement = None
+
+
+class BasicBlock:
+    """Straight-line sequence of operations entered only at the start: phis,
+    other operations and a terminator leading to other blocks.
+
+    <steps> is the number of statements and loop iterations started in the
+    block, which the executed program counts for checkpoints."""
+
+    def __init__(self, name):
+        self.name = name
+        self.phis = []
+        self.operations = []
+        self.terminator = None
+        self.predecessors = []
+        self.steps = 0
+
+    @property
+    def successors(self):
+        return self.terminator.targets if self.terminator is not None else []
+
+    def append(self, operation):
+        operation.block = self
+        self.operations.append(operation)
+        return operation
+
+    def terminate(self, terminator):
+        """Ends the block with <terminator>, adding the block to predecessors of its targets."""
+        terminator.block = self
+        self.terminator = terminator
+        for target in terminator.targets:
+            target.predecessors.append(self)
+        return terminator
+
+    def remove_predecessor(self, block):
+        """Removes edge from predecessor <block> together with its phi operands."""
+        index = self.predecessors.index(block)
+        self.predecessors.pop(index)
+        for phi in self.phis:
+            phi.remove_operand(index)
+
+
+class Function:
+    """Program in SSA form: basic blocks, starting with the entry block."""
+
+    def __init__(self):
+        self.blocks = []
+        self.entry = self.new_block()
+        # Variables bound before the function which it assigns only in new
+        # scopes, they are left in the memory only if they were bound
+        self.scoped = set()
+
+    def new_block(self):
+        block = BasicBlock(f'block{len(self.blocks)}')
+        self.blocks.append(block)
+        return block
+
+    def values(self):
+        """Yields phis and operations of all blocks, in order."""
+        for block in self.blocks:
+            yield from block.phis
+            yield from block.operations
+            if block.terminator is not None:
+                yield block.terminator
+
+    def dump(self):
+        """Returns text of the function, with values numbered in order."""
+        numbers = {}
+        for value in self.values():
+            if value.opcode not in STATEMENTS:
+                numbers[value] = len(numbers)
+
+        def operand(value):
+            if isinstance(value, Constant):
+                return 'undef' if value.value is None else repr(value.value)
+            return f'%{numbers[value]}' if value in numbers else '%?'
+
+        lines = []
+        for block in self.blocks:
+            header = f'{block.name}:'
+            if block.predecessors:
+                header += f'  ; preds {", ".join(predecessor.name for predecessor in block.predecessors)}'
+            if block.steps:
+                header += f'  ; steps {block.steps}'
+            lines.append(header)
+            for value in [*block.phis, *block.operations, block.terminator]:
+                if value is None:
+                    lines.append('    <no terminator>')
+                    continue
+                if isinstance(value, Phi):
+                    arguments = ', '.join(f'[{operand(argument)}, {predecessor.name}]'
+                                          for argument, predecessor in zip(value.operands, block.predecessors))
+                else:
+                    parts = [repr(value.attribute)] if value.attribute is not None else []
+                    parts += [operand(argument) for argument in value.operands]
+                    parts += [target.name for target in value.targets]
+                    arguments = ', '.join(parts)
+                line = f'    {value.opcode} {arguments}'.rstrip()
+                if value.opcode not in STATEMENTS:
+                    line = f'    {operand(value)} = {line.strip()} : {value.type}'
+                notes = ', '.join(value.names + ([f'line {value.lineno}'] if value.lineno is not None else []))
+                lines.append(f'{line}  ; {notes}' if notes else line)
+        return '\n'.join(lines) + '\n'
+
+    def verify(self):
+        """Raises ValueError if the function is not well formed: blocks must end
+        with terminators matching the predecessors of their targets, phis must
+        have an operand per predecessor and operands must be defined in it."""
+        defined = set(self.values())
+        for block in self.blocks:
+            if block.terminator is None:
+                raise ValueError(f'{block.name} has no terminator')
+            for target in block.successors:
+                if target not in self.blocks or block not in target.predecessors:
+                    raise ValueError(f'{block.name} leads to {target.name}, which does not list it as predecessor')
+            for predecessor in block.predecessors:
+                if block not in predecessor.successors:
+                    raise ValueError(f'{predecessor.name} is listed as predecessor of {block.name}')
+            for phi in block.phis:
+                if len(phi.operands) != len(block.predecessors):
+                    raise ValueError(f'phi of {phi.names} in {block.name} has {len(phi.operands)} operands '
+                                     f'for {len(block.predecessors)} predecessors')
+            for value in [*block.phis, *block.operations, block.terminator]:
+                if value.block is not block:
+                    raise ValueError(f'{value.opcode} in {block.name} belongs to another block')
+                for argument in value.operands:
+                    if not isinstance(argument, Constant) and argument not in defined:
+                        raise ValueError(f'{value.opcode} in {block.name} reads a value which is not defined')
+                    if value not in argument.users:
+                        raise ValueError(f'{value.opcode} in {block.name} is not listed as user of its operand')
+
+
+# Opcodes of operations ending blocks
+TERMINATORS = ('jump', 'branch', 'exit', 'return')
+# Opcodes of operations done only for their effects, which have no results
+STATEMENTS = TERMINATORS + ('print', 'save')
+
+
+def constant_type(value):
+    if value is None:
+        return 'undefined'
+    if isinstance(value, bool):
+        return 'bool'
+    return {int: 'int', float: 'float'}.get(type(value), 'unknown')
+
+
+def replace_uses(value, replacement):
+    """Makes all users of <value> read <replacement> instead."""
+    for user in list(value.users):
+        for index, operand in enumerate(user.operands):
+            if operand is value:
+                user.set_operand(index, replacement)
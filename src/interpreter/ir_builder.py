@@ -0,0 +1,534 @@
+import numpy as np
+
+from . import ast
+from .deep_expressions import run_nested, slots
+from .ir import Constant, Function, Operation, Phi, constant_type, replace_uses
+
+__all__ = ['lower_loop', 'lower_program']
+
+# Types found by the type checker mapped to types of values of the IR
+TYPES = {'INTNUM': 'int', 'FLOATNUM': 'float', 'STRING': 'string', 'boolean_expression': 'bool'}
+NUMBERS = ('int', 'float', 'bool')
+
+
+def node_type(node):
+    """Returns type of the value of expression <node> found by the type checker."""
+    in_type = getattr(node, 'in_type', None)
+    if in_type in TYPES:
+        return TYPES[in_type]
+    if in_type == 'array':
+        element = TYPES.get(getattr(node, 'element_type', None), 'unknown')
+        rows, cols = getattr(node, 'num_rows', None), getattr(node, 'num_cols', None)
+        if isinstance(rows, int) and isinstance(cols, int) and rows >= 0 and cols >= 0:
+            return f'matrix<{element},{rows}x{cols}>'
+        return f'matrix<{element}>'
+    return 'unknown'
+
+
+def value_type(value):
+    """Returns type of <value> of a variable bound before the program starts."""
+    if isinstance(value, np.ndarray) and value.ndim == 2:
+        element = {'i': 'int', 'u': 'int', 'f': 'float'}.get(value.dtype.kind, 'unknown')
+        return f'matrix<{element},{value.shape[0]}x{value.shape[1]}>'
+    return constant_type(value)
+
+
+def arithmetic_type(operator, left, right):
+    """Returns type of <left> <operator> <right> computed from types of the operands."""
+    if 'undefined' in (left, right):
+        return 'undefined'
+    if left in NUMBERS and right in NUMBERS:
+        return 'float' if operator == '/' or 'float' in (left, right) else 'int'
+    return left if left == right else 'unknown'
+
+
+def join(types):
+    """Returns type of a value which has one of <types>."""
+    types = set(types) - {'undefined'}
+    if not types:
+        return 'undefined'
+    return types.pop() if len(types) == 1 else 'unknown'
+
+
+def product_operands(node):
+    """Returns operands of chain of products <node>, like Interpreter.product_operands."""
+    if isinstance(node, ast.NumberBinaryOperation) and node.operator == '*':
+        return product_operands(node.left) + product_operands(node.right)
+    return [node]
+
+
+class IRBuilder:
+    """Lowers type checked instruction <node>, before which variables <types>
+    are bound (mapped to types of their values), into a Function in SSA form,
+    following Braun et al., Simple and Efficient Construction of Static Single
+    Assignment Form: values of variables are looked up through predecessors
+    when they are read, and blocks whose predecessors are not all known yet
+    (loop headers) get incomplete phis, which are filled when the block is
+    sealed. Trivial phis are removed at once.
+
+    Bound variables and variables assigned outside of new scopes are passed to
+    the exit and return terminators, which leave them in the memory.
+
+    If <node> is a <loop> lowered alone, a for loop takes its iterations from
+    variable .iterations and operations keep the values of the bound variables
+    before their statements in their state."""
+
+    def __init__(self, node, types=None, loop=None):
+        self.function = Function()
+        self.block = self.function.entry
+        # Variables mapped to blocks mapped to values of the variables in them
+        self.definitions = {}
+        # Blocks mapped to their phis which still miss operands
+        self.incomplete_phis = {}
+        self.sealed = {self.block}
+        # Targets of continue and break of enclosing loops
+        self.loops = []
+        # Values of temporaries of enclosing deep expressions
+        self.temporaries = []
+        self.depth = 0
+        self.globals = {}
+        self.lowered_loop = loop
+        self.parameters = set(types or ())
+        # Hidden variables caching values of loop invariants
+        self.invariants = {}
+        self.state = None
+        self.tracked = sorted(name for name in self.parameters if not name.startswith('.')) if loop else None
+        for name, type in (types or {}).items():
+            self.write(name, self.emit('variable', (), type, attribute=name))
+            self.block.operations[-1].names.append(name)
+        self.snapshot()
+        run_nested(self.statement(node))
+        if self.block is not None:
+            self.finish('exit')
+        self.infer_types()
+
+    # Variables
+    def write(self, name, value, block=None):
+        self.definitions.setdefault(name, {})[block or self.block] = value
+
+    def read(self, name, block=None):
+        block = block or self.block
+        value = self.definitions.get(name, {}).get(block)
+        if value is None:
+            return run_nested(self.read_recursive(name, block))
+        while isinstance(value, Phi) and value.replacement is not None:
+            value = value.replacement
+        return value
+
+    # Values looked up through predecessors are read by generators run by
+    # run_nested, as there may be as many blocks in between as nested statements
+    def read_nested(self, name, block):
+        if block not in self.definitions.get(name, {}):
+            return (yield self.read_recursive(name, block))
+        return self.read(name, block)
+
+    def read_recursive(self, name, block):
+        if block not in self.sealed:
+            value = self.new_phi(block, name)
+            self.incomplete_phis.setdefault(block, []).append(value)
+        elif len(block.predecessors) == 1:
+            value = yield self.read_nested(name, block.predecessors[0])
+        elif not block.predecessors:
+            value = Constant(None)
+        else:
+            value = self.new_phi(block, name)
+            self.write(name, value, block)
+            value = yield self.add_phi_operands(value)
+        self.write(name, value, block)
+        return value
+
+    @staticmethod
+    def new_phi(block, name):
+        phi = Phi(block, name)
+        block.phis.append(phi)
+        return phi
+
+    def add_phi_operands(self, phi):
+        for predecessor in phi.block.predecessors:
+            phi.add_operand((yield self.read_nested(phi.variable, predecessor)))
+        return self.remove_trivial_phi(phi)
+
+    def remove_trivial_phi(self, phi):
+        """Replaces <phi> with its only operand other than itself, if it has one,
+        and then the phis using it which become trivial. Returns value of <phi>."""
+        result = phi
+        # Phis are checked in the order of a depth-first walk over the users
+        phis = [phi]
+        while phis:
+            current = phis.pop()
+            if current is not phi and (current.replacement is not None or current not in current.block.phis):
+                continue
+            same = None
+            for operand in current.operands:
+                if operand is same or operand is current:
+                    continue
+                if same is not None:
+                    same = current
+                    break
+                same = operand
+            if same is current:
+                continue
+            if same is None:
+                same = Constant(None)
+            users = [user for user in current.users if user is not current]
+            current.drop_operands()
+            replace_uses(current, same)
+            current.block.phis.remove(current)
+            current.replacement = same
+            if current is phi:
+                result = same
+            phis.extend(user for user in reversed(users) if isinstance(user, Phi))
+        return result
+
+    def seal(self, block):
+        """Marks <block> as having all its predecessors."""
+        for phi in self.incomplete_phis.pop(block, []):
+            run_nested(self.add_phi_operands(phi))
+        self.sealed.add(block)
+
+    def assign(self, name, value):
+        self.write(name, value)
+        if isinstance(value, Operation):
+            value.names.append(name)
+        if not self.depth:
+            self.globals[name] = None
+            self.function.scoped.discard(name)
+        elif name in self.parameters and name not in self.globals:
+            self.globals[name] = None
+            self.function.scoped.add(name)
+
+    def snapshot(self):
+        """Takes values of the tracked variables before a statement starts."""
+        if self.tracked is not None:
+            self.state = {name: self.read(name) for name in self.tracked}
+
+    # Blocks
+    def emit(self, opcode, operands, type='unknown', node=None, attribute=None):
+        operation = Operation(opcode, operands, type, node, attribute)
+        operation.state = self.state
+        return self.block.append(operation)
+
+    def terminate(self, terminator):
+        terminator.state = self.state
+        self.block.terminate(terminator)
+
+    def jump(self, target):
+        self.terminate(Operation('jump', targets=[target]))
+
+    def branch(self, condition, if_target, else_target):
+        self.terminate(Operation('branch', [condition], targets=[if_target, else_target]))
+
+    def finish(self, opcode, node=None):
+        """Ends the current block with terminator <opcode> leaving the program."""
+        names = tuple(self.globals)
+        self.terminate(Operation(opcode, [self.read(name) for name in names], node=node, attribute=names))
+
+    def remove_block(self, block):
+        """Drops <block>, which has no predecessors, returns None."""
+        self.function.blocks.remove(block)
+
+    def nested(self, node, scope):
+        """Lowers instruction <node> of loop or conditional instruction <scope>."""
+        scoped = getattr(scope, 'new_scope', True)
+        self.depth += scoped
+        yield self.statement(node)
+        self.depth -= scoped
+
+    # Instructions, lowered by generators run by run_nested, which yield
+    # generators lowering the nested instructions
+    def statement(self, node):
+        if isinstance(node, ast.Instructions):
+            for element in node.elements:
+                # Instructions after break, continue or return are never executed
+                if self.block is None:
+                    break
+                self.block.steps += 1
+                self.snapshot()
+                yield self.statement(element)
+        elif isinstance(node, ast.Block):
+            yield self.statement(node.instructions)
+        elif isinstance(node, ast.Assignment):
+            self.assignment(node)
+        elif isinstance(node, ast.If):
+            yield from self.conditional(node)
+        elif isinstance(node, ast.While):
+            yield from self.while_loop(node)
+        elif isinstance(node, ast.ParFor):
+            self.parfor_loop(node)
+        elif isinstance(node, ast.For):
+            yield from self.for_loop(node)
+        elif isinstance(node, ast.Break):
+            self.jump(self.loops[-1][1])
+            self.block = None
+        elif isinstance(node, ast.Continue):
+            self.jump(self.loops[-1][0])
+            self.block = None
+        elif isinstance(node, ast.Return):
+            self.finish('return', node)
+            self.block = None
+        elif isinstance(node, ast.Print):
+            arguments = node.args.elements if node.args is not None else []
+            self.emit('print', [self.expression(argument) for argument in arguments], node=node)
+        elif isinstance(node, ast.Save):
+            self.emit('save', [self.expression(node.filename), self.expression(node.value)], node=node)
+
+    def assignment(self, node):
+        right = self.expression(node.right)
+        if isinstance(node.left, ast.Identifier):
+            name = node.left.name
+            if len(node.operator) == 2:
+                right = self.emit('update', [self.read(name), right], 'undefined', node, node.operator)
+            self.assign(name, right)
+        else:
+            name = node.left.array.name
+            ids = [self.expression(element) for element in node.left.ids.elements]
+            array = self.read(name)
+            if len(node.operator) == 2:
+                left = self.emit('index', [array, *ids], node_type(node.left), node.left)
+                right = self.emit('update', [left, right], 'undefined', node, node.operator)
+            self.assign(name, self.emit('store', [array, right, *ids], 'undefined', node))
+
+    def conditional(self, node):
+        condition = self.expression(node.condition)
+        if_block = self.function.new_block()
+        else_block = self.function.new_block() if node.else_block is not None else None
+        end = self.function.new_block()
+        self.branch(condition, if_block, else_block or end)
+        for block, instruction in [(if_block, node.if_block), (else_block, node.else_block)]:
+            if block is not None:
+                self.seal(block)
+                self.block = block
+                yield from self.nested(instruction, node)
+                if self.block is not None:
+                    self.jump(end)
+        self.seal(end)
+        self.block = end if end.predecessors else self.remove_block(end)
+
+    def loop(self, node, body, latch, end):
+        """Lowers body of loop <node> into <body>, continue goes to <latch> and
+        break to <end>."""
+        self.seal(body)
+        self.block = body
+        body.steps += 1
+        self.loops.append((latch, end))
+        yield from self.nested(node.instruction, node)
+        self.loops.pop()
+        if self.block is not None:
+            self.jump(latch)
+
+    def reset_invariants(self, loop):
+        """Forgets values of invariants of <loop>, which is about to start."""
+        for invariant in getattr(loop, 'invariants', ()):
+            self.write(self.invariant_name(invariant), Constant(None))
+
+    def invariant_name(self, invariant):
+        return self.invariants.setdefault(invariant, f'.invariant{len(self.invariants)}')
+
+    def while_loop(self, node):
+        header, body, end = (self.function.new_block() for _ in range(3))
+        self.reset_invariants(node)
+        if getattr(node, 'update', None) is not None:
+            self.closed_form(node, end)
+        self.jump(header)
+        self.block = header
+        self.snapshot()
+        self.branch(self.expression(node.condition), body, end)
+        yield from self.loop(node, body, header, end)
+        self.seal(header)
+        self.seal(end)
+        self.block = end
+
+    def closed_form(self, node, end):
+        """Lowers running counted while loop <node> in closed form, like
+        Interpreter.run_counted_loop, after which it goes to <end>. The current
+        block is left to run the loop iteration by iteration, when the closed
+        form cannot be used."""
+        update = node.update
+        value = self.read(node.condition.left.name)
+        bound = self.expression(node.condition.right)
+        distance = self.emit('distance', [value, bound], 'unknown', node)
+        counted, iterated, done = (self.function.new_block() for _ in range(3))
+        self.branch(self.emit('defined', [distance], 'bool', node), counted, iterated)
+        self.seal(counted)
+        self.block = counted
+        # The step is computed only when the loop starts
+        result = self.emit('counted', [distance, value, self.expression(update.right)], 'unknown', node)
+        self.branch(self.emit('defined', [result], 'bool', node), done, iterated)
+        self.seal(done)
+        self.block = done
+        self.depth += getattr(node, 'new_scope', True)
+        self.assign(update.left.name, result)
+        self.depth -= getattr(node, 'new_scope', True)
+        self.jump(end)
+        self.seal(iterated)
+        self.block = iterated
+
+    def for_loop(self, node):
+        if node is self.lowered_loop:
+            iterations = self.read('.iterations')
+        else:
+            start = self.expression(node.range.start_value)
+            stop = self.expression(node.range.end_value)
+            iterations = self.emit('range', [start, stop], 'range', node.range)
+        header, body, latch, end = (self.function.new_block() for _ in range(4))
+        self.reset_invariants(node)
+        # Index of the iteration, kept apart from the loop variable, which the body may change
+        index = f'.{header.name}'
+        self.write(index, self.emit('field', [iterations], 'int', node, 'start'))
+        last = self.emit('field', [iterations], 'int', node, 'stop')
+        self.jump(header)
+        self.block = header
+        self.snapshot()
+        self.branch(self.emit('compare', [self.read(index), last], 'bool', node, '<'), body, end)
+        self.seal(body)
+        self.block = body
+        self.depth += getattr(node, 'new_scope', True)
+        self.assign(node.variable.name, self.read(index))
+        self.depth -= getattr(node, 'new_scope', True)
+        yield from self.loop(node, body, latch, end)
+        self.seal(latch)
+        if latch.predecessors:
+            self.block = latch
+            self.snapshot()
+            self.write(index, self.emit('binary', [self.read(index), Constant(1)], 'int', node, '+'))
+            self.jump(header)
+        else:
+            self.remove_block(latch)
+        self.seal(header)
+        self.seal(end)
+        self.block = end
+
+    def parfor_loop(self, node):
+        """Parfor loops are run by the interpreter, with variables they read and
+        their reductions passed through the parfor operation."""
+        names = sorted({child.name for child in self.identifiers(node)} - {node.variable.name})
+        parfor = self.emit('parfor', [self.read(name) for name in names], node=node, attribute=tuple(names))
+        for name in node.reduction_operators:
+            self.assign(name, self.emit('result', [parfor], node=node, attribute=name))
+
+    @staticmethod
+    def identifiers(node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, ast.Identifier):
+                yield node
+            stack.extend(child for _, _, child in slots(node) if isinstance(child, ast.Node))
+
+    # Expressions
+    def expression(self, node):
+        if isinstance(node, (ast.IntNum, ast.FloatNum)):
+            return Constant(node.value)
+        if isinstance(node, ast.Identifier):
+            return self.read(node.name)
+        if isinstance(node, ast.String):
+            return self.emit('string', [], 'string', node, node.value)
+        if isinstance(node, ast.Array):
+            if hasattr(node, 'values'):
+                return self.emit('literal', [], node_type(node), node)
+            return self.emit('array', [self.expression(node.list)], node_type(node), node)
+        if isinstance(node, ast.InnerList):
+            return self.emit('list', [self.expression(element) for element in node.elements], 'list', node)
+        if isinstance(node, ast.ArrayElement):
+            array = self.expression(node.array)
+            ids = [self.expression(element) for element in node.ids.elements]
+            return self.emit('index', [array, *ids], node_type(node), node)
+        if isinstance(node, ast.NumberBinaryOperation):
+            operands = product_operands(node) if node.operator == '*' else []
+            if len(operands) > 2:
+                return self.emit('product', [self.expression(operand) for operand in operands], node_type(node), node)
+            return self.binary('binary', node)
+        if isinstance(node, ast.MatrixBinaryOperation):
+            return self.binary('element_wise', node)
+        if isinstance(node, ast.BooleanExpression):
+            return self.binary('compare', node)
+        if isinstance(node, ast.UnaryMinus):
+            value = self.expression(node.value)
+            return self.emit('negate', [value], value.type, node)
+        if isinstance(node, ast.Transpose):
+            value = self.expression(node.value)
+            return self.emit('transpose', [value], node_type(node), node)
+        if isinstance(node, ast.MatrixFunction):
+            parameters = [self.expression(element) for element in node.parameter.elements]
+            return self.emit('matrix', parameters, node_type(node), node, node.function)
+        if isinstance(node, ast.Load):
+            return self.emit('load', [self.expression(node.filename)], node=node)
+        if isinstance(node, ast.Range):
+            start = self.expression(node.start_value)
+            return self.emit('range', [start, self.expression(node.end_value)], 'range', node)
+        if isinstance(node, ast.DeepExpression):
+            values = []
+            self.temporaries.append(values)
+            for temporary in node.temporaries:
+                values.append(self.expression(temporary))
+            value = self.expression(node.expression)
+            self.temporaries.pop()
+            return value
+        if isinstance(node, ast.Temporary):
+            return self.temporaries[-1][node.index]
+        if isinstance(node, ast.LoopInvariant):
+            return self.invariant(node)
+        raise TypeError(f'cannot lower {type(node).__name__}')
+
+    def invariant(self, node):
+        """Lowers loop invariant <node>, computed when it is first needed in a run
+        of its loop (or of the lowered instruction) and reused later."""
+        name = self.invariant_name(node)
+        compute, end = self.function.new_block(), self.function.new_block()
+        self.branch(self.emit('defined', [self.read(name)], 'bool', node), end, compute)
+        self.seal(compute)
+        self.block = compute
+        self.write(name, self.expression(node.expression))
+        self.jump(end)
+        self.seal(end)
+        self.block = end
+        return self.read(name)
+
+    def binary(self, opcode, node):
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        return self.emit(opcode, [left, right], node_type(node), node, node.operator)
+
+    def infer_types(self):
+        """Computes types of phis and of operations whose operands are phis."""
+        values = [value for value in self.function.values()
+                  if value.opcode in ('phi', 'binary', 'update', 'store', 'negate', 'counted')]
+        for value in values:
+            value.type = 'undefined'
+        changed = True
+        while changed:
+            changed = False
+            for value in values:
+                if value.opcode == 'phi':
+                    new_type = join(operand.type for operand in value.operands)
+                elif value.opcode == 'update':
+                    new_type = arithmetic_type(value.attribute[0], *(operand.type for operand in value.operands))
+                elif value.opcode == 'counted':
+                    new_type = 'int' if value.operands[1].type == value.operands[2].type == 'int' else 'unknown'
+                elif value.opcode == 'binary':
+                    # Types of numbers come from the operands, which may be bound
+                    # before the program, other ones from the type checker
+                    new_type = arithmetic_type(value.attribute, *(operand.type for operand in value.operands))
+                    if new_type not in NUMBERS and new_type != 'undefined':
+                        new_type = node_type(value.node)
+                        if new_type in NUMBERS:
+                            new_type = 'unknown'
+                else:
+                    new_type = value.operands[0].type
+                if new_type != value.type:
+                    value.type = new_type
+                    changed = True
+
+
+def lower_program(program, variables=None):
+    """Returns Function in SSA form computing type checked <program>, in which
+    <variables> are bound."""
+    types = {name: value_type(value) for name, value in (variables or {}).items()}
+    return IRBuilder(program.instructions_opt, types).function
+
+
+def lower_loop(loop, types):
+    """Returns Function in SSA form running loop <loop> of a type checked program
+    alone, with variables <types> (mapped to types of their values) bound
+    before it. For loops take their iterations from variable .iterations."""
+    return IRBuilder(loop, types, loop).function
@@ -0,0 +1,179 @@
+import functools
+import operator
+
+from .exceptions import ReturnValueException
+from .ir import Constant
+from .rope import Rope
+
+__all__ = ['CompiledFunction', 'compile_function']
+
+
+class CompiledBlock:
+    """Basic block lowered to Python callables. <operations> are tuples of the
+    register of the result, the callable, registers of its arguments and the
+    line of the program. <terminator> is one of:
+    ('jump', edge), ('branch', condition register, edge, edge) and
+    ('exit' or 'return', names, registers, node),
+    where an edge is a tuple of the target, registers of its phis and
+    registers of their operands for that edge."""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.operations = []
+        self.terminator = None
+
+
+class CompiledFunction:
+    """Function <function> of the IR lowered to Python callables, which compute
+    its operations with the value-level methods of <interpreter>, so that they
+    give the same results as the tree-walking interpreter. Values are kept in
+    registers, one per value of the function."""
+
+    def __init__(self, function, interpreter):
+        self.interpreter = interpreter
+        # Values of the IR mapped to their registers
+        self.registers = {}
+        # Initial contents of the registers, values of constants
+        self.initial = []
+        blocks = {block: CompiledBlock(block.steps) for block in function.blocks}
+        for block, compiled in blocks.items():
+            compiled.operations = [(self.register(operation), operation_callable(operation, interpreter),
+                                    [self.register(value) for value in operation.operands], operation.lineno)
+                                   for operation in block.operations]
+            compiled.terminator = self.terminator(block, blocks)
+        self.entry = blocks[function.entry]
+
+    def register(self, value):
+        index = self.registers.get(value)
+        if index is None:
+            index = self.registers[value] = len(self.initial)
+            self.initial.append(value.value if isinstance(value, Constant) else None)
+        return index
+
+    def edge(self, block, target, blocks):
+        index = target.predecessors.index(block)
+        return (blocks[target], [self.register(phi) for phi in target.phis],
+                [self.register(phi.operands[index]) for phi in target.phis])
+
+    def terminator(self, block, blocks):
+        terminator = block.terminator
+        if terminator.opcode == 'jump':
+            return 'jump', self.edge(block, terminator.targets[0], blocks)
+        if terminator.opcode == 'branch':
+            return ('branch', self.register(terminator.operands[0]),
+                    *(self.edge(block, target, blocks) for target in terminator.targets))
+        return (terminator.opcode, terminator.attribute, [self.register(value) for value in terminator.operands],
+                terminator.node)
+
+    def run(self):
+        """Runs the function, leaving its global variables in the global memory of the interpreter."""
+        interpreter = self.interpreter
+        registers = list(self.initial)
+        block = self.entry
+        operation = None
+        try:
+            while True:
+                if block.steps:
+                    interpreter.step(block.steps)
+                for operation in block.operations:
+                    registers[operation[0]] = operation[1](*[registers[index] for index in operation[2]])
+                terminator = block.terminator
+                if terminator[0] == 'jump':
+                    edge = terminator[1]
+                elif terminator[0] == 'branch':
+                    edge = terminator[2] if registers[terminator[1]] else terminator[3]
+                else:
+                    break
+                block, phis, operands = edge
+                if phis:
+                    values = [registers[index] for index in operands]
+                    for index, value in zip(phis, values):
+                        registers[index] = value
+        except Exception:
+            if operation is not None:
+                interpreter.lineno = operation[3]
+            raise
+        finally:
+            interpreter.output.flush()
+        kind, names, sources, node = terminator
+        memory = interpreter.memory_stack.stack[0]
+        for name, index in zip(names, sources):
+            if registers[index] is not None:
+                memory.put(name, registers[index])
+        if kind == 'return':
+            raise ReturnValueException(node.args)
+
+
+def operation_callable(operation, interpreter):
+    """Returns callable computing <operation> from values of its operands with
+    the value-level methods of <interpreter>."""
+    opcode, node, attribute = operation.opcode, operation.node, operation.attribute
+    if opcode == 'binary':
+        return functools.partial(interpreter.binary_operation, attribute)
+    if opcode in ('element_wise', 'compare'):
+        return interpreter.operators[attribute]
+    if opcode == 'negate':
+        return operator.neg
+    if opcode == 'transpose':
+        return operator.attrgetter('T')
+    if opcode == 'update':
+        return functools.partial(interpreter.operation_assignment, node)
+    if opcode == 'product':
+        return lambda *values: interpreter.product(node, list(values))
+    if opcode == 'matrix':
+        return lambda *parameter: interpreter.matrix_function(node, list(parameter))
+    if opcode == 'list':
+        return lambda *elements: [str(element) if isinstance(element, Rope) else element for element in elements]
+    if opcode == 'array':
+        return interpreter.make_array
+    if opcode == 'literal':
+        return functools.partial(interpreter.literal, node)
+    if opcode == 'string':
+        return lambda: Rope.from_str(attribute)
+    if opcode == 'range':
+        return range
+    if opcode == 'field':
+        return operator.attrgetter(attribute)
+    if opcode == 'defined':
+        return lambda value: value is not None
+    if opcode == 'distance':
+        return functools.partial(interpreter.counted_distance, node)
+    if opcode == 'counted':
+        return functools.partial(interpreter.counted_result, node)
+    if opcode == 'index':
+        return lambda array, *ids: interpreter.element(node, array, list(ids))
+    if opcode == 'store':
+        return lambda array, value, *ids: interpreter.store_element(node, array, list(ids), value)
+    if opcode == 'load':
+        return functools.partial(interpreter.load, node)
+    if opcode == 'save':
+        return functools.partial(interpreter.save, node)
+    if opcode == 'print':
+        return lambda *values: interpreter.output.print_values(values)
+    if opcode == 'variable':
+        return lambda: interpreter.memory_stack.get(attribute)
+    if opcode == 'parfor':
+        return functools.partial(run_parfor, interpreter, node, attribute)
+    if opcode == 'result':
+        return operator.itemgetter(attribute)
+    raise ValueError(f'cannot compile {opcode}')
+
+
+def run_parfor(interpreter, node, names, *values):
+    """Runs parfor loop <node> with variables <names> having <values>, returns
+    values of its reduction variables."""
+    memory_stack = interpreter.memory_stack
+    memory_stack.push('parfor')
+    try:
+        for name, value in zip(names, values):
+            if value is not None:
+                memory_stack.stack[-1].put(name, value)
+        interpreter.visit(node)
+        return {name: memory_stack.get(name) for name in node.reduction_operators}
+    finally:
+        memory_stack.pop()
+
+
+def compile_function(function, interpreter):
+    """Lowers <function> of the IR into a CompiledFunction run by <interpreter>."""
+    return CompiledFunction(function, interpreter)
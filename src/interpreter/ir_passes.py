@@ -0,0 +1,287 @@
+import operator
+import time
+
+from .ir import Constant, Phi, replace_uses
+from .ir_builder import NUMBERS
+
+__all__ = ['DEFAULT_PASSES', 'PASSES', 'PassManager']
+
+# Operators of operations on numbers which are folded, like Interpreter.operators
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '!=': operator.ne,
+    '==': operator.eq,
+}
+# Operations computing numbers from numbers, with operators in their attributes
+ARITHMETIC = ('binary', 'update', 'compare', 'negate')
+# Operations which cannot fail and have no effects, when their operands have the right types
+PURE = ARITHMETIC + ('phi', 'list', 'string', 'range', 'field', 'transpose', 'defined')
+
+
+def operator_of(operation):
+    """Returns operator of arithmetic <operation> (+ for +=), None for a negation."""
+    return operation.attribute[0] if operation.opcode == 'update' else operation.attribute
+
+
+def is_numeric(operation):
+    """Returns whether <operation> computes a number from numbers."""
+    return operation.opcode in ARITHMETIC and all(value.type in NUMBERS for value in operation.operands)
+
+
+def is_removable(operation):
+    """Returns whether <operation> can be dropped when its value is not used:
+    it has no effects and cannot raise an error with operands of their types."""
+    if operation.opcode not in PURE:
+        return False
+    if operation.opcode in ARITHMETIC:
+        return is_numeric(operation) and operator_of(operation) != '/'
+    if operation.opcode == 'transpose':
+        return operation.operands[0].type.startswith('matrix')
+    if operation.opcode == 'range':
+        return all(value.type == 'int' for value in operation.operands)
+    return True
+
+
+def remove(operation):
+    operation.drop_operands()
+    if isinstance(operation, Phi):
+        operation.block.phis.remove(operation)
+    else:
+        operation.block.operations.remove(operation)
+
+
+def fold_constants(function):
+    """Replaces arithmetic on numbers known before the program runs with its
+    results, unless computing them raises an error, which is left to the run."""
+    changed = False
+    for block in function.blocks:
+        for operation in list(block.operations):
+            if not (is_numeric(operation) and all(isinstance(value, Constant) for value in operation.operands)):
+                continue
+            values = [value.value for value in operation.operands]
+            try:
+                if operation.opcode == 'negate':
+                    result = -values[0]
+                else:
+                    result = OPERATORS[operator_of(operation)](*values)
+            except ArithmeticError:
+                continue
+            replace_uses(operation, Constant(result))
+            remove(operation)
+            changed = True
+    return changed
+
+
+def simplify_cfg(function):
+    """Turns branches on constants into jumps, removes blocks which are never
+    reached and phis with one operand, and merges blocks with their only
+    successors when they are their only predecessors."""
+    changed = False
+    for block in function.blocks:
+        terminator = block.terminator
+        if terminator.opcode == 'branch' and isinstance(terminator.operands[0], Constant):
+            taken, skipped = terminator.targets if terminator.operands[0].value else terminator.targets[::-1]
+            skipped.remove_predecessor(block)
+            terminator.drop_operands()
+            terminator.opcode, terminator.targets = 'jump', [taken]
+            changed = True
+
+    reached = {function.entry}
+    stack = [function.entry]
+    while stack:
+        for target in stack.pop().successors:
+            if target not in reached:
+                reached.add(target)
+                stack.append(target)
+    for block in [block for block in function.blocks if block not in reached]:
+        for target in block.successors:
+            if target in reached:
+                target.remove_predecessor(block)
+        for value in [*block.phis, *block.operations, block.terminator]:
+            value.drop_operands()
+        function.blocks.remove(block)
+        changed = True
+
+    for block in list(function.blocks):
+        # Blocks merged into their predecessors are skipped
+        if block not in function.blocks:
+            continue
+        if len(block.predecessors) == 1:
+            for phi in list(block.phis):
+                replace_uses(phi, phi.operands[0])
+                remove(phi)
+                changed = True
+        while block.terminator.opcode == 'jump':
+            target = block.terminator.targets[0]
+            if target is block or target is function.entry or target.predecessors != [block]:
+                break
+            for phi in list(target.phis):
+                replace_uses(phi, phi.operands[0])
+                remove(phi)
+            for operation in target.operations:
+                block.append(operation)
+            block.steps += target.steps
+            block.terminator = target.terminator
+            block.terminator.block = block
+            for successor in target.successors:
+                successor.predecessors = [block if predecessor is target else predecessor
+                                          for predecessor in successor.predecessors]
+            function.blocks.remove(target)
+            changed = True
+    return changed
+
+
+def reverse_postorder(function):
+    """Returns blocks of <function> reachable from its entry, each after its
+    predecessors except along back edges, so that most jumps go forward."""
+    order = []
+    visited = {function.entry}
+    stack = [(function.entry, iter(function.entry.successors))]
+    while stack:
+        block, successors = stack[-1]
+        for successor in successors:
+            if successor not in visited:
+                visited.add(successor)
+                stack.append((successor, iter(successor.successors)))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    return order[::-1]
+
+
+def dominators(function):
+    """Returns blocks reachable from the entry of <function> mapped to their
+    immediate dominators (the entry to None), using the iterative algorithm of
+    Cooper, Harvey and Kennedy."""
+    order = reverse_postorder(function)
+    position = {block: index for index, block in enumerate(order)}
+    dominator = {function.entry: function.entry}
+    changed = True
+    while changed:
+        changed = False
+        for block in order[1:]:
+            new = None
+            for predecessor in block.predecessors:
+                if predecessor not in dominator:
+                    continue
+                if new is None:
+                    new = predecessor
+                    continue
+                while new is not predecessor:
+                    while position[new] > position[predecessor]:
+                        new = dominator[new]
+                    while position[predecessor] > position[new]:
+                        predecessor = dominator[predecessor]
+            if dominator.get(block) is not new:
+                dominator[block] = new
+                changed = True
+    dominator[function.entry] = None
+    return dominator
+
+
+def eliminate_common_subexpressions(function):
+    """Replaces arithmetic on numbers computed earlier on every path (in a
+    dominating block or before in the same block) with that result. Operations
+    on matrices are left, as their results are new matrices every time."""
+    dominator = dominators(function)
+    children = {}
+    for block, parent in dominator.items():
+        children.setdefault(parent, []).append(block)
+    changed = False
+    available = {}
+    # Blocks of the dominator tree in preorder, with keys of values they made available
+    stack = [(function.entry, None)]
+    while stack:
+        block, added = stack.pop()
+        if added is not None:
+            for key in added:
+                del available[key]
+            continue
+        added = []
+        for operation in list(block.operations):
+            if not is_numeric(operation):
+                continue
+            key = (operation.opcode, operation.attribute, *(
+                repr(value.value) if isinstance(value, Constant) else id(value)
+                for value in operation.operands))
+            earlier = available.get(key)
+            if earlier is not None:
+                replace_uses(operation, earlier)
+                remove(operation)
+                changed = True
+            else:
+                available[key] = operation
+                added.append(key)
+        stack.append((block, added))
+        stack.extend((child, None) for child in children.get(block, []))
+    return changed
+
+
+def eliminate_dead_code(function):
+    """Removes operations whose values are never used and which have no effects,
+    including phis which are used only by each other."""
+    live = set()
+    stack = [value for value in function.values() if not is_removable(value)]
+    while stack:
+        value = stack.pop()
+        if value in live:
+            continue
+        live.add(value)
+        stack.extend(operand for operand in value.operands if not isinstance(operand, Constant))
+    dead = [value for value in function.values() if value not in live]
+    for value in dead:
+        value.drop_operands()
+    for value in dead:
+        if isinstance(value, Phi):
+            value.block.phis.remove(value)
+        else:
+            value.block.operations.remove(value)
+    return bool(dead)
+
+
+PASSES = {
+    'fold_constants': fold_constants,
+    'simplify_cfg': simplify_cfg,
+    'eliminate_common_subexpressions': eliminate_common_subexpressions,
+    'eliminate_dead_code': eliminate_dead_code,
+}
+DEFAULT_PASSES = ['fold_constants', 'simplify_cfg', 'eliminate_common_subexpressions', 'eliminate_dead_code']
+
+
+class PassManager:
+    """Runs passes <passes> (names from PASSES or functions taking a Function
+    and returning whether they changed it) in the given order, keeping the time
+    each of them took. With <verify> the function is checked after each pass."""
+
+    def __init__(self, passes=None, verify=False):
+        self.passes = [(name, PASSES[name]) if isinstance(name, str) else (name.__name__, name)
+                       for name in (DEFAULT_PASSES if passes is None else passes)]
+        self.verify = verify
+        # Names of the run passes, their times in seconds and whether they changed the function
+        self.timings = []
+
+    def run(self, function):
+        """Runs the passes on <function>, returns it."""
+        for name, function_pass in self.passes:
+            start = time.perf_counter()
+            changed = function_pass(function)
+            self.timings.append((name, time.perf_counter() - start, changed))
+            if self.verify:
+                function.verify()
+        return function
+
+    def report(self):
+        """Returns table of times of the run passes."""
+        lines = [f'{"pass":<34} {"ms":>10}  changed']
+        for name, elapsed, changed in self.timings:
+            lines.append(f'{name:<34} {elapsed * 1000:>10.3f}  {"yes" if changed else "no"}')
+        lines.append(f'{"total":<34} {sum(elapsed for _, elapsed, _ in self.timings) * 1000:>10.3f}')
+        return '\n'.join(lines) + '\n'
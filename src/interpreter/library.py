@@ -0,0 +1,89 @@
+import io
+import threading
+
+from .exceptions import *
+from .interpreter import Interpreter
+from .parser import Parser
+from .scanner import Scanner
+from .type_checker import TypeChecker
+
+__all__ = ['Result', 'compile_program', 'run_program']
+
+# Scanner and parser of every thread, building them takes longer than parsing
+# a typical program
+parsers = threading.local()
+
+
+class Result:
+    """Outcome of a program run: global <variables>, printed <output> and
+    ProgramErrors which stopped the program (empty if it finished)."""
+
+    def __init__(self, variables, output, errors):
+        self.variables = variables
+        self.output = output
+        self.errors = errors
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def __repr__(self):
+        return f'Result(variables={sorted(self.variables)}, errors={self.errors})'
+
+
+def get_parser():
+    if not hasattr(parsers, 'parser'):
+        parsers.scanner = Scanner()
+        parsers.parser = Parser(lexer=parsers.scanner)
+    return parsers.parser
+
+
+def compile_program(source, variables=None, output=None):
+    """Parses and type checks program <source>, in which <variables> are bound.
+
+    Returns the program and ProgramErrors found in it, the program is None if
+    there are any. Error messages are also written to <output> (they are
+    discarded if it is None)."""
+    output = io.StringIO() if output is None else output
+    parser = get_parser()
+    parsers.scanner.output = output
+    program = parser.parse(source)
+    errors = parsers.scanner.errors + parser.errors
+    if program is None or errors:
+        return None, errors
+    type_checker = TypeChecker(variables, output=output)
+    type_checker.visit(program)
+    if type_checker.errors:
+        return None, type_checker.errors
+    return program, []
+
+
+def run_program(program, variables=None, **options):
+    """Runs <program> (source or result of compile_program) with <variables>
+    bound, never exits the process. Interpreter gets <options>.
+
+    Matrices in <variables> are not copied, so assignments to their elements are
+    visible to the caller, unless they are bound as SharedMatrix handles.
+    Returns Result, its output has also error messages printed like by main.py."""
+    output = io.StringIO()
+    if isinstance(program, str):
+        program, errors = compile_program(program, variables, output)
+        if errors:
+            return Result({}, output.getvalue(), errors)
+
+    interpreter = Interpreter(**options, variables=variables, output=output)
+    errors = []
+    try:
+        interpreter.visit(program)
+    except ReturnValueException:
+        pass
+    except ProgramError as error:
+        errors.append(error)
+    except Exception as error:
+        errors.append(ProgramError('runtime', f'{type(error).__name__}: {error}', interpreter.lineno))
+    finally:
+        if interpreter.process_pool is not None:
+            interpreter.process_pool.shutdown()
+    for error in errors:
+        print(f'Runtime error: {error}', file=output)
+    return Result(interpreter.global_variables(), output.getvalue(), errors)
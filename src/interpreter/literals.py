@@ -0,0 +1,38 @@
+from . import ast
+from .deep_expressions import slots
+
+
+def constant_values(node):
+    """Returns value of constant element <node> of an array literal (nested
+    tuples for arrays), None if it is not a constant."""
+    if isinstance(node, (ast.IntNum, ast.FloatNum, ast.String)):
+        return node.value
+    if isinstance(node, ast.UnaryMinus):
+        value = constant_values(node.value)
+        return -value if isinstance(value, (int, float)) else None
+    if isinstance(node, ast.Array) and node.list is not None:
+        values = []
+        for element in node.list.elements:
+            value = constant_values(element)
+            if value is None:
+                return None
+            values.append(value)
+        return tuple(values)
+    return None
+
+
+def prebuild_literals(program):
+    """Sets values attribute of array literals of <program> whose elements are
+    all constants to nested tuples of the elements (rows are arrays of their
+    own), so that they are built without evaluating their elements."""
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Array):
+            values = constant_values(node)
+            if values is not None:
+                node.values = values
+                continue
+        # Temporaries are walked through the DeepExpression holding them
+        stack.extend(child for _, _, child in slots(node)
+                     if isinstance(child, ast.Node) and not isinstance(child, ast.Temporary))
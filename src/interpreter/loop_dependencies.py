@@ -0,0 +1,62 @@
+from collections import defaultdict
+
+from . import ast
+
+
+class LoopDependencies:
+    """Reads and writes of variables in body of loop <node>, used to check that
+    iterations of the loop are independent of each other."""
+
+    def __init__(self, node):
+        self.variable = node.variable.name
+        # Variables mapped to assignments to them (or to their elements)
+        self.writes = defaultdict(list)
+        # Variables mapped to Identifiers and ArrayElements reading them
+        self.reads = defaultdict(list)
+        # Break and return instructions which would leave the loop
+        self.exits = []
+        self.collect(node.instruction, 0)
+
+    def collect(self, node, depth):
+        """Collects accesses in <node>, nested in <depth> inner loops."""
+        # Nodes are visited in the order of the program text
+        stack = [(node, depth)]
+        while stack:
+            node, depth = stack.pop()
+            children = []
+            if isinstance(node, list):
+                children = [(element, depth) for element in node]
+            elif isinstance(node, ast.Assignment):
+                target = node.left.array if isinstance(node.left, ast.ArrayElement) else node.left
+                if isinstance(target, ast.Identifier):
+                    self.writes[target.name].append(node)
+                    if target is not node.left and node.operator != '=':
+                        self.reads[target.name].append(node.left)
+                if isinstance(node.left, ast.ArrayElement):
+                    children.append((node.left.ids, depth))
+                children.append((node.right, depth))
+            elif isinstance(node, ast.ArrayElement):
+                if isinstance(node.array, ast.Identifier):
+                    self.reads[node.array.name].append(node)
+                else:
+                    children.append((node.array, depth))
+                children.append((node.ids, depth))
+            elif isinstance(node, ast.Identifier):
+                self.reads[node.name].append(node)
+            elif isinstance(node, (ast.For, ast.ParFor)):
+                children = [(node.range, depth), (node.instruction, depth + 1)]
+            elif isinstance(node, ast.While):
+                children = [(node.condition, depth), (node.instruction, depth + 1)]
+            elif isinstance(node, ast.Break) and depth == 0 or isinstance(node, ast.Return):
+                self.exits.append(node)
+            elif isinstance(node, ast.DeepExpression):
+                children = [(node.temporaries, depth), (node.expression, depth)]
+            elif isinstance(node, ast.Node) and not isinstance(node, ast.Temporary):
+                # Temporaries are collected from their DeepExpression
+                children = [(value, depth) for value in vars(node).values()]
+            stack.extend(reversed(children))
+
+    def is_sliced(self, element):
+        """Checks whether first index of ArrayElement <element> is the loop variable."""
+        first_index = element.ids.elements[0]
+        return isinstance(first_index, ast.Identifier) and first_index.name == self.variable
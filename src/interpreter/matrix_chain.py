@@ -0,0 +1,39 @@
+import operator
+
+
+def chain_order(shapes):
+    """Finds order of multiplying matrices of shapes <shapes> which needs the least
+    scalar multiplications, by dynamic programming on the matrix chain.
+
+    Returns table in which split[i][j] is the position k such that product of
+    matrices i..j should be computed as (i..k) @ (k+1..j)."""
+    count = len(shapes)
+    dims = [shapes[0][0]] + [shape[1] for shape in shapes]
+    cost = [[0] * count for _ in range(count)]
+    split = [[0] * count for _ in range(count)]
+    for length in range(1, count):
+        for i in range(count - length):
+            j = i + length
+            cost[i][j], split[i][j] = min((cost[i][k] + cost[k + 1][j] + dims[i] * dims[k + 1] * dims[j + 1], k)
+                                          for k in range(i, j))
+    return split
+
+
+def multiply_chain(matrices, matmul=operator.matmul):
+    """Computes product of two dimensional matrices <matrices> in the cheapest order,
+    multiplying pairs of matrices with <matmul>."""
+    split = chain_order([matrix.shape for matrix in matrices])
+
+    def multiply(i, j):
+        if i == j:
+            return matrices[i]
+        k = split[i][j]
+        return matmul(multiply(i, k), multiply(k + 1, j))
+
+    return multiply(0, len(matrices) - 1)
+
+
+def is_chain(matrices):
+    """Checks whether <matrices> are two dimensional and can be multiplied one by another."""
+    return (all(matrix.ndim == 2 for matrix in matrices) and
+            all(left.shape[1] == right.shape[0] for left, right in zip(matrices, matrices[1:])))
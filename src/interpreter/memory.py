@@ -20,6 +20,8 @@ class MemoryStack:
 
     def __init__(self):
         self.stack = [Memory('global')]
+        # Popped memories, reused by the next pushes instead of new ones
+        self.free = []
 
     def get(self, variable_name):
         """Gets from memory stack current value of variable <variable_name>."""
@@ -40,10 +42,25 @@ class MemoryStack:
             if memory.name == 'global':
                 self.stack[-1].put(variable_name, value)
 
+    def memory_of(self, variable_name):
+        """Returns memory of the stack which holds variable <variable_name>."""
+        for memory in self.stack[::-1]:
+            if variable_name in memory:
+                return memory
+
+        raise KeyError(f'{variable_name} was not defined')
+
     def push(self, memory_name):
         """Pushes memory <memory> onto the stack."""
-        self.stack.append(Memory(memory_name))
+        if self.free:
+            memory = self.free.pop()
+            memory.name = memory_name
+            self.stack.append(memory)
+        else:
+            self.stack.append(Memory(memory_name))
 
     def pop(self):
         """Pops the top memory from the stack."""
-        self.stack.pop()
+        memory = self.stack.pop()
+        memory.variables.clear()
+        self.free.append(memory)
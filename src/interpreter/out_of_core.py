@@ -0,0 +1,92 @@
+import math
+import tempfile
+
+import numpy as np
+
+
+class OutOfCore:
+    """Keeps matrices having at least <threshold> elements in memory-mapped scratch
+    files and computes operations on them tile by tile.
+
+    Only a few tiles of <tile_size> elements are in memory at once, the rest of
+    the data stays in the files (or in the page cache, which the system can
+    reclaim), so matrices may be several times larger than available memory.
+    Threshold None turns the out-of-core mode off."""
+
+    def __init__(self, threshold=None, tile_size=2 ** 20, directory=None):
+        self.threshold = threshold
+        self.tile_size = tile_size
+        self.directory = directory
+
+    def is_large(self, *shapes):
+        """Checks whether any of arrays of shapes <shapes> should be kept out of core."""
+        return self.threshold is not None and any(math.prod(shape) >= self.threshold for shape in shapes)
+
+    def empty(self, shape, dtype):
+        """Creates array of shape <shape> and type <dtype>, in a scratch file if it is
+        large. Scratch arrays are filled with zeros."""
+        if not self.is_large(shape) or math.prod(shape) == 0:
+            return np.empty(shape, dtype)
+        # The file is deleted right away and its space is freed together with the mapping
+        with tempfile.TemporaryFile(dir=self.directory) as file:
+            return np.memmap(file, dtype=dtype, mode='w+', shape=shape)
+
+    def tiles(self, shape, side=None):
+        """Yields indices of tiles covering array of shape <shape>. Tiles of two
+        dimensional arrays are square (or as wide as the array) so that they can
+        be read from transposed arrays as efficiently as from plain ones."""
+        if len(shape) < 2:
+            for start in range(0, shape[0] if shape else 1, self.tile_size):
+                yield (slice(start, start + self.tile_size),) if shape else ()
+            return
+        cols = min(shape[1], side or math.isqrt(self.tile_size)) or 1
+        rows = max(1, self.tile_size // cols) if side is None else side
+        for i in range(0, shape[0], rows):
+            for j in range(0, shape[1], cols):
+                yield slice(i, i + rows), slice(j, j + cols)
+
+    def full(self, shape, value, dtype):
+        """Creates array of shape <shape> filled with <value>."""
+        array = self.empty(shape, dtype)
+        if value != 0 or not isinstance(array, np.memmap):
+            for tile in self.tiles(shape):
+                array[tile] = value
+        return array
+
+    def eye(self, size, dtype):
+        array = self.empty((size, size), dtype)
+        np.fill_diagonal(array, 1)
+        return array
+
+    def copy(self, array):
+        """Copies <array> into a new (scratch) array tile by tile."""
+        result = self.empty(array.shape, array.dtype)
+        for tile in self.tiles(array.shape):
+            result[tile] = array[tile]
+        return result
+
+    def element_wise(self, apply, ufunc, *values, out, **kwargs):
+        """Computes <ufunc> of <values> into array <out> tile by tile. Each tile is
+        computed with apply(ufunc, *tiles_of_values, out=tile_of_out, **<kwargs>)."""
+        # Operands sharing memory with the output, but not exactly the same,
+        # would be overwritten before they are read
+        values = [self.copy(value) if isinstance(value, np.ndarray) and value is not out and
+                  np.may_share_memory(value, out) else value for value in values]
+        values = [np.broadcast_to(value, out.shape) if isinstance(value, np.ndarray) else value for value in values]
+        for tile in self.tiles(out.shape):
+            apply(ufunc, *(value[tile] if isinstance(value, np.ndarray) else value for value in values),
+                  out=out[tile], **kwargs)
+        return out
+
+    def matmul(self, left, right):
+        """Computes matrix product of two dimensional arrays <left> and <right> by
+        multiplying square tiles."""
+        result = self.empty((left.shape[0], right.shape[1]), np.result_type(left.dtype, right.dtype))
+        side = math.isqrt(self.tile_size)
+        for rows, cols in self.tiles(result.shape, side):
+            tile = np.zeros(result[rows, cols].shape, result.dtype)
+            for inner in range(0, left.shape[1], side):
+                inner = slice(inner, inner + side)
+                tile += left[rows, inner] @ right[inner, cols]
+            result[rows, cols] = tile
+        return result
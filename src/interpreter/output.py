@@ -0,0 +1,123 @@
+import io
+import sys
+
+import numpy as np
+
+from .rope import Rope
+from .sparse import SparseMatrix
+
+
+class Output:
+    """Buffered sink of values printed by a program.
+
+    Text is collected in memory and written to <file> (None stands for
+    sys.stdout) in batches of about <buffer_size> characters. Matrices are
+    formatted as by str ('text' <matrix_format>), as comma separated rows
+    ('csv') or in the .npy format ('binary', <file> must have a binary buffer
+    like sys.stdout). The last two formats write all elements, <block_size> of
+    them at a time, so a large matrix is never formatted as one string."""
+
+    FORMATS = ('text', 'csv', 'binary')
+
+    def __init__(self, file=None, buffer_size=2 ** 16, matrix_format='text', block_size=2 ** 16):
+        if matrix_format not in self.FORMATS:
+            raise ValueError(f'unknown matrix format {matrix_format}')
+        self.file = file
+        self.buffer_size = buffer_size
+        self.matrix_format = matrix_format
+        self.block_size = block_size
+        self.chunks = []
+        self.buffered = 0
+
+    @property
+    def target(self):
+        # Looked up on every write, so that redirections of sys.stdout work
+        return sys.stdout if self.file is None else self.file
+
+    def write(self, text):
+        self.chunks.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size:
+            self.write_buffer()
+
+    def write_buffer(self):
+        """Writes the buffered text to the file, without flushing the file."""
+        if self.chunks:
+            self.target.write(''.join(self.chunks))
+            self.chunks = []
+            self.buffered = 0
+
+    def write_bytes(self, data):
+        """Writes encoded output <data> after the buffered text."""
+        self.write_buffer()
+        target = self.target
+        if hasattr(target, 'buffer'):
+            target.flush()
+            target.buffer.write(data)
+        else:
+            target.write(data.decode())
+
+    def flush(self):
+        self.write_buffer()
+        self.target.flush()
+
+    def print_values(self, values):
+        """Writes <values> separated by commas in one line."""
+        for i, value in enumerate(values):
+            if i:
+                self.write(', ')
+            self.write_value(value)
+        self.write('\n')
+
+    def write_value(self, value):
+        if isinstance(value, Rope):
+            for leaf in value.leaves():
+                self.write(leaf)
+        elif self.matrix_format == 'csv' and isinstance(value, (np.ndarray, SparseMatrix)) and value.ndim > 0:
+            self.write_csv(value)
+        elif self.matrix_format == 'binary' and isinstance(value, (np.ndarray, SparseMatrix)):
+            self.write_npy(value)
+        else:
+            self.write(str(value))
+
+    def row_blocks(self, matrix):
+        """Yields consecutive blocks of rows of <matrix> as dense arrays."""
+        if matrix.ndim < 2:
+            yield np.asarray(matrix).reshape(1, -1)
+            return
+        step = max(1, self.block_size // max(1, matrix.shape[1]))
+        if isinstance(matrix, SparseMatrix):
+            rows, cols, data = matrix.coordinates()
+            order = np.argsort(rows, kind='stable')
+            rows, cols, data = rows[order], cols[order], data[order]
+            for start in range(0, matrix.shape[0], step):
+                stop = min(start + step, matrix.shape[0])
+                first, last = np.searchsorted(rows, [start, stop])
+                block = np.zeros((stop - start, matrix.shape[1]), matrix.dtype)
+                block[rows[first:last] - start, cols[first:last]] = data[first:last]
+                yield block
+        else:
+            for start in range(0, matrix.shape[0], step):
+                yield np.asarray(matrix[start:start + step])
+
+    def write_csv(self, matrix):
+        for i, block in enumerate(self.row_blocks(matrix)):
+            if i:
+                self.write('\n')
+            self.write('\n'.join(','.join(map(str, row)) for row in block.tolist()))
+
+    def write_npy(self, matrix):
+        if not hasattr(self.target, 'buffer'):
+            raise ValueError('binary matrix format needs output with a binary buffer')
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            'descr': np.lib.format.dtype_to_descr(matrix.dtype),
+            'fortran_order': False,
+            'shape': matrix.shape,
+        })
+        self.write_bytes(header.getvalue())
+        if matrix.ndim == 0:
+            self.write_bytes(matrix.tobytes())
+            return
+        for block in self.row_blocks(matrix):
+            self.write_bytes(np.ascontiguousarray(block).tobytes())
@@ -1,6 +1,8 @@
 #!/usr/bin/python
 from . import scanner
 from .ast import *
+from .deep_expressions import DEPTH_LIMIT, split_deep_expressions
+from .exceptions import ProgramError
 import ply.yacc as yacc
 
 
@@ -27,18 +29,42 @@ class Parser:
 
     # Builds the parser
     def __init__(self, lexer):
+        self._scanner = lexer
         self._lexer = lexer.lexer
+        # ProgramErrors found in the last parsed text, reported also to the
+        # output of the lexer
+        self.errors = []
+        # Operations parsed since the last instruction, expressions can be only
+        # as deep as the number of their operations
+        self.operations = 0
+        self.deep_expressions = False
         self.parser = yacc.yacc(module=self)
 
     def parse(self, text):
-        return self.parser.parse(text)
-
-    @staticmethod
-    def p_error(p):
+        self.errors = []
+        self._scanner.errors = []
+        self._lexer.lineno = 1
+        self.operations = 0
+        self.deep_expressions = False
+        tree = self.parser.parse(text, lexer=self._lexer)
+        # Visitors recurse into expressions, so very deep ones are split
+        if tree is not None and self.deep_expressions:
+            split_deep_expressions(tree)
+        return tree
+
+    def count_operation(self):
+        self.operations += 1
+        if self.operations >= DEPTH_LIMIT:
+            self.deep_expressions = True
+
+    def p_error(self, p):
         if p:
-            print("Syntax error at line {0}: LexToken({1}, '{2}')".format(p.lineno, p.type, p.value))
+            print("Syntax error at line {0}: LexToken({1}, '{2}')".format(p.lineno, p.type, p.value),
+                  file=self._scanner.output)
+            self.errors.append(ProgramError('syntax', f'Syntax error at {p.type} {p.value!r}', p.lineno))
         else:
-            print("Unexpected end of input")
+            print("Unexpected end of input", file=self._scanner.output)
+            self.errors.append(ProgramError('syntax', 'Unexpected end of input'))
         Parser.GOT_SYNTAX_ERROR = True
 
     @staticmethod
@@ -73,29 +99,31 @@ class Parser:
             p[0] = Instructions(p[2], p[1])
             p[0].lineno = p[2].lineno
 
-    @staticmethod
-    def p_instruction(p):
+    def p_instruction(self, p):
         """instruction : assignment ';'
                        | if_instruction
                        | while_instruction
                        | for_instruction
+                       | parfor_instruction
                        | break_instruction ';'
                        | continue_instruction ';'
                        | return_instruction ';'
                        | print_instruction ';'
+                       | save_instruction ';'
                        | block """
         p[0] = p[1]
         p[0].lineno = p[1].lineno
+        self.operations = 0
 
     # Expressions
-    @staticmethod
-    def p_unary_minus(p):
+    def p_unary_minus(self, p):
         """expression : SUB expression %prec UMINUS"""
         if len(p) == 3:
             p[0] = UnaryMinus(p[2])
         else:
             p[0] = UnaryMinus(p[3])
         p[0].lineno = p.lineno(1)
+        self.count_operation()
 
     @staticmethod
     def p_expression(p):
@@ -110,23 +138,23 @@ class Parser:
             p[0] = p[1]
             p[0].lineno = p[1].lineno
 
-    @staticmethod
-    def p_binary_operations(p):
+    def p_binary_operations(self, p):
         """expression : expression ADD expression
                       | expression SUB expression
                       | expression MUL expression
                       | expression DIV expression """
         p[0] = NumberBinaryOperation(p[1], p[2], p[3])
         p[0].lineno = p.lineno(2)
+        self.count_operation()
 
-    @staticmethod
-    def p_binary_operations_dot(p):
+    def p_binary_operations_dot(self, p):
         """expression : expression DOTADD expression
                       | expression DOTSUB expression
                       | expression DOTMUL expression
                       | expression DOTDIV expression """
         p[0] = MatrixBinaryOperation(p[1], p[2], p[3])
         p[0].lineno = p.lineno(2)
+        self.count_operation()
 
     @staticmethod
     def p_expression_par(p):
@@ -134,11 +162,11 @@ class Parser:
         p[0] = p[2]
         p[0].lineno = p.lineno(1)
 
-    @staticmethod
-    def p_transpose(p):
+    def p_transpose(self, p):
         """expression : expression TRANSPOSE """
         p[0] = Transpose(p[1])
         p[0].lineno = p.lineno(2)
+        self.count_operation()
 
     @staticmethod
     def p_matrix_func_call(p):
@@ -153,8 +181,13 @@ class Parser:
                        | ONES """
         p[0] = p[1]
 
-    @staticmethod
-    def p_binary_relations(p):
+    def p_load(self, p):
+        """expression : LOAD '(' expression ')' """
+        p[0] = Load(p[3])
+        p[0].lineno = p.lineno(1)
+        self.count_operation()
+
+    def p_binary_relations(self, p):
         """expression : expression SMALLER expression
                       | expression GREATER expression
                       | expression SMALLEREQ expression
@@ -163,6 +196,7 @@ class Parser:
                       | expression EQ expression"""
         p[0] = BooleanExpression(p[1], p[2], p[3])
         p[0].lineno = p.lineno(2)
+        self.count_operation()
 
     # Numbers
     @staticmethod
@@ -288,6 +322,26 @@ class Parser:
         p[0] = For(identifier, p[4], p[5])
         p[0].lineno = p.lineno(1)
 
+    @staticmethod
+    def p_parfor_instruction(p):
+        """parfor_instruction : PARFOR ID ASSIGN range instruction
+                              | PARFOR ID ASSIGN range REDUCE reduction_variables instruction """
+        identifier = Identifier(p[2])
+        identifier.lineno = p.lineno(1)
+        if len(p) == 6:
+            p[0] = ParFor(identifier, p[4], p[5])
+        else:
+            p[0] = ParFor(identifier, p[4], p[7], p[6])
+        p[0].lineno = p.lineno(1)
+
+    @staticmethod
+    def p_reduction_variables(p):
+        """reduction_variables : reduction_variables ',' ID
+                               | ID """
+        identifier = Identifier(p[len(p) - 1])
+        identifier.lineno = p.lineno(len(p) - 1)
+        p[0] = p[1] + [identifier] if len(p) == 4 else [identifier]
+
     @staticmethod
     def p_break_instruction(p):
         """break_instruction : BREAK """
@@ -315,3 +369,9 @@ class Parser:
         """print_instruction : PRINT list_arguments """
         p[0] = Print(p[2])
         p[0].lineno = p.lineno(1)
+
+    @staticmethod
+    def p_save_instruction(p):
+        """save_instruction : SAVE '(' expression ',' expression ')' """
+        p[0] = Save(p[3], p[5])
+        p[0].lineno = p.lineno(1)
@@ -0,0 +1,109 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = "programnonassocIFXnonassocELSEnonassocADDASSIGNSUBASSIGNMULASSIGNDIVASSIGNrightASSIGNnonassocGREATERGREATEREQSMALLERSMALLEREQEQNOTEQleftADDSUBleftMULDIVleftDOTADDDOTSUBleftDOTMULDOTDIVrightUMINUSleftTRANSPOSEADD ADDASSIGN ASSIGN BREAK CONTINUE DIV DIVASSIGN DOTADD DOTDIV DOTMUL DOTSUB ELSE EQ EYE FLOATNUM FOR GREATER GREATEREQ ID IF INTNUM LOAD MUL MULASSIGN NOTEQ ONES PARFOR PRINT REDUCE RETURN SAVE SMALLER SMALLEREQ STRING SUB SUBASSIGN TRANSPOSE WHILE ZEROSprogram : instructions_opt empty : instructions_opt : instructions\n                            | empty block : '{' instructions_opt '}' instructions : instructions instruction\n                        | instruction instruction : assignment ';'\n                       | if_instruction\n                       | while_instruction\n                       | for_instruction\n                       | parfor_instruction\n                       | break_instruction ';'\n                       | continue_instruction ';'\n                       | return_instruction ';'\n                       | print_instruction ';'\n                       | save_instruction ';'\n                       | block expression : SUB expression %prec UMINUSexpression : number\n                      | array\n                      | variable\n                      | STRING expression : expression ADD expression\n                      | expression SUB expression\n                      | expression MUL expression\n                      | expression DIV expression expression : expression DOTADD expression\n                      | expression DOTSUB expression\n                      | expression DOTMUL expression\n                      | expression DOTDIV expression expression : '(' expression ')' expression : expression TRANSPOSE expression : matrix_func '(' inner_array ')' matrix_func : EYE\n                       | ZEROS\n                       | ONES expression : LOAD '(' expression ')' expression : expression SMALLER expression\n                      | expression GREATER expression\n                      | expression SMALLEREQ expression\n                      | expression GREATEREQ expression\n                      | expression NOTEQ expression\n                      | expression EQ expressionnumber : INTNUM number : FLOATNUM array : '[' ']'\n                 | '[' inner_array ']' inner_array : inner_array ',' expression\n                       | expression range : expression ':' expression indices_part : range\n                        | expressionlist_indices : list_indices ',' indices_part\n                        | indices_part list_arguments : list_arguments ',' expression\n                          | expression variable : ID variable : ID '[' list_indices ']'variable : STRING '[' list_indices ']'assignment : variable ASSIGN expression\n                      | variable ADDASSIGN expression\n                      | variable SUBASSIGN expression\n                      | variable MULASSIGN expression\n                      | variable DIVASSIGN expression if_instruction : IF '(' expression ')' instruction %prec IFX\n                          | IF '(' expression ')' instruction ELSE instruction while_instruction : WHILE '(' expression ')' instruction for_instruction : FOR ID ASSIGN range instruction parfor_instruction : PARFOR ID ASSIGN range instruction\n                              | PARFOR ID ASSIGN range REDUCE reduction_variables instruction reduction_variables : reduction_variables ',' ID\n                               | ID break_instruction : BREAK continue_instruction : CONTINUE return_instruction : RETURN\n                              | RETURN list_arguments print_instruction : PRINT list_arguments save_instruction : SAVE '(' expression ',' expression ')' "
+    
+_lr_action_items = {'$end':([0,1,2,3,4,5,7,8,9,10,16,30,31,32,33,34,35,36,104,136,137,138,141,151,152,],[-2,0,-1,-3,-4,-7,-9,-10,-11,-12,-18,-6,-8,-13,-14,-15,-16,-17,-5,-66,-68,-69,-70,-67,-71,]),'IF':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[18,18,-7,-9,-10,-11,-12,-18,-58,18,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,18,18,18,-59,18,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,18,-73,18,-67,-71,-72,]),'WHILE':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[19,19,-7,-9,-10,-11,-12,-18,-58,19,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,19,19,19,-59,19,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,19,-73,19,-67,-71,-72,]),'FOR':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[20,20,-7,-9,-10,-11,-12,-18,-58,20,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,20,20,20,-59,20,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,20,-73,20,-67,-71,-72,]),'PARFOR':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[22,22,-7,-9,-10,-11,-12,-18,-58,22,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,22,22,22,-59,22,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,22,-73,22,-67,-71,-72,]),'BREAK':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[23,23,-7,-9,-10,-11,-12,-18,-58,23,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,23,23,23,-59,23,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,23,-73,23,-67,-71,-72,]),'CONTINUE':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[24,24,-7,-9,-10,-11,-12,-18,-58,24,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,24,24,24,-59,24,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,24,-73,24,-67,-71,-72,]),'RETURN':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[25,25,-7,-9,-10,-11,-12,-18,-58,25,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,25,25,25,-59,25,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,25,-73,25,-67,-71,-72,]),'PRINT':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[26,26,-7,-9,-10,-11,-12,-18,-58,26,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,26,26,26,-59,26,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,26,-73,26,-67,-71,-72,]),'SAVE':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[27,27,-7,-9,-10,-11,-12,-18,-58,27,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,27,27,27,-59,27,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,27,-73,27,-67,-71,-72,]),'{':([0,3,5,7,8,9,10,16,21,28,30,31,32,33,34,35,36,50,51,52,53,57,58,89,96,100,104,106,107,108,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[28,28,-7,-9,-10,-11,-12,-18,-58,28,-6,-8,-13,-14,-15,-16,-17,-20,-21,-22,-23,-45,-46,-33,-19,-47,-5,28,28,28,-59,28,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-66,-68,-69,-51,-70,-34,-38,28,-73,28,-67,-71,-72,]),'ID':([0,3,5,7,8,9,10,16,20,21,22,25,26,28,30,31,32,33,34,35,36,37,38,39,40,41,42,43,45,49,50,51,52,53,54,57,58,59,64,66,74,79,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,98,99,100,104,106,107,108,110,111,112,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,133,134,135,136,137,138,140,141,142,143,144,147,148,149,151,152,153,154,],[21,21,-7,-9,-10,-11,-12,-18,44,-58,46,21,21,21,-6,-8,-13,-14,-15,-16,-17,21,21,21,21,21,21,21,21,21,-20,-21,-22,-23,21,-45,-46,21,21,21,21,21,21,21,21,21,21,21,21,21,21,-33,21,21,21,21,21,21,-19,21,21,-47,-5,21,21,21,-59,21,21,21,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,21,21,-60,-66,-68,-69,-51,-70,148,-34,-38,21,-73,21,-67,-71,154,-72,]),'STRING':([0,3,5,7,8,9,10,16,21,25,26,28,30,31,32,33,34,35,36,37,38,39,40,41,42,43,45,49,50,51,52,53,54,57,58,59,64,66,74,79,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,98,99,100,104,106,107,108,110,111,112,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,133,134,135,136,137,138,140,141,143,144,147,148,149,151,152,154,],[29,29,-7,-9,-10,-11,-12,-18,-58,53,53,29,-6,-8,-13,-14,-15,-16,-17,53,53,53,53,53,53,53,53,53,-20,-21,-22,-23,53,-45,-46,53,53,53,53,53,53,53,53,53,53,53,53,53,53,-33,53,53,53,53,53,53,-19,53,53,-47,-5,29,29,29,-59,53,53,29,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,53,53,-60,-66,-68,-69,-51,-70,-34,-38,29,-73,29,-67,-71,-72,]),'}':([3,4,5,7,8,9,10,16,28,30,31,32,33,34,35,36,65,104,136,137,138,141,151,152,],[-3,-4,-7,-9,-10,-11,-12,-18,-2,-6,-8,-13,-14,-15,-16,-17,104,-5,-66,-68,-69,-70,-67,-71,]),';':([6,11,12,13,14,15,21,23,24,25,47,48,50,51,52,53,57,58,63,67,68,69,70,71,89,96,100,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,143,144,150,],[31,32,33,34,35,36,-58,-74,-75,-76,-77,-57,-20,-21,-22,-23,-45,-46,-78,-61,-62,-63,-64,-65,-33,-19,-47,-59,-56,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-34,-38,-79,]),'ELSE':([7,8,9,10,16,31,32,33,34,35,36,104,136,137,138,141,151,152,],[-9,-10,-11,-12,-18,-8,-13,-14,-15,-16,-17,-5,147,-68,-69,-70,-67,-71,]),'ASSIGN':([17,21,44,46,110,135,],[37,-58,74,79,-59,-60,]),'ADDASSIGN':([17,21,110,135,],[38,-58,-59,-60,]),'SUBASSIGN':([17,21,110,135,],[39,-58,-59,-60,]),'MULASSIGN':([17,21,110,135,],[40,-58,-59,-60,]),'DIVASSIGN':([17,21,110,135,],[41,-58,-59,-60,]),'(':([18,19,25,26,27,37,38,39,40,41,42,43,45,49,54,55,56,59,60,61,62,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[42,43,54,54,64,54,54,54,54,54,54,54,54,54,54,98,99,54,-35,-36,-37,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,]),'ADD':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,81,-20,-21,-22,-23,-45,-46,81,81,81,81,81,81,81,81,-33,-19,81,-47,81,81,81,-59,81,-24,-25,-26,-27,-28,-29,-30,-31,81,81,81,81,81,81,-32,81,-48,-60,81,-34,-38,81,81,]),'SUB':([21,25,26,37,38,39,40,41,42,43,45,48,49,50,51,52,53,54,57,58,59,64,66,67,68,69,70,71,72,73,74,78,79,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,102,103,109,110,111,112,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,133,134,135,140,143,144,145,146,],[-58,49,49,49,49,49,49,49,49,49,49,82,49,-20,-21,-22,-23,49,-45,-46,49,49,49,82,82,82,82,82,82,82,49,82,49,49,49,49,49,49,49,49,49,49,-33,49,49,49,49,49,49,-19,82,49,49,-47,82,82,82,-59,49,49,82,-24,-25,-26,-27,-28,-29,-30,-31,82,82,82,82,82,82,-32,82,-48,49,49,-60,82,-34,-38,82,82,]),'MUL':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,83,-20,-21,-22,-23,-45,-46,83,83,83,83,83,83,83,83,-33,-19,83,-47,83,83,83,-59,83,83,83,-26,-27,-28,-29,-30,-31,83,83,83,83,83,83,-32,83,-48,-60,83,-34,-38,83,83,]),'DIV':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,84,-20,-21,-22,-23,-45,-46,84,84,84,84,84,84,84,84,-33,-19,84,-47,84,84,84,-59,84,84,84,-26,-27,-28,-29,-30,-31,84,84,84,84,84,84,-32,84,-48,-60,84,-34,-38,84,84,]),'DOTADD':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,85,-20,-21,-22,-23,-45,-46,85,85,85,85,85,85,85,85,-33,-19,85,-47,85,85,85,-59,85,85,85,85,85,-28,-29,-30,-31,85,85,85,85,85,85,-32,85,-48,-60,85,-34,-38,85,85,]),'DOTSUB':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,86,-20,-21,-22,-23,-45,-46,86,86,86,86,86,86,86,86,-33,-19,86,-47,86,86,86,-59,86,86,86,86,86,-28,-29,-30,-31,86,86,86,86,86,86,-32,86,-48,-60,86,-34,-38,86,86,]),'DOTMUL':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,87,-20,-21,-22,-23,-45,-46,87,87,87,87,87,87,87,87,-33,-19,87,-47,87,87,87,-59,87,87,87,87,87,87,87,-30,-31,87,87,87,87,87,87,-32,87,-48,-60,87,-34,-38,87,87,]),'DOTDIV':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,88,-20,-21,-22,-23,-45,-46,88,88,88,88,88,88,88,88,-33,-19,88,-47,88,88,88,-59,88,88,88,88,88,88,88,-30,-31,88,88,88,88,88,88,-32,88,-48,-60,88,-34,-38,88,88,]),'TRANSPOSE':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,89,-20,-21,-22,-23,-45,-46,89,89,89,89,89,89,89,89,-33,89,89,-47,89,89,89,-59,89,89,89,89,89,89,89,89,89,89,89,89,89,89,89,-32,89,-48,-60,89,-34,-38,89,89,]),'SMALLER':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,90,-20,-21,-22,-23,-45,-46,90,90,90,90,90,90,90,90,-33,-19,90,-47,90,90,90,-59,90,-24,-25,-26,-27,-28,-29,-30,-31,None,None,None,None,None,None,-32,90,-48,-60,90,-34,-38,90,90,]),'GREATER':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,91,-20,-21,-22,-23,-45,-46,91,91,91,91,91,91,91,91,-33,-19,91,-47,91,91,91,-59,91,-24,-25,-26,-27,-28,-29,-30,-31,None,None,None,None,None,None,-32,91,-48,-60,91,-34,-38,91,91,]),'SMALLEREQ':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,92,-20,-21,-22,-23,-45,-46,92,92,92,92,92,92,92,92,-33,-19,92,-47,92,92,92,-59,92,-24,-25,-26,-27,-28,-29,-30,-31,None,None,None,None,None,None,-32,92,-48,-60,92,-34,-38,92,92,]),'GREATEREQ':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,93,-20,-21,-22,-23,-45,-46,93,93,93,93,93,93,93,93,-33,-19,93,-47,93,93,93,-59,93,-24,-25,-26,-27,-28,-29,-30,-31,None,None,None,None,None,None,-32,93,-48,-60,93,-34,-38,93,93,]),'NOTEQ':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,94,-20,-21,-22,-23,-45,-46,94,94,94,94,94,94,94,94,-33,-19,94,-47,94,94,94,-59,94,-24,-25,-26,-27,-28,-29,-30,-31,None,None,None,None,None,None,-32,94,-48,-60,94,-34,-38,94,94,]),'EQ':([21,48,50,51,52,53,57,58,67,68,69,70,71,72,73,78,89,96,97,100,102,103,109,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,131,132,135,140,143,144,145,146,],[-58,95,-20,-21,-22,-23,-45,-46,95,95,95,95,95,95,95,95,-33,-19,95,-47,95,95,95,-59,95,-24,-25,-26,-27,-28,-29,-30,-31,None,None,None,None,None,None,-32,95,-48,-60,95,-34,-38,95,95,]),',':([21,47,48,50,51,52,53,57,58,63,75,76,77,78,89,96,100,101,102,103,105,110,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,132,135,139,140,143,144,145,148,149,154,],[-58,80,-57,-20,-21,-22,-23,-45,-46,80,111,-55,-52,-53,-33,-19,-47,133,-50,134,111,-59,-56,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,133,-48,-60,-54,-51,-34,-38,-49,-73,153,-72,]),')':([21,50,51,52,53,57,58,72,73,89,96,97,100,102,110,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,132,135,143,144,145,146,],[-58,-20,-21,-22,-23,-45,-46,106,107,-33,-19,129,-47,-50,-59,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,143,144,-48,-60,-34,-38,-49,150,]),':':([21,50,51,52,53,57,58,78,89,96,100,109,110,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,143,144,],[-58,-20,-21,-22,-23,-45,-46,112,-33,-19,-47,112,-59,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-34,-38,]),']':([21,50,51,52,53,57,58,59,75,76,77,78,89,96,100,101,102,105,110,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,139,140,143,144,145,],[-58,-20,-21,-22,-23,-45,-46,100,110,-55,-52,-53,-33,-19,-47,132,-50,135,-59,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-54,-51,-34,-38,-49,]),'REDUCE':([21,50,51,52,53,57,58,89,96,100,110,113,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,132,135,140,143,144,],[-58,-20,-21,-22,-23,-45,-46,-33,-19,-47,-59,142,-24,-25,-26,-27,-28,-29,-30,-31,-39,-40,-41,-42,-43,-44,-32,-48,-60,-51,-34,-38,]),'[':([21,25,26,29,37,38,39,40,41,42,43,45,49,53,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[45,59,59,66,59,59,59,59,59,59,59,59,59,66,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,]),'LOAD':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,56,]),'INTNUM':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,]),'FLOATNUM':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,]),'EYE':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,]),'ZEROS':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,]),'ONES':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'instructions_opt':([0,28,],[2,65,]),'instructions':([0,28,],[3,3,]),'empty':([0,28,],[4,4,]),'instruction':([0,3,28,106,107,108,113,147,149,],[5,30,5,136,137,138,141,151,152,]),'assignment':([0,3,28,106,107,108,113,147,149,],[6,6,6,6,6,6,6,6,6,]),'if_instruction':([0,3,28,106,107,108,113,147,149,],[7,7,7,7,7,7,7,7,7,]),'while_instruction':([0,3,28,106,107,108,113,147,149,],[8,8,8,8,8,8,8,8,8,]),'for_instruction':([0,3,28,106,107,108,113,147,149,],[9,9,9,9,9,9,9,9,9,]),'parfor_instruction':([0,3,28,106,107,108,113,147,149,],[10,10,10,10,10,10,10,10,10,]),'break_instruction':([0,3,28,106,107,108,113,147,149,],[11,11,11,11,11,11,11,11,11,]),'continue_instruction':([0,3,28,106,107,108,113,147,149,],[12,12,12,12,12,12,12,12,12,]),'return_instruction':([0,3,28,106,107,108,113,147,149,],[13,13,13,13,13,13,13,13,13,]),'print_instruction':([0,3,28,106,107,108,113,147,149,],[14,14,14,14,14,14,14,14,14,]),'save_instruction':([0,3,28,106,107,108,113,147,149,],[15,15,15,15,15,15,15,15,15,]),'block':([0,3,28,106,107,108,113,147,149,],[16,16,16,16,16,16,16,16,16,]),'variable':([0,3,25,26,28,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,106,107,108,111,112,113,133,134,147,149,],[17,17,52,52,17,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,52,17,17,17,52,52,17,52,52,17,17,]),'list_arguments':([25,26,],[47,63,]),'expression':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[48,48,67,68,69,70,71,72,73,78,96,97,102,103,78,109,109,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,102,131,78,140,145,146,]),'number':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,]),'array':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,]),'matrix_func':([25,26,37,38,39,40,41,42,43,45,49,54,59,64,66,74,79,80,81,82,83,84,85,86,87,88,90,91,92,93,94,95,98,99,111,112,133,134,],[55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,]),'list_indices':([45,66,],[75,105,]),'indices_part':([45,66,111,],[76,76,139,]),'range':([45,66,74,79,111,],[77,77,108,113,77,]),'inner_array':([59,98,],[101,130,]),'reduction_variables':([142,],[149,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> instructions_opt','program',1,'p_program','parser.py',71),
+  ('empty -> <empty>','empty',0,'p_empty','parser.py',76),
+  ('instructions_opt -> instructions','instructions_opt',1,'p_instructions_opt','parser.py',80),
+  ('instructions_opt -> empty','instructions_opt',1,'p_instructions_opt','parser.py',81),
+  ('block -> { instructions_opt }','block',3,'p_block_of_instructions','parser.py',86),
+  ('instructions -> instructions instruction','instructions',2,'p_instructions','parser.py',92),
+  ('instructions -> instruction','instructions',1,'p_instructions','parser.py',93),
+  ('instruction -> assignment ;','instruction',2,'p_instruction','parser.py',103),
+  ('instruction -> if_instruction','instruction',1,'p_instruction','parser.py',104),
+  ('instruction -> while_instruction','instruction',1,'p_instruction','parser.py',105),
+  ('instruction -> for_instruction','instruction',1,'p_instruction','parser.py',106),
+  ('instruction -> parfor_instruction','instruction',1,'p_instruction','parser.py',107),
+  ('instruction -> break_instruction ;','instruction',2,'p_instruction','parser.py',108),
+  ('instruction -> continue_instruction ;','instruction',2,'p_instruction','parser.py',109),
+  ('instruction -> return_instruction ;','instruction',2,'p_instruction','parser.py',110),
+  ('instruction -> print_instruction ;','instruction',2,'p_instruction','parser.py',111),
+  ('instruction -> save_instruction ;','instruction',2,'p_instruction','parser.py',112),
+  ('instruction -> block','instruction',1,'p_instruction','parser.py',113),
+  ('expression -> SUB expression','expression',2,'p_unary_minus','parser.py',120),
+  ('expression -> number','expression',1,'p_expression','parser.py',129),
+  ('expression -> array','expression',1,'p_expression','parser.py',130),
+  ('expression -> variable','expression',1,'p_expression','parser.py',131),
+  ('expression -> STRING','expression',1,'p_expression','parser.py',132),
+  ('expression -> expression ADD expression','expression',3,'p_binary_operations','parser.py',142),
+  ('expression -> expression SUB expression','expression',3,'p_binary_operations','parser.py',143),
+  ('expression -> expression MUL expression','expression',3,'p_binary_operations','parser.py',144),
+  ('expression -> expression DIV expression','expression',3,'p_binary_operations','parser.py',145),
+  ('expression -> expression DOTADD expression','expression',3,'p_binary_operations_dot','parser.py',151),
+  ('expression -> expression DOTSUB expression','expression',3,'p_binary_operations_dot','parser.py',152),
+  ('expression -> expression DOTMUL expression','expression',3,'p_binary_operations_dot','parser.py',153),
+  ('expression -> expression DOTDIV expression','expression',3,'p_binary_operations_dot','parser.py',154),
+  ('expression -> ( expression )','expression',3,'p_expression_par','parser.py',160),
+  ('expression -> expression TRANSPOSE','expression',2,'p_transpose','parser.py',166),
+  ('expression -> matrix_func ( inner_array )','expression',4,'p_matrix_func_call','parser.py',172),
+  ('matrix_func -> EYE','matrix_func',1,'p_matrix_functions','parser.py',178),
+  ('matrix_func -> ZEROS','matrix_func',1,'p_matrix_functions','parser.py',179),
+  ('matrix_func -> ONES','matrix_func',1,'p_matrix_functions','parser.py',180),
+  ('expression -> LOAD ( expression )','expression',4,'p_load','parser.py',185),
+  ('expression -> expression SMALLER expression','expression',3,'p_binary_relations','parser.py',191),
+  ('expression -> expression GREATER expression','expression',3,'p_binary_relations','parser.py',192),
+  ('expression -> expression SMALLEREQ expression','expression',3,'p_binary_relations','parser.py',193),
+  ('expression -> expression GREATEREQ expression','expression',3,'p_binary_relations','parser.py',194),
+  ('expression -> expression NOTEQ expression','expression',3,'p_binary_relations','parser.py',195),
+  ('expression -> expression EQ expression','expression',3,'p_binary_relations','parser.py',196),
+  ('number -> INTNUM','number',1,'p_int','parser.py',203),
+  ('number -> FLOATNUM','number',1,'p_float','parser.py',209),
+  ('array -> [ ]','array',2,'p_array','parser.py',216),
+  ('array -> [ inner_array ]','array',3,'p_array','parser.py',217),
+  ('inner_array -> inner_array , expression','inner_array',3,'p_inner_array','parser.py',226),
+  ('inner_array -> expression','inner_array',1,'p_inner_array','parser.py',227),
+  ('range -> expression : expression','range',3,'p_range','parser.py',236),
+  ('indices_part -> range','indices_part',1,'p_indices_part','parser.py',242),
+  ('indices_part -> expression','indices_part',1,'p_indices_part','parser.py',243),
+  ('list_indices -> list_indices , indices_part','list_indices',3,'p_list_of_indices','parser.py',249),
+  ('list_indices -> indices_part','list_indices',1,'p_list_of_indices','parser.py',250),
+  ('list_arguments -> list_arguments , expression','list_arguments',3,'p_list_of_arguments','parser.py',259),
+  ('list_arguments -> expression','list_arguments',1,'p_list_of_arguments','parser.py',260),
+  ('variable -> ID','variable',1,'p_variable','parser.py',269),
+  ('variable -> ID [ list_indices ]','variable',4,'p_array_variable','parser.py',275),
+  ('variable -> STRING [ list_indices ]','variable',4,'p_string_variable','parser.py',283),
+  ('assignment -> variable ASSIGN expression','assignment',3,'p_assignment','parser.py',292),
+  ('assignment -> variable ADDASSIGN expression','assignment',3,'p_assignment','parser.py',293),
+  ('assignment -> variable SUBASSIGN expression','assignment',3,'p_assignment','parser.py',294),
+  ('assignment -> variable MULASSIGN expression','assignment',3,'p_assignment','parser.py',295),
+  ('assignment -> variable DIVASSIGN expression','assignment',3,'p_assignment','parser.py',296),
+  ('if_instruction -> IF ( expression ) instruction','if_instruction',5,'p_if_else_instruction','parser.py',302),
+  ('if_instruction -> IF ( expression ) instruction ELSE instruction','if_instruction',7,'p_if_else_instruction','parser.py',303),
+  ('while_instruction -> WHILE ( expression ) instruction','while_instruction',5,'p_while_instruction','parser.py',312),
+  ('for_instruction -> FOR ID ASSIGN range instruction','for_instruction',5,'p_for_instruction','parser.py',318),
+  ('parfor_instruction -> PARFOR ID ASSIGN range instruction','parfor_instruction',5,'p_parfor_instruction','parser.py',326),
+  ('parfor_instruction -> PARFOR ID ASSIGN range REDUCE reduction_variables instruction','parfor_instruction',7,'p_parfor_instruction','parser.py',327),
+  ('reduction_variables -> reduction_variables , ID','reduction_variables',3,'p_reduction_variables','parser.py',338),
+  ('reduction_variables -> ID','reduction_variables',1,'p_reduction_variables','parser.py',339),
+  ('break_instruction -> BREAK','break_instruction',1,'p_break_instruction','parser.py',346),
+  ('continue_instruction -> CONTINUE','continue_instruction',1,'p_continue_instruction','parser.py',352),
+  ('return_instruction -> RETURN','return_instruction',1,'p_return_instruction','parser.py',358),
+  ('return_instruction -> RETURN list_arguments','return_instruction',2,'p_return_instruction','parser.py',359),
+  ('print_instruction -> PRINT list_arguments','print_instruction',2,'p_print_instruction','parser.py',368),
+  ('save_instruction -> SAVE ( expression , expression )','save_instruction',6,'p_save_instruction','parser.py',374),
+]
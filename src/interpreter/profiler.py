@@ -0,0 +1,139 @@
+import json
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from .ast import Block, Identifier, Instruction
+
+__all__ = ['Profiler']
+
+
+class Profiler:
+    """Per line profile of programs run by interpreters it is attached to.
+
+    For every source line it records how many statements starting there were
+    executed, cumulative time (of the statements with everything they
+    executed), self time (of the line alone) and bytes of new numpy arrays
+    computed there. The profiler wraps visit and nested_statement methods of
+    the interpreter instance, so interpreters without it run exactly the same
+    code as before.
+    Iterations of parfor loops run by other processes are counted as self time
+    of the parfor line."""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.cumulative_times = defaultdict(int)
+        self.self_times = defaultdict(int)
+        self.allocated = defaultdict(int)
+        # Self times of stacks of lines, from the outermost one
+        self.stack_times = defaultdict(int)
+        # Lines being executed, each with time spent in the lines it called
+        self.stack = []
+        self.active_lines = defaultdict(int)
+        self.last_allocated = None
+
+    def attach(self, interpreter):
+        visit = interpreter.visit
+
+        def profiled_visit(node):
+            # Expressions are timed as part of their statements
+            if not isinstance(node, Instruction) or isinstance(node, Block):
+                return self.count_allocation(node, visit(node))
+            self.counts[node.lineno] += 1
+            return self.measure(visit, node, node.lineno)
+
+        nested_statement = interpreter.nested_statement
+
+        def profiled_nested_statement(node):
+            # Statements nested in the executed one are run by generators, which
+            # are timed from their start until they finish
+            statements = nested_statement(node)
+            if isinstance(node, Block):
+                return statements
+            self.counts[node.lineno] += 1
+            return self.measure_statements(statements, node.lineno)
+
+        interpreter.visit = profiled_visit
+        interpreter.nested_statement = profiled_nested_statement
+
+    @staticmethod
+    def detach(interpreter):
+        del interpreter.visit
+        del interpreter.nested_statement
+
+    def measure(self, visit, node, lineno):
+        frame = self.enter(lineno)
+        try:
+            return visit(node)
+        finally:
+            self.leave(frame)
+
+    def measure_statements(self, statements, lineno):
+        """Runs generator <statements> of a statement in line <lineno>, timing it."""
+        frame = self.enter(lineno)
+        try:
+            return (yield from statements)
+        finally:
+            self.leave(frame)
+
+    def enter(self, lineno):
+        frame = [lineno, 0, None]
+        self.stack.append(frame)
+        self.active_lines[lineno] += 1
+        frame[2] = time.perf_counter_ns()
+        return frame
+
+    def leave(self, frame):
+        lineno, nested, start = frame
+        elapsed = time.perf_counter_ns() - start
+        self.stack.pop()
+        self.active_lines[lineno] -= 1
+        # Recursive entries to the line are already counted by the outer one
+        if not self.active_lines[lineno]:
+            self.cumulative_times[lineno] += elapsed
+        self.self_times[lineno] += elapsed - nested
+        self.stack_times[tuple(line for line, _, _ in self.stack) + (lineno,)] += elapsed - nested
+        if self.stack:
+            self.stack[-1][1] += elapsed
+
+    def count_allocation(self, node, value):
+        if type(value) is np.ndarray and value.base is None and value is not self.last_allocated \
+                and not isinstance(node, Identifier):
+            self.allocated[node.lineno] += value.nbytes
+            self.last_allocated = value
+        return value
+
+    def lines(self):
+        """Returns statistics of lines sorted by self time, longest first."""
+        lines = set(self.counts) | set(self.self_times)
+        return [{'line': lineno,
+                 'count': self.counts[lineno],
+                 'cumulative_time': self.cumulative_times[lineno] / 1e9,
+                 'self_time': self.self_times[lineno] / 1e9,
+                 'allocated_bytes': self.allocated[lineno]}
+                for lineno in sorted(lines, key=lambda line: (-self.self_times[line], line))]
+
+    def report(self, source=None, file=None):
+        """Prints table of line statistics to <file> (None stands for sys.stderr),
+        with text of the lines taken from program <source>."""
+        file = sys.stderr if file is None else file
+        source_lines = [] if source is None else source.splitlines()
+        print(f'{"line":>6} {"count":>10} {"cumulative ms":>14} {"self ms":>10} {"allocated MiB":>14}  source',
+              file=file)
+        for stats in self.lines():
+            lineno = stats['line']
+            text = source_lines[lineno - 1].strip() if 0 < lineno <= len(source_lines) else ''
+            print(f'{lineno:>6} {stats["count"]:>10} {stats["cumulative_time"] * 1000:>14.3f} '
+                  f'{stats["self_time"] * 1000:>10.3f} {stats["allocated_bytes"] / 2 ** 20:>14.3f}  {text}',
+                  file=file)
+
+    def write_json(self, file):
+        json.dump({'lines': self.lines()}, file, indent=2)
+
+    def write_collapsed(self, file):
+        """Writes self times in microseconds of stacks of lines in the collapsed
+        format read by flame graph tools."""
+        for stack, elapsed in sorted(self.stack_times.items()):
+            file.write(f'{";".join(f"line {line}" for line in stack)} {elapsed // 1000}\n')
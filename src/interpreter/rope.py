@@ -0,0 +1,196 @@
+import operator as op
+
+
+def plain(value):
+    """Returns <value> with ropes turned into str, so that operations on it
+    behave (and fail) the same as on str."""
+    return str(value) if isinstance(value, Rope) else value
+
+
+class Rope:
+    """Immutable string kept as a height-balanced binary tree of short strings.
+
+    Concatenation, slicing and repetition only rebuild a logarithmic number of
+    nodes instead of copying the whole text, which is put together into a flat
+    str only when it is needed (printing, comparisons)."""
+
+    # Maximal length of string kept in a single leaf
+    LEAF_SIZE = 16384
+
+    def __init__(self, text='', left=None, right=None):
+        self.text = text
+        self.left = left
+        self.right = right
+        if left is None:
+            self.length = len(text)
+            self.height = 0
+        else:
+            self.length = left.length + right.length
+            self.height = max(left.height, right.height) + 1
+
+    @classmethod
+    def from_str(cls, text):
+        """Creates balanced rope with text <text>."""
+        leaves = [cls(text[i:i + cls.LEAF_SIZE]) for i in range(0, len(text), cls.LEAF_SIZE)]
+        return cls.from_leaves(leaves) if leaves else cls()
+
+    @classmethod
+    def from_leaves(cls, leaves):
+        if len(leaves) == 1:
+            return leaves[0]
+        middle = len(leaves) // 2
+        return cls(left=cls.from_leaves(leaves[:middle]), right=cls.from_leaves(leaves[middle:]))
+
+    @classmethod
+    def as_rope(cls, value):
+        return value if isinstance(value, Rope) else cls.from_str(value)
+
+    @property
+    def is_leaf(self):
+        return self.left is None
+
+    # Tree operations
+    @classmethod
+    def balance(cls, left, right):
+        """Joins ropes <left> and <right> whose heights differ by at most two."""
+        if left.height > right.height + 1:
+            if left.left.height >= left.right.height:
+                return cls(left=left.left, right=cls(left=left.right, right=right))
+            return cls(left=cls(left=left.left, right=left.right.left),
+                       right=cls(left=left.right.right, right=right))
+        if right.height > left.height + 1:
+            if right.right.height >= right.left.height:
+                return cls(left=cls(left=left, right=right.left), right=right.right)
+            return cls(left=cls(left=left, right=right.left.left),
+                       right=cls(left=right.left.right, right=right.right))
+        return cls(left=left, right=right)
+
+    @classmethod
+    def join(cls, left, right):
+        """Concatenates ropes <left> and <right> keeping the result balanced."""
+        if left.length == 0:
+            return right
+        if right.length == 0:
+            return left
+        if left.is_leaf and right.is_leaf and left.length + right.length <= cls.LEAF_SIZE:
+            return cls(left.text + right.text)
+        # Short leaves are merged with the neighbouring leaf of the other rope
+        if left.height > right.height + 1 or (right.is_leaf and not left.is_leaf and right.length < cls.LEAF_SIZE):
+            return cls.balance(left.left, cls.join(left.right, right))
+        if right.height > left.height + 1 or (left.is_leaf and not right.is_leaf and left.length < cls.LEAF_SIZE):
+            return cls.balance(cls.join(left, right.left), right.right)
+        return cls(left=left, right=right)
+
+    def split(self, index):
+        """Splits rope into ropes with text before and after position <index>."""
+        if self.is_leaf:
+            return Rope(self.text[:index]), Rope(self.text[index:])
+        if index <= self.left.length:
+            left, right = self.left.split(index)
+            return left, Rope.join(right, self.right)
+        left, right = self.right.split(index - self.left.length)
+        return Rope.join(self.left, left), right
+
+    def replace(self, start, stop, other):
+        """Returns rope with text between positions <start> and <stop> (0 <= start
+        <= stop <= length) replaced by rope <other>."""
+        if self.is_leaf:
+            if other.is_leaf:
+                return Rope.from_str(self.text[:start] + other.text + self.text[stop:])
+            return Rope.join(Rope.join(Rope(self.text[:start]), other), Rope(self.text[stop:]))
+        if stop <= self.left.length:
+            return Rope.join(self.left.replace(start, stop, other), self.right)
+        if start >= self.left.length:
+            return Rope.join(self.left, self.right.replace(start - self.left.length,
+                                                           stop - self.left.length, other))
+        left = self.left.split(start)[0]
+        right = self.right.split(stop - self.left.length)[1]
+        return Rope.join(Rope.join(left, other), right)
+
+    def splice(self, start, stop, other):
+        """Returns self[:start] + other + self[stop:]."""
+        other = Rope.as_rope(other)
+        start = slice(start).indices(self.length)[1]
+        stop = slice(stop, None).indices(self.length)[0]
+        if start <= stop:
+            return self.replace(start, stop, other)
+        return Rope.join(Rope.join(self[:start], other), self[stop:])
+
+    def leaves(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf:
+                yield node.text
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+    # String operations
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return ''.join(self.leaves())
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            start, stop, _ = slice(index, index + 1 or None).indices(self.length)
+            if start >= stop:
+                raise IndexError('string index out of range')
+        else:
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                return Rope.from_str(str(self)[index])
+        if start >= stop:
+            return Rope()
+        return self.split(stop)[0].split(start)[1]
+
+    def __add__(self, other):
+        if not isinstance(other, (Rope, str)):
+            return str(self) + other
+        return Rope.join(self, Rope.as_rope(other))
+
+    def __radd__(self, other):
+        if not isinstance(other, str):
+            return other + str(self)
+        return Rope.join(Rope.from_str(other), self)
+
+    def __mul__(self, times):
+        try:
+            times = op.index(times)
+        except TypeError:
+            return str(self) * times
+        result, power = Rope(), self
+        while times > 0:
+            if times % 2:
+                result = Rope.join(result, power)
+            times //= 2
+            if times:
+                power = Rope.join(power, power)
+        return result
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if not isinstance(other, (Rope, str)):
+            return NotImplemented
+        return len(self) == len(other) and str(self) == str(other)
+
+    def __lt__(self, other):
+        return str(self) < plain(other)
+
+    def __le__(self, other):
+        return str(self) <= plain(other)
+
+    def __gt__(self, other):
+        return str(self) > plain(other)
+
+    def __ge__(self, other):
+        return str(self) >= plain(other)
+
+    def __hash__(self):
+        return hash(str(self))
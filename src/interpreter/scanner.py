@@ -5,6 +5,8 @@ For each lexeme scanner returns its token, line number and the lexeme itself.
 """
 import ply.lex as lex
 
+from .exceptions import ProgramError
+
 
 # noinspection PySingleQuotedDocstring,PyPep8Naming
 class Scanner:
@@ -16,6 +18,8 @@ class Scanner:
         'if': 'IF',
         'else': 'ELSE',
         'for': 'FOR',
+        'parfor': 'PARFOR',
+        'reduce': 'REDUCE',
         'while': 'WHILE',
         'break': 'BREAK',
         'continue': 'CONTINUE',
@@ -23,7 +27,9 @@ class Scanner:
         'eye': 'EYE',
         'zeros': 'ZEROS',
         'ones': 'ONES',
-        'print': 'PRINT'}
+        'print': 'PRINT',
+        'load': 'LOAD',
+        'save': 'SAVE'}
 
     # Tokens declaration
     tokens = [
@@ -79,7 +85,11 @@ class Scanner:
     GOT_LEXICAL_ERROR = False
 
     # Builds the lexer
-    def __init__(self, **kwargs):
+    def __init__(self, output=None, **kwargs):
+        # ProgramErrors found in the scanned text, reported also to <output>
+        # (None stands for sys.stdout)
+        self.errors = []
+        self.output = output
         self.lexer = lex.lex(module=self, **kwargs)
 
     # Handles comments
@@ -119,12 +129,12 @@ class Scanner:
         t.lexer.lineno += len(t.value)
 
     # Informs about incorrect input
-    @staticmethod
-    def t_error(t):
+    def t_error(self, t):
         if t.value[0] == '"':
-            print(f'Error({t.lineno}): Illegal character \'"\''
-                  ' - missing closing double-quote character in the line')
+            message = 'Illegal character \'"\' - missing closing double-quote character in the line'
         else:
-            print(f"Error({t.lineno}): Illegal character '{t.value[0]}'")
+            message = f"Illegal character '{t.value[0]}'"
+        print(f'Error({t.lineno}): {message}', file=self.output)
+        self.errors.append(ProgramError('lexical', message, t.lineno))
         Scanner.GOT_LEXICAL_ERROR = True
         t.lexer.skip(1)
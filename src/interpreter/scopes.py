@@ -0,0 +1,43 @@
+from . import ast
+from .deep_expressions import run_nested
+
+
+def mark_scopes(program):
+    """Marks loops and conditional instructions of <program> with new_scope,
+    which is False if they never create variables, so that they can run in the
+    memory of the enclosing scope.
+
+    Only assignments which are always executed before an instruction count as
+    declaring variables for it, so the analysis never misses a variable
+    created at run time."""
+    if program.instructions_opt is not None:
+        run_nested(declare(program.instructions_opt, set()))
+
+
+def declare(node, defined):
+    """Adds to <defined> variables which instruction <node> creates in the
+    current memory, marking nested scopes on the way. Generator run by
+    run_nested, which yields the nested instructions."""
+    if isinstance(node, ast.List):
+        for instruction in node.elements:
+            yield declare(instruction, defined)
+    elif isinstance(node, ast.Block):
+        if node.instructions is not None:
+            yield declare(node.instructions, defined)
+    elif isinstance(node, ast.Assignment):
+        if node.operator == '=' and isinstance(node.left, ast.Identifier):
+            defined.add(node.left.name)
+    elif isinstance(node, ast.If):
+        created = set(defined)
+        yield declare(node.if_block, created)
+        if node.else_block is not None:
+            yield declare(node.else_block, created)
+        node.new_scope = len(created) > len(defined)
+    elif isinstance(node, (ast.For, ast.ParFor)):
+        created = defined | {node.variable.name}
+        yield declare(node.instruction, created)
+        node.new_scope = len(created) > len(defined)
+    elif isinstance(node, ast.While):
+        created = set(defined)
+        yield declare(node.instruction, created)
+        node.new_scope = len(created) > len(defined)
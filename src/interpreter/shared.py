@@ -0,0 +1,74 @@
+import os
+import tempfile
+from multiprocessing import shared_memory
+
+import numpy as np
+
+__all__ = ['SharedMatrix']
+
+
+class SharedMatrix:
+    """Handle of matrix kept in shared memory.
+
+    A coordinator publishes the matrix once, then passes the (picklable) handle
+    to any number of interpreters, also in other processes, which get it as a
+    pre-bound variable. All of them map the same physical memory, either
+    read-only (mode 'r') or copy-on-write (mode 'c'), when only the pages a
+    program writes to are copied."""
+
+    # Directory in which POSIX shared memory objects are visible as files. Where
+    # there is none (macOS, Windows) matrices are published as temporary files,
+    # whose pages are shared through the page cache the same way
+    SHARED_MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+    def __init__(self, name, shape, dtype, mode='r'):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.mode = mode
+        # Set only in the publishing process, which owns the memory
+        self.shared_memory = None
+
+    @classmethod
+    def publish(cls, array, mode='r'):
+        """Copies <array> into new shared memory block and returns its handle."""
+        array = np.asarray(array)
+        if cls.SHARED_MEMORY_DIR is None:
+            descriptor, path = tempfile.mkstemp(prefix='shared_matrix_')
+            with os.fdopen(descriptor, 'wb') as file:
+                np.ascontiguousarray(array).tofile(file)
+            return cls(path, array.shape, array.dtype, mode)
+        memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=memory.buf)[...] = array
+        handle = cls(memory.name, array.shape, array.dtype, mode)
+        handle.shared_memory = memory
+        return handle
+
+    def attach(self):
+        """Maps the shared matrix into memory of this process."""
+        if self.dtype.itemsize * int(np.prod(self.shape)) == 0:
+            return np.empty(self.shape, self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode=self.mode, shape=self.shape)
+
+    @property
+    def path(self):
+        """File through which the matrix is mapped. Mapping a file gives
+        copy-on-write mode, which SharedMemory itself does not support."""
+        if self.SHARED_MEMORY_DIR is None:
+            return self.name
+        return os.path.join(self.SHARED_MEMORY_DIR, self.name.lstrip('/'))
+
+    def unlink(self):
+        """Frees the shared memory, can be called only by the publishing process.
+        Interpreters which attached the matrix keep their mappings."""
+        if self.SHARED_MEMORY_DIR is None:
+            os.remove(self.name)
+            return
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+        self.shared_memory = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['shared_memory'] = None
+        return state
@@ -0,0 +1,317 @@
+import operator as op
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class TransposedElements(MutableMapping):
+    """Non-zero elements <elements> of a matrix seen as those of its transpose,
+    with rows and columns of the keys swapped. Changes are made to <elements>."""
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def __getitem__(self, key):
+        return self.elements[key[::-1]]
+
+    def __setitem__(self, key, value):
+        self.elements[key[::-1]] = value
+
+    def __delitem__(self, key):
+        del self.elements[key[::-1]]
+
+    def __contains__(self, key):
+        return key[::-1] in self.elements
+
+    def __iter__(self):
+        return ((j, i) for i, j in self.elements)
+
+    def __len__(self):
+        return len(self.elements)
+
+
+class SubmatrixElements(MutableMapping):
+    """Non-zero elements <elements> of a matrix seen as those of its submatrix
+    made of rows <rows> and columns <cols> (ranges), with the keys numbered
+    from the start of the ranges. Changes are made to <elements>."""
+
+    def __init__(self, elements, rows, cols):
+        self.elements = elements
+        self.rows = rows
+        self.cols = cols
+
+    def __getitem__(self, key):
+        return self.elements[self.rows[key[0]], self.cols[key[1]]]
+
+    def __setitem__(self, key, value):
+        self.elements[self.rows[key[0]], self.cols[key[1]]] = value
+
+    def __delitem__(self, key):
+        del self.elements[self.rows[key[0]], self.cols[key[1]]]
+
+    def __contains__(self, key):
+        i, j = key
+        return 0 <= i < len(self.rows) and 0 <= j < len(self.cols) and (self.rows[i], self.cols[j]) in self.elements
+
+    def __iter__(self):
+        rows, cols = self.rows, self.cols
+        if len(rows) * len(cols) < len(self.elements):
+            return ((i, j) for i, row in enumerate(rows) for j, col in enumerate(cols)
+                    if (row, col) in self.elements)
+        return ((rows.index(row), cols.index(col)) for row, col in self.elements if row in rows and col in cols)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class SparseMatrix:
+    """Two dimensional matrix which keeps only its non-zero elements, in a dictionary
+    mapping (row, column) to value.
+
+    It supports the operations the interpreter performs on arrays: indexing,
+    (sub)matrix assignment, element-wise operations, transpose and matrix product.
+    Results of operations which are mostly non-zero are returned as dense arrays.
+    Like numpy's, transposes and submatrices are views sharing the elements
+    with the matrix, while single rows and columns are dense copies."""
+
+    # Fraction of non-zero elements above which a dense array takes less memory
+    DENSITY_THRESHOLD = 0.05
+
+    # Makes numpy leave binary operations with dense arrays to the methods below
+    __array_ufunc__ = None
+
+    def __init__(self, shape, dtype=int, elements=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.elements = {} if elements is None else elements
+
+    @classmethod
+    def eye(cls, size, dtype=int):
+        """Creates identity matrix of shape <size>x<size>."""
+        one = np.dtype(dtype).type(1).item()
+        return cls((size, size), dtype, {(i, i): one for i in range(size)})
+
+    @classmethod
+    def from_coordinates(cls, shape, rows, cols, data):
+        """Creates matrix having values <data> at positions (<rows>, <cols>)."""
+        nonzero = data != 0
+        keys = zip(rows[nonzero].tolist(), cols[nonzero].tolist())
+        return cls(shape, data.dtype, dict(zip(keys, data[nonzero].tolist())))
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    @property
+    def T(self):
+        """Transpose sharing the elements with this matrix, like numpy's."""
+        if isinstance(self.elements, TransposedElements):
+            return SparseMatrix(self.shape[::-1], self.dtype, self.elements.elements)
+        return SparseMatrix(self.shape[::-1], self.dtype, TransposedElements(self.elements))
+
+    def coordinates(self):
+        """Returns rows, columns and values of non-zero elements as arrays."""
+        keys = np.array(list(self.elements), dtype=np.intp).reshape(-1, 2)
+        data = np.fromiter(self.elements.values(), dtype=self.dtype, count=len(self.elements))
+        return keys[:, 0], keys[:, 1], data
+
+    def toarray(self):
+        """Returns dense copy of the matrix."""
+        array = np.zeros(self.shape, self.dtype)
+        rows, cols, data = self.coordinates()
+        array[rows, cols] = data
+        return array
+
+    def is_too_dense(self):
+        """Checks whether matrix should rather be dense."""
+        return len(self.elements) > self.DENSITY_THRESHOLD * self.size
+
+    def densify_if_needed(self):
+        return self.toarray() if self.is_too_dense() else self
+
+    # Indexing
+    def axes(self, index):
+        """Converts <index> into pair of row and column selections. Selection is
+        either a single position or a range of positions."""
+        if not isinstance(index, tuple):
+            index = (index,)
+        if len(index) == 1:
+            index += (slice(None),)
+        if len(index) != 2:
+            raise IndexError(f'too many indices for matrix: matrix is 2-dimensional, but {len(index)} were indexed')
+        return [self.axis(idx, size) for idx, size in zip(index, self.shape)]
+
+    @staticmethod
+    def axis(idx, size):
+        if isinstance(idx, range):
+            idx = slice(idx.start, idx.stop, idx.step)
+        if isinstance(idx, slice):
+            return range(*idx.indices(size))
+        idx = op.index(idx)
+        if not -size <= idx < size:
+            raise IndexError(f'index {idx} is out of bounds for axis with size {size}')
+        return idx % size
+
+    def select(self, rows, cols):
+        """Returns keys of non-zero elements lying in rows <rows> and columns <cols>."""
+        if len(rows) * len(cols) < len(self.elements):
+            return [(i, j) for i in rows for j in cols if (i, j) in self.elements]
+        return [(i, j) for i, j in self.elements if i in rows and j in cols]
+
+    def region_shape(self, rows, cols):
+        """Returns shape of result of indexing with selections <rows> and <cols>,
+        same as numpy would."""
+        return tuple(len(axis) for axis in (rows, cols) if isinstance(axis, range))
+
+    @staticmethod
+    def as_range(axis):
+        return range(axis, axis + 1) if isinstance(axis, int) else axis
+
+    def __getitem__(self, index):
+        rows, cols = self.axes(index)
+        if isinstance(rows, int) and isinstance(cols, int):
+            return self.dtype.type(self.elements.get((rows, cols), 0))
+
+        shape = self.region_shape(rows, cols)
+        rows, cols = self.as_range(rows), self.as_range(cols)
+        submatrix = SparseMatrix((len(rows), len(cols)), self.dtype, SubmatrixElements(self.elements, rows, cols))
+        if len(shape) == 1:
+            return submatrix.toarray().reshape(shape)
+        return submatrix
+
+    def region_values(self, index, value):
+        """Returns rows, columns and values of 2-dimensional region <index> after
+        assigning <value> to it."""
+        rows, cols = self.axes(index)
+        shape = self.region_shape(rows, cols)
+        rows, cols = self.as_range(rows), self.as_range(cols)
+        if isinstance(value, SparseMatrix):
+            value = value.toarray()
+        values = np.broadcast_to(np.asarray(value).astype(self.dtype, copy=False), shape)
+        return rows, cols, values.reshape(len(rows), len(cols))
+
+    def __setitem__(self, index, value):
+        rows, cols, values = self.region_values(index, value)
+        for key in self.select(rows, cols):
+            del self.elements[key]
+        row_ids, col_ids = np.nonzero(values)
+        keys = zip((rows.start + row_ids * rows.step).tolist(), (cols.start + col_ids * cols.step).tolist())
+        self.elements.update(zip(keys, values[row_ids, col_ids].tolist()))
+
+    # Element-wise operations
+    def values_at(self, other, rows, cols):
+        """Returns values of number, array or sparse matrix <other> at positions
+        (<rows>, <cols>) of this matrix."""
+        if isinstance(other, SparseMatrix):
+            if other.shape != self.shape:
+                raise ValueError(f'operands could not be broadcast together with shapes {self.shape} {other.shape}')
+            return np.fromiter((other.elements.get(key, 0) for key in zip(rows.tolist(), cols.tolist())),
+                               dtype=other.dtype, count=len(rows))
+        if isinstance(other, np.ndarray):
+            return np.broadcast_to(other, self.shape)[rows, cols]
+        return other
+
+    def zero_preserving(self, other, function):
+        """Applies <function>, which gives zero for zero first argument, to non-zero elements."""
+        rows, cols, data = self.coordinates()
+        if isinstance(other, np.ndarray) and np.broadcast_shapes(self.shape, other.shape) != self.shape:
+            return function(self.toarray(), other)
+        return SparseMatrix.from_coordinates(self.shape, rows, cols,
+                                             function(data, self.values_at(other, rows, cols))).densify_if_needed()
+
+    def additive(self, other, function):
+        """Applies <function>, which is addition or subtraction, to this and <other> matrix."""
+        if isinstance(other, SparseMatrix):
+            if other.shape != self.shape:
+                raise ValueError(f'operands could not be broadcast together with shapes {self.shape} {other.shape}')
+            elements = dict(self.elements)
+            for key, value in other.elements.items():
+                elements[key] = function(elements.get(key, 0), value)
+            result = SparseMatrix(self.shape, np.result_type(self.dtype, other.dtype),
+                                  {key: value for key, value in elements.items() if value != 0})
+            return result.densify_if_needed()
+        if np.ndim(other) == 0 and other == 0:
+            return self.zero_preserving(other, function)
+        return function(self.toarray(), other)
+
+    def __add__(self, other):
+        return self.additive(other, op.add)
+
+    def __radd__(self, other):
+        return self.additive(other, op.add)
+
+    def __sub__(self, other):
+        return self.additive(other, op.sub)
+
+    def __rsub__(self, other):
+        return -self.additive(other, op.sub)
+
+    def __mul__(self, other):
+        return self.zero_preserving(other, op.mul)
+
+    def __rmul__(self, other):
+        return self.zero_preserving(other, op.mul)
+
+    def __truediv__(self, other):
+        if isinstance(other, SparseMatrix):
+            # Division by zeros of the other matrix makes the result dense
+            return self.toarray() / other.toarray()
+        return self.zero_preserving(other, op.truediv)
+
+    def __rtruediv__(self, other):
+        return other / self.toarray()
+
+    def __neg__(self):
+        return SparseMatrix(self.shape, self.dtype, {key: -value for key, value in self.elements.items()})
+
+    # Matrix product
+    def __matmul__(self, other):
+        if isinstance(other, SparseMatrix):
+            if self.shape[1] != other.shape[0]:
+                raise ValueError(f'matmul: mismatch in core dimension: {self.shape} {other.shape}')
+            other_rows = {}
+            for (k, j), value in other.elements.items():
+                other_rows.setdefault(k, []).append((j, value))
+            elements = {}
+            for (i, k), value in self.elements.items():
+                for j, other_value in other_rows.get(k, []):
+                    elements[i, j] = elements.get((i, j), 0) + value * other_value
+            result = SparseMatrix((self.shape[0], other.shape[1]), np.result_type(self.dtype, other.dtype),
+                                  {key: value for key, value in elements.items() if value != 0})
+            return result.densify_if_needed()
+
+        other = np.asarray(other)
+        if self.shape[1] != other.shape[0]:
+            raise ValueError(f'matmul: mismatch in core dimension: {self.shape} {other.shape}')
+        rows, cols, data = self.coordinates()
+        result = np.zeros((self.shape[0],) + other.shape[1:], np.result_type(self.dtype, other.dtype))
+        np.add.at(result, rows, data.reshape((-1,) + (1,) * (other.ndim - 1)) * other[cols])
+        return result
+
+    def __rmatmul__(self, other):
+        return (self.T @ np.asarray(other).T).T
+
+    def __str__(self):
+        options = np.get_printoptions()
+        if self.size <= options['threshold']:
+            return str(self.toarray())
+        # Numpy prints only edgeitems first and last rows and columns of large
+        # arrays, so only these (and one in the middle, standing for the
+        # skipped ones) are made dense
+        edge = options['edgeitems']
+        positions = [{index: position for position, index in enumerate(
+            range(size) if size <= 2 * edge else [*range(edge), size // 2, *range(size - edge, size)])}
+            for size in self.shape]
+        block = np.zeros([len(axis) for axis in positions], self.dtype)
+        for (i, j), value in self.elements.items():
+            if i in positions[0] and j in positions[1]:
+                block[positions[0][i], positions[1][j]] = value
+        with np.printoptions(threshold=0):
+            return str(block)
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,313 @@
+import math
+
+import numpy as np
+
+from . import ast
+from .exceptions import ProgramError, ReturnValueException
+from .ir import Constant, Phi, STATEMENTS
+from .ir_builder import NUMBERS, IRBuilder, lower_loop
+from .ir_compiler import operation_callable
+from .ir_passes import reverse_postorder
+
+# Specializations of a loop made before it is left to the tree walker for good
+MAX_VERSIONS = 3
+
+
+def observed_type(value):
+    """Returns type of the IR of <value> bound to a variable, as checked by guards."""
+    kind = type(value)
+    if kind is bool:
+        return 'bool'
+    if kind is int:
+        return 'int'
+    if kind is float:
+        return 'float'
+    if kind is np.ndarray and value.ndim == 2:
+        return f'matrix<{ {"i": "int", "u": "int", "f": "float"}.get(value.dtype.kind, "unknown")}>'
+    return 'unknown'
+
+
+def resolve(value):
+    """Returns value which replaced <value>, if it was a trivial phi."""
+    while isinstance(value, Phi) and value.replacement is not None:
+        value = value.replacement
+    return value
+
+
+class SpecializedLoop:
+    """Loop <node> lowered through the IR to a Python function, specialized for
+    variables <types> mapped to the types of their values seen when it got hot
+    ('undefined' for variables which were not bound). Arithmetic on numbers,
+    comparisons and element reads of matrices with numbers are written inline,
+    other operations call the value-level methods of <interpreter>.
+
+    The function may run only while the guards hold: every variable has the
+    type it was specialized for or is not bound. If the program fails inside
+    the function, variables get the values they had when the failing
+    statement started, as if the tree walker ran it."""
+
+    def __init__(self, node, types, interpreter):
+        self.node = node
+        self.interpreter = interpreter
+        self.guards = [(name, type) for name, type in types.items()
+                       if type != 'unknown' and not name.startswith('.')]
+        function = lower_loop(node, types)
+        # Globals of the generated code: callables of operations and constants
+        self.namespace = {'step': interpreter.step}
+        # Values mapped to names of the locals of the generated code holding them
+        self.locals = {}
+        # Lines of the generated code mapped to operations computed in them
+        self.lines = {}
+        self.inlined = set()
+        parameters = [operation for operation in function.entry.operations if operation.opcode == 'variable']
+        self.parameters = [operation.attribute for operation in parameters]
+        self.scoped = function.scoped
+        source = self.generate(function, parameters)
+        exec(compile(source, f'<loop at line {node.lineno}>', 'exec'), self.namespace)
+        self.function = self.namespace['specialized']
+        self.code = self.function.__code__
+        self.source = source
+        self.runs = 0
+        self.deoptimizations = 0
+
+    def matches(self, values):
+        """Returns whether variables <values> (None for the ones not bound) pass the guards."""
+        for name, type in self.guards:
+            value = values[name]
+            if value is not None and observed_type(value) != type:
+                return False
+        return True
+
+    # Code generation
+    def name(self, value):
+        """Returns Python expression of <value> in the generated code."""
+        if isinstance(value, Constant):
+            constant = value.value
+            if constant is None or type(constant) in (bool, int) or type(constant) is float and math.isfinite(constant):
+                return repr(constant)
+            return self.constant(constant)
+        name = self.locals.get(value)
+        if name is None:
+            name = self.locals[value] = f'v{len(self.locals)}'
+        return name
+
+    def constant(self, value):
+        name = f'c{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def inline(self, operation):
+        """Returns Python expression computing <operation> from its operands, None
+        if it is left to a value-level method of the interpreter."""
+        opcode, attribute = operation.opcode, operation.attribute
+        operands = [self.name(value) for value in operation.operands]
+        types = [value.type for value in operation.operands]
+        if opcode == 'compare':
+            return f'{operands[0]} {attribute} {operands[1]}'
+        if opcode == 'element_wise':
+            return f'{operands[0]} {attribute[1]} {operands[1]}'
+        # Products of two matrices are matrix products, other operands are multiplied by *
+        if opcode == 'binary' and (attribute != '*' or types[0] in NUMBERS or types[1] in NUMBERS):
+            return f'{operands[0]} {attribute} {operands[1]}'
+        # Operation assignments turn errors into ProgramErrors, + - * of numbers never fail
+        if opcode == 'update' and attribute[0] in '+-*' and types[0] in NUMBERS and types[1] in NUMBERS:
+            return f'{operands[0]} {attribute[0]} {operands[1]}'
+        if opcode == 'negate':
+            return f'-{operands[0]}'
+        if opcode in ('transpose', 'field'):
+            return f'({operands[0]}).{"T" if opcode == "transpose" else attribute}'
+        if opcode == 'defined':
+            return f'{operands[0]} is not None'
+        if opcode == 'range':
+            return f'range({operands[0]}, {operands[1]})'
+        if opcode == 'result':
+            return f'{operands[0]}[{attribute!r}]'
+        if opcode == 'index' and len(operands) == 3 and types[0].startswith('matrix') \
+                and types[1] == types[2] == 'int':
+            self.inlined.add(operation)
+            return f'{operands[0]}[{operands[1]}, {operands[2]}]'
+        return None
+
+    def generate(self, function, parameters):
+        """Returns source of function specialized(counting, parameters...), which
+        runs the blocks of <function>, calling step when <counting> is set.
+        It returns a tuple of the terminator (kind, names, node) and values of
+        the names."""
+        blocks = {block: index for index, block in enumerate(reverse_postorder(function))}
+        lines = [f'def specialized(counting, {", ".join(self.name(value) for value in parameters)}):',
+                 '    block = 0',
+                 '    while True:']
+
+        def add(line, operation):
+            lines.append(line)
+            self.lines[len(lines)] = operation
+
+        def edge(block, target, indent):
+            index = target.predecessors.index(block)
+            if target.phis:
+                add(f'{indent}{", ".join(self.name(phi) for phi in target.phis)}, = '
+                    f'{", ".join(self.name(phi.operands[index]) for phi in target.phis)},', block.terminator)
+            lines.append(f'{indent}block = {blocks[target]}')
+            if blocks[target] <= blocks[block]:
+                lines.append(f'{indent}continue')
+
+        for block, index in blocks.items():
+            lines.append(f'        if block == {index}:')
+            first = block.operations[0] if block.operations else block.terminator
+            if block.steps:
+                lines.append('            if counting:')
+                add(f'                step({block.steps})', first)
+            for operation in block.operations:
+                if operation.opcode == 'variable':
+                    continue
+                expression = self.inline(operation)
+                if expression is None:
+                    callable = self.constant(operation_callable(operation, self.interpreter))
+                    expression = f'{callable}({", ".join(self.name(value) for value in operation.operands)})'
+                if operation.opcode in STATEMENTS:
+                    add(f'            {expression}', operation)
+                else:
+                    add(f'            {self.name(operation)} = {expression}', operation)
+            terminator = block.terminator
+            if terminator.opcode == 'jump':
+                edge(block, terminator.targets[0], '            ')
+            elif terminator.opcode == 'branch':
+                add(f'            if {self.name(terminator.operands[0])}:', terminator)
+                edge(block, terminator.targets[0], '                ')
+                lines.append('            else:')
+                edge(block, terminator.targets[1], '                ')
+            else:
+                exit = self.constant((terminator.opcode, terminator.attribute, terminator.node))
+                values = ''.join(f'{self.name(value)}, ' for value in terminator.operands)
+                add(f'            return {exit}, ({values})', terminator)
+        return '\n'.join(lines) + '\n'
+
+    # Execution
+    def run(self, values):
+        """Runs the loop with variables <values> (and .iterations of a for loop),
+        which pass the guards."""
+        interpreter = self.interpreter
+        self.runs += 1
+        try:
+            (kind, names, node), results = self.function(interpreter.checkpoint is not None,
+                                                         *[values[name] for name in self.parameters])
+        except BaseException as error:
+            self.deoptimize(error, values)
+            raise
+        finally:
+            for name in self.parameters:
+                interpreter.owned_arrays.pop(name, None)
+        for name, value in zip(names, results):
+            self.store(name, value, values)
+        if kind == 'return':
+            raise ReturnValueException(node.args)
+
+    def store(self, name, value, values):
+        """Leaves <value> of variable <name> in the memory, unless the variable
+        was created in a scope of the loop (it was not bound in <values>)."""
+        if value is not None and (name not in self.scoped or values[name] is not None):
+            self.interpreter.memory_stack.insert(name, value)
+
+    def deoptimize(self, error, values):
+        """Leaves variables in the state before the statement which raised <error>
+        started (in the run with variables <values>) and turns errors of inlined element reads into ProgramErrors."""
+        traceback = error.__traceback__
+        while traceback is not None and traceback.tb_frame.f_code is not self.code:
+            traceback = traceback.tb_next
+        if traceback is None:
+            return
+        operation = self.lines.get(traceback.tb_lineno)
+        if operation is None or operation.state is None:
+            return
+        registers = traceback.tb_frame.f_locals
+        for name, value in operation.state.items():
+            value = resolve(value)
+            value = value.value if isinstance(value, Constant) else registers.get(self.locals.get(value))
+            self.store(name, value, values)
+        if operation.lineno is not None:
+            self.interpreter.lineno = operation.lineno
+        if isinstance(error, IndexError) and operation in self.inlined:
+            raise ProgramError('runtime', 'Wrong indexing', operation.lineno) from error
+
+
+class TieredLoops:
+    """Second tier of <interpreter>: counts back edges of its for and while
+    loops and compiles loops which take <threshold> of them into
+    SpecializedLoops, which run the rest of the loop and its later runs.
+
+    Runs whose variables do not pass the guards of the compiled loop go back to
+    the tree walker (deoptimize); the loop is then counted again and compiled
+    for the new types, at most MAX_VERSIONS times."""
+
+    def __init__(self, interpreter, threshold):
+        self.interpreter = interpreter
+        self.threshold = threshold
+        # Loops mapped to back edges left before they are compiled, -1 for
+        # loops which are never compiled
+        self.budgets = {}
+        self.compiled = {}
+        # Loops mapped to numbers of their specializations
+        self.versions = {}
+        # Compiled loops, including dropped ones, for the report
+        self.history = []
+
+    def budget(self, node):
+        return self.budgets.get(node, self.threshold)
+
+    def bound(self, node):
+        """Returns variables of loop <node> mapped to their values (None if not bound)."""
+        memory_stack = self.interpreter.memory_stack
+        values = {}
+        for name in {identifier.name for identifier in IRBuilder.identifiers(node)}:
+            try:
+                values[name] = memory_stack.get(name)
+            except KeyError:
+                values[name] = None
+        return values
+
+    def run(self, node, iterations=None):
+        """Runs loop <node> (for loops with <iterations>) compiled if it was
+        compiled and its variables pass the guards, returns whether it did."""
+        code = self.compiled.get(node)
+        if code is None:
+            return False
+        values = self.bound(node)
+        if not code.matches(values):
+            code.deoptimizations += 1
+            del self.compiled[node]
+            self.budgets[node] = self.threshold if self.versions[node] < MAX_VERSIONS else -1
+            return False
+        values['.iterations'] = iterations
+        code.run(values)
+        return True
+
+    def promote(self, node, iterations=None):
+        """Compiles loop <node>, which got hot, and runs the rest of it (for loops
+        the remaining <iterations>), returns whether it did."""
+        values = self.bound(node)
+        types = {name: 'undefined' if value is None else observed_type(value) for name, value in values.items()}
+        if isinstance(node, ast.For):
+            types['.iterations'] = 'range'
+        try:
+            code = SpecializedLoop(node, types, self.interpreter)
+        except (TypeError, ValueError):
+            self.budgets[node] = -1
+            return False
+        self.versions[node] = self.versions.get(node, 0) + 1
+        self.compiled[node] = code
+        self.history.append(code)
+        values['.iterations'] = iterations
+        code.run(values)
+        return True
+
+    def report(self):
+        """Returns table of the compiled loops."""
+        lines = [f'{len(self.versions)} loops promoted after {self.threshold} back edges',
+                 f'{"line":>6} {"loop":<6} {"version":>8} {"runs":>8} {"deoptimizations":>16}']
+        versions = {}
+        for code in self.history:
+            versions[code.node] = versions.get(code.node, 0) + 1
+            kind = 'for' if isinstance(code.node, ast.For) else 'while'
+            lines.append(f'{code.node.lineno:>6} {kind:<6} {versions[code.node]:>8} {code.runs:>8} '
+                         f'{code.deoptimizations:>16}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,42 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class TiledExecutor:
+    """Runs ufuncs on large arrays in blocks of rows on a pool of threads.
+
+    NumPy releases the GIL inside ufunc loops, so the blocks are computed in
+    parallel. Arrays smaller than the threshold are computed by a single call."""
+
+    def __init__(self, workers=None, threshold=2 ** 20):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.threshold = threshold
+        self.pool = None
+
+    def is_parallel(self, values, out):
+        """Checks whether ufunc on <values> writing to <out> is worth splitting and
+        gives the same result when split."""
+        if self.workers < 2 or out.ndim == 0 or out.size < self.threshold or out.shape[0] < 2:
+            return False
+        # Partially overlapping operands are buffered by numpy as a whole
+        return not any(isinstance(value, np.ndarray) and value is not out and np.may_share_memory(value, out)
+                       for value in values)
+
+    def __call__(self, ufunc, *values, out, **kwargs):
+        """Computes ufunc(*<values>, out=<out>, **<kwargs>)."""
+        if not self.is_parallel(values, out):
+            return ufunc(*values, out=out, **kwargs)
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(self.workers)
+
+        values = [np.broadcast_to(value, out.shape) if isinstance(value, np.ndarray) else value for value in values]
+        step = -(-out.shape[0] // self.workers)
+        blocks = [slice(start, start + step) for start in range(0, out.shape[0], step)]
+        futures = [self.pool.submit(ufunc, *(value[block] if isinstance(value, np.ndarray) else value
+                                             for value in values), out=out[block], **kwargs)
+                   for block in blocks]
+        for future in futures:
+            future.result()
+        return out
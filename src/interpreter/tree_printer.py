@@ -10,8 +10,8 @@ def addToClass(cls):
     return decorator
 
 
-def print_intended(to_print, intend):
-    print(intend * "|  " + to_print)
+def intended(to_print, intend):
+    return intend * "|  " + to_print
 
 
 # noinspection PyPep8Naming,PyUnresolvedReferences
@@ -20,120 +20,167 @@ class TreePrinter:
     # General
     @addToClass(Node)
     def printTree(self, indent=0):
+        # Generators of lines of the nodes being printed, innermost last, so
+        # trees of any depth are printed without recursion
+        stack = [self.treeLines(indent)]
+        while stack:
+            line = next(stack[-1], None)
+            if line is None:
+                stack.pop()
+            elif isinstance(line, str):
+                print(line)
+            else:
+                node, indent = line
+                stack.append(node.treeLines(indent))
+
+    @addToClass(Node)
+    def treeLines(self, indent):
+        """Yields lines of the tree of the node, or pairs of child and its
+        indentation for lines of the child."""
         raise Exception("printTree not defined in class " + self.__class__.__name__)
 
     @addToClass(Instruction)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
 
     @addToClass(Expression)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
 
     # Instructions
     @addToClass(Block)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
         if self.instructions is not None:
-            self.instructions.printTree(indent + 1)
+            yield self.instructions, indent + 1
 
     @addToClass(Assignment)
-    def printTree(self, indent=0):
-        print_intended(self.operator, indent)
-        self.left.printTree(indent + 1)
-        self.right.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.operator, indent)
+        yield self.left, indent + 1
+        yield self.right, indent + 1
 
     @addToClass(For)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
-        self.variable.printTree(indent + 1)
-        self.range.printTree(indent + 1)
-        self.instruction.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.variable, indent + 1
+        yield self.range, indent + 1
+        yield self.instruction, indent + 1
+
+    @addToClass(ParFor)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.variable, indent + 1
+        yield self.range, indent + 1
+        if self.reductions:
+            yield intended('reduce', indent + 1)
+            for reduction in self.reductions:
+                yield reduction, indent + 2
+        yield self.instruction, indent + 1
 
     @addToClass(While)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
-        self.condition.printTree(indent + 1)
-        self.instruction.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.condition, indent + 1
+        yield self.instruction, indent + 1
 
     @addToClass(If)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
-        self.condition.printTree(indent + 1)
-        print_intended('then', indent)
-        self.if_block.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.condition, indent + 1
+        yield intended('then', indent)
+        yield self.if_block, indent + 1
         if self.else_block is not None:
-            print_intended('else', indent)
-            self.else_block.printTree(indent + 1)
+            yield intended('else', indent)
+            yield self.else_block, indent + 1
 
     @addToClass(Print)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
-        self.args.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.args, indent + 1
 
     @addToClass(Return)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
         if self.args is not None:
-            self.args.printTree(indent + 1)
+            yield self.args, indent + 1
+
+    @addToClass(Save)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.filename, indent + 1
+        yield self.value, indent + 1
 
     @addToClass(ArrayElement)
-    def printTree(self, indent=0):
-        print_intended("get_element", indent)
-        self.array.printTree(indent + 1)
-        self.ids.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended("get_element", indent)
+        yield self.array, indent + 1
+        yield self.ids, indent + 1
 
     # Expressions
     @addToClass(Value)
-    def printTree(self, indent=0):
-        print_intended(str(self.value), indent)
+    def treeLines(self, indent):
+        yield intended(str(self.value), indent)
 
     @addToClass(Array)
-    def printTree(self, indent=0):
+    def treeLines(self, indent):
         if self.list is not None:
-            print_intended('array', indent)
-            self.list.printTree(indent + 1)
+            yield intended('array', indent)
+            yield self.list, indent + 1
         else:
-            print_intended('empty_array', indent)
+            yield intended('empty_array', indent)
 
     @addToClass(BinaryExpression)
-    def printTree(self, indent=0):
-        print_intended(self.operator, indent)
-        self.left.printTree(indent + 1)
-        self.right.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.operator, indent)
+        yield self.left, indent + 1
+        yield self.right, indent + 1
 
     @addToClass(MatrixFunction)
-    def printTree(self, indent=0):
-        print_intended(self.function, indent)
-        self.parameter.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.function, indent)
+        yield self.parameter, indent + 1
+
+    @addToClass(Load)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.filename, indent + 1
 
     @addToClass(UnaryMinus)
-    def printTree(self, indent=0):
-        print_intended('-', indent)
-        self.value.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended('-', indent)
+        yield self.value, indent + 1
 
     @addToClass(Transpose)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
-        self.value.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.value, indent + 1
 
     # Other
     @addToClass(Program)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
-        self.instructions_opt.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.instructions_opt, indent + 1
 
     @addToClass(Identifier)
-    def printTree(self, indent=0):
-        print_intended(self.name, indent)
+    def treeLines(self, indent):
+        yield intended(self.name, indent)
 
     @addToClass(Range)
-    def printTree(self, indent=0):
-        print_intended(self.type, indent)
-        self.start_value.printTree(indent + 1)
-        self.end_value.printTree(indent + 1)
+    def treeLines(self, indent):
+        yield intended(self.type, indent)
+        yield self.start_value, indent + 1
+        yield self.end_value, indent + 1
 
     @addToClass(List)
-    def printTree(self, indent=0):
+    def treeLines(self, indent):
         for element in self.elements:
-            element.printTree(indent)
+            yield element, indent
+
+    @addToClass(DeepExpression)
+    def treeLines(self, indent):
+        yield self.expression, indent
+
+    @addToClass(Temporary)
+    def treeLines(self, indent):
+        yield self.expression, indent
@@ -1,4 +1,14 @@
+import numbers
+
 from . import ast
+from .exceptions import ProgramError
+from .bounds import eliminate_range_checks
+from .deep_expressions import run_nested
+from .induction import lower_counted_loops
+from .invariants import Aliases, hoist_invariants
+from .literals import prebuild_literals
+from .loop_dependencies import LoopDependencies
+from .scopes import mark_scopes
 from .symbol_table import SymbolTable
 from collections import defaultdict
 
@@ -23,13 +33,26 @@ class TypeChecker(NodeVisitor):
     TYPE_MAP = None
     GOT_ERROR = False
 
-    def __init__(self):
+    def __init__(self, variables=None, output=None):
         # Attributes
         self.symbol_table = None
         self.loop_scopes_cnt = 0
+        # Groups of variables of the program which may share data
+        self.aliases = None
+        # Variables bound before the program starts, mapped to their values
+        self.variables = {} if variables is None else variables
+        # ProgramErrors found so far, reported also to <output> (None stands for sys.stdout)
+        self.errors = []
+        self.output = output
 
         TypeChecker.initialize_type_dict()
 
+    def error(self, lineno, message):
+        """Reports type error <message> found in line <lineno>."""
+        print(f'ERROR in line {lineno}\n{message}\n', file=self.output)
+        self.errors.append(ProgramError('type', message, lineno))
+        self.GOT_ERROR = True
+
     def get_type(self, *args):
         """ Obtain inferred type from the dictionary.
 
@@ -208,11 +231,24 @@ class TypeChecker(NodeVisitor):
         # Assignment
         cls.TYPE_MAP['='] = assign_map
 
+        # Numbers can be op-assigned to numbers and (element-wise) to arrays
         num_op_assign_map = defaultdict(lambda : 'error_op_not_sup',
           {
             'FLOATNUM' : 'ASSIGN',
             'INTNUM' : 'ASSIGN',
             'number_binary_operation' : 'ASSIGN',
+            'array' : 'ASSIGN',
+          })
+
+        # Arrays can be added to and subtracted from arrays only
+        mat_op_assign_map = defaultdict(lambda : 'error_op_not_sup',
+          {
+            'array' : 'ASSIGN',
+          })
+
+        subarray_op_assign_map = defaultdict(lambda : 'error_op_not_sup',
+          {
+            'array' : 'array',
           })
 
         op_assign_id_map = defaultdict(lambda : 'error_right_invalid',
@@ -244,6 +280,7 @@ class TypeChecker(NodeVisitor):
                     'FLOATNUM' : 'FLOATNUM',
                     'number_binary_operation' : 'unknown',
                     'unknown' : 'unknown',
+                    'array' : 'array',
                   }),
                 'FLOATNUM' : defaultdict(lambda : 'error_op_not_sup',
                   {
@@ -251,6 +288,7 @@ class TypeChecker(NodeVisitor):
                     'FLOATNUM' : 'FLOATNUM',
                     'number_binary_operation' : 'unknown',
                     'unknown' : 'unknown',
+                    'array' : 'array',
                   }),
                 'number_binary_operation' : defaultdict(lambda : 'error_op_not_sup',
                   {
@@ -258,6 +296,7 @@ class TypeChecker(NodeVisitor):
                     'FLOATNUM' : 'FLOATNUM',
                     'number_binary_operation' : 'unknown',
                     'unknown' : 'unknown',
+                    'array' : 'array',
                   }),
                 # Arrays
                 'array' :                   'error_op_not_sup',
@@ -269,13 +308,20 @@ class TypeChecker(NodeVisitor):
               })
           })
 
+        add_op_assign_map = op_assign_map.copy()
+        add_op_assign_map['ID'] = op_assign_id_map.copy()
+        add_op_assign_map['array_element'] = op_assign_map['array_element'].copy()
+        for type_right in ['array', 'TRANSPOSE', 'unary_minus', 'matrix_binary_operation']:
+            add_op_assign_map['ID'][type_right] = mat_op_assign_map
+            add_op_assign_map['array_element'][type_right] = subarray_op_assign_map
+
         # Operation assignment
-        cls.TYPE_MAP['-='] = op_assign_map
         cls.TYPE_MAP['*='] = op_assign_map
         cls.TYPE_MAP['/='] = op_assign_map
-        cls.TYPE_MAP['+='] = op_assign_map.copy()
+        cls.TYPE_MAP['-='] = add_op_assign_map
+        cls.TYPE_MAP['+='] = add_op_assign_map.copy()
 
-        cls.TYPE_MAP['+=']['ID'] = op_assign_id_map.copy()
+        cls.TYPE_MAP['+=']['ID'] = add_op_assign_map['ID'].copy()
         cls.TYPE_MAP['+=']['ID']['STRING'] = defaultdict(lambda : 'error_op_not_sup',
           {
             'STRING' : 'ASSIGN',
@@ -305,20 +351,54 @@ class TypeChecker(NodeVisitor):
     def visit_Program(self, node):
         self.symbol_table = SymbolTable('program', 'program_table')
         self.loop_scopes_cnt = 0
+        for name, value in self.variables.items():
+            self.symbol_table.put(name, self.bound_symbol(value))
         if node.instructions_opt:
+            self.aliases = Aliases(node)
             self.visit(node.instructions_opt)
+        mark_scopes(node)
+        lower_counted_loops(node)
+        eliminate_range_checks(node)
+        prebuild_literals(node)
+        hoist_invariants(node)
         return node.type
 
+    @staticmethod
+    def bound_symbol(value):
+        """Returns symbol describing value <value> of variable bound before the program starts."""
+        if isinstance(value, numbers.Integral):
+            return ast.IntNum(value)
+        if isinstance(value, numbers.Real):
+            return ast.FloatNum(value)
+        if isinstance(value, str) or not hasattr(value, 'shape'):
+            return ast.String(str(value))
+        # Arrays, sparse and shared matrices
+        element_types = {'i': 'INTNUM', 'u': 'INTNUM', 'f': 'FLOATNUM'}
+        symbol = ast.BoundValue(element_type=element_types.get(value.dtype.kind, 'unknown'))
+        if len(value.shape) == 2:
+            symbol.num_rows, symbol.num_cols = value.shape
+        return symbol
+
     def variable_declared(self, node):
         if self.symbol_table.get(node.name) is None:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'{node.name} is not declared\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'{node.name} is not declared')
             return False
         return True
 
+    # Instructions with nested instructions are checked by generators run by
+    # run_nested, which yield generators checking the nested ones (see nested)
+    def nested(self, node):
+        """Generator checking instruction <node> nested in the checked one."""
+        if not hasattr(node, 'in_type'):
+            checker = getattr(self, 'check_' + node.__class__.__name__, None)
+            node.in_type = self.visit(node) if checker is None else (yield checker(node))
+        return node.in_type
+
     def visit_Block(self, node):
-        self.visit(node.instructions)
+        return run_nested(self.check_Block(node))
+
+    def check_Block(self, node):
+        yield self.nested(node.instructions)
         node.in_type = node.type
         return node.in_type
 
@@ -344,20 +424,19 @@ class TypeChecker(NodeVisitor):
                 left = self.symbol_table.get(left.name)
                 type_left = self.visit(left)
                 elem_type_left = type_left
+                if type_left == 'array':
+                    num_rows = left.num_rows
+                    num_cols = left.num_cols
         elif type_left == 'array_element':
             if isinstance(left.array, ast.String):
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Assignment to entity not being variable\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, 'Assignment to entity not being variable')
                 return node.type
             self.visit(left)
             if left.array.type == 'STRING':
                 left = left.array
                 type_left = 'STRING'
                 if node.operator != '=':
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Operational assignment to a substring\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Operational assignment to a substring')
                     return node.type
             else:
                 left = self.symbol_table.get(left.array.name)
@@ -377,23 +456,17 @@ class TypeChecker(NodeVisitor):
                                     type_right, type_left)
 
         if result_type == 'error_left_invalid':
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Cannot assign to {left.type}\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'Cannot assign to {left.type}')
             return node.type
 
         if result_type == 'error_right_invalid':
-            print((f'ERROR in line {node.lineno}\n'
-                   f'{type_right} is not a valid type '
-                   f'for the right side of assignment\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'{type_right} is not a valid type '
+                                    'for the right side of assignment')
             return node.type
 
         if result_type == 'error_op_not_sup':
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Cannot {node.operator} assign type {type_right} '
-                   f'to array of type {elem_type_left}\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'Cannot {node.operator} assign type {type_right} '
+                                    f'to array of type {elem_type_left}')
             return node.type
 
         if node.operator == '=':
@@ -401,10 +474,8 @@ class TypeChecker(NodeVisitor):
                 if (right.num_rows != 'unknown' and right.num_cols != 'unknown' and
                         num_rows != 'unknown' and num_cols != 'unknown' and
                         (right.num_rows != num_rows or right.num_cols != num_cols)):
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Inconsistent dimensions of arrays\n'))
+                    self.error(node.lineno, 'Inconsistent dimensions of arrays')
                     node.left.array.element_type = 'unknown'
-                    self.GOT_ERROR = True
                     return node.type
 
             # result_type can be FLOATNUM or INTNUM only when we assign
@@ -413,66 +484,132 @@ class TypeChecker(NodeVisitor):
             if result_type in ['unknown', 'FLOATNUM', 'INTNUM']:
                 node.left.array.element_type = result_type
         else:
+            if type_left == 'array' and type_right == 'array':
+                if (right.num_rows != 'unknown' and right.num_cols != 'unknown' and
+                        num_rows != 'unknown' and num_cols != 'unknown' and
+                        (right.num_rows != num_rows or right.num_cols != num_cols)):
+                    self.error(node.lineno, 'Inconsistent dimensions of arrays')
+                    return node.type
+
             if result_type in ['unknown', 'FLOATNUM', 'INTNUM']:
                 node.left.array.element_type = result_type
 
-        # Add symbol to symbol table.
-        if node.left.type != 'array_element':
+        # Matrix created by matrix function which later gets float elements
+        # is allocated by the interpreter as a float matrix right away.
+        if left.type == 'matrix_function' and (result_type == 'FLOATNUM' or type_right == 'FLOATNUM' or
+                                               node.operator == '/='):
+            left.element_type = 'FLOATNUM'
+
+        # Add symbol to symbol table. Operation assignment to an array
+        # does not change its type.
+        if node.left.type != 'array_element' and not (node.operator != '=' and type_left == 'array'):
             self.symbol_table.put(node.left.name, node.right)
 
         return node.type
 
     def visit_For(self, node):
+        return run_nested(self.check_For(node))
+
+    def check_For(self, node):
         self.visit(node.variable)
         self.visit(node.range)
         self.symbol_table.push_scope('loop')
         self.loop_scopes_cnt += 1
         if self.symbol_table.get(node.variable.name) is not None:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'{node.variable.name} cannot be an iterating variable, '
-                   'it was already declared\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'{node.variable.name} cannot be an iterating variable, '
+                                    'it was already declared')
         else:
             self.symbol_table.put(node.variable.name, ast.IntNum(node.range.start_value.value))
-        self.visit(node.instruction)
+        yield self.nested(node.instruction)
         self.loop_scopes_cnt -= 1
         self.symbol_table.pop_scope()
         return node.type
 
+    def visit_ParFor(self, node):
+        return run_nested(self.check_ParFor(node))
+
+    def check_ParFor(self, node):
+        yield from self.check_For(node)
+        dependencies = LoopDependencies(node)
+        reductions = {reduction.name for reduction in node.reductions if self.variable_declared(reduction)}
+        errors = []
+        # Variables updated with these operators are combined with + and * respectively
+        node.reduction_operators = {}
+        # Arrays whose iterations write (and read) only elements indexed by the loop variable
+        node.sliced = []
+        for name, assignments in dependencies.writes.items():
+            if name in reductions:
+                operators = {assignment.operator for assignment in assignments}
+                if any(assignment.left.type != 'ID' for assignment in assignments) or \
+                        not (operators <= {'+=', '-='} or operators <= {'*=', '/='}):
+                    errors.append((assignments[0].lineno, f'Reduction variable {name} can be updated only with '
+                                                          f'either += and -= or *= and /='))
+                elif dependencies.reads[name]:
+                    errors.append((dependencies.reads[name][0].lineno,
+                                   f'Reduction variable {name} cannot be read in parfor loop'))
+                else:
+                    node.reduction_operators[name] = '+' if operators <= {'+=', '-='} else '*'
+            elif name != node.variable.name and self.symbol_table.get(name) is not None:
+                accesses = [assignment.left for assignment in assignments] + dependencies.reads[name]
+                if all(access.type == 'array_element' and dependencies.is_sliced(access) for access in accesses):
+                    node.sliced.append(name)
+                else:
+                    errors.append((assignments[0].lineno, f'{name} is written in parfor loop, but it is neither '
+                                                          f'a reduction nor indexed by {node.variable.name}'))
+        # Iterations get their own slices of the sliced arrays, so other variables
+        # sharing data with them would not see (or would overwrite) the changes
+        for name in node.sliced:
+            for alias in sorted(self.aliases.expand([name]) - {name}):
+                accesses = dependencies.writes.get(alias, []) + dependencies.reads.get(alias, [])
+                if accesses:
+                    errors.append((accesses[0].lineno, f'{alias} may share data with {name}, which is written '
+                                                       f'in parfor loop'))
+        for exit_node in dependencies.exits:
+            errors.append((exit_node.lineno, f'Cannot {exit_node.type.lower()} from parfor loop'))
+
+        for lineno, message in errors:
+            self.error(lineno, message)
+        # Variables from outside of the loop, which iterations need
+        node.free_variables = sorted(name for name in set(dependencies.reads) | set(dependencies.writes)
+                                     if name != node.variable.name and self.symbol_table.get(name) is not None)
+        return node.type
+
     def visit_While(self, node):
+        return run_nested(self.check_While(node))
+
+    def check_While(self, node):
         self.visit(node.condition)
         self.symbol_table.push_scope('loop')
         self.loop_scopes_cnt += 1
-        self.visit(node.instruction)
+        yield self.nested(node.instruction)
         self.loop_scopes_cnt -= 1
         self.symbol_table.pop_scope()
         return node.type
 
     def visit_If(self, node):
+        return run_nested(self.check_If(node))
+
+    def check_If(self, node):
         self.visit(node.condition)
         self.symbol_table.push_scope('if')
-        self.visit(node.if_block)
+        yield self.nested(node.if_block)
         self.symbol_table.pop_scope()
         if node.else_block is not None:
             self.symbol_table.push_scope('else')
-            self.visit(node.if_block)
+            yield self.nested(node.if_block)
             self.symbol_table.pop_scope()
 
         return node.type
 
     def visit_Break(self, node):
         if self.loop_scopes_cnt == 0:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Cannot break from current scope\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, 'Cannot break from current scope')
 
         return node.type
 
     def visit_Continue(self, node):
         if self.loop_scopes_cnt == 0:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Cannot continue in current scope\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, 'Cannot continue in current scope')
 
         return node.type
 
@@ -485,6 +622,34 @@ class TypeChecker(NodeVisitor):
         self.visit(node.args)
         return node.type
 
+    def visit_Save(self, node):
+        filename_type = self.check_file_name(node.filename)
+        value = node.value
+        value_type = self.visit(value)
+        if value_type == 'ID':
+            if not self.variable_declared(value):
+                value_type = 'unknown'
+            else:
+                value = self.symbol_table.get(value.name)
+                value_type = self.visit(value)
+
+        if filename_type == 'STRING' and value_type not in ['array', 'unknown']:
+            self.error(node.lineno, f'Cannot save {value_type}')
+
+        return node.type
+
+    def check_file_name(self, node):
+        """Checks that <node> is a valid file name, i.e. a string."""
+        filename_type = self.visit(node)
+        if filename_type == 'ID':
+            if not self.variable_declared(node):
+                return 'unknown'
+            filename_type = self.visit(self.symbol_table.get(node.name))
+
+        if filename_type not in ['STRING', 'unknown']:
+            self.error(node.lineno, f'{filename_type} is not a valid file name')
+        return filename_type
+
     def visit_ArrayElement(self, node):
         self.visit(node.array)
         self.visit(node.ids)
@@ -493,9 +658,7 @@ class TypeChecker(NodeVisitor):
             # Check correcntess of indexes
             indices = node.ids.elements
             if len(indices) > 2 or (len(indices) == 2 and indices[0].value != 0):
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Indices inconsistent with dimensions \n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, 'Indices inconsistent with dimensions ')
                 return node.type
             return 'STRING'
         else:
@@ -505,9 +668,7 @@ class TypeChecker(NodeVisitor):
             if type_array == 'STRING':
                 indices = node.ids.elements
                 if len(indices) > 2 or (len(indices) == 2 and indices[0].value != 0):
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Indices inconsistent with dimensions \n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Indices inconsistent with dimensions ')
                 return 'STRING'
             elif type_array in ['array', 'matrix_binary_operation']:
                 num_rows = array.num_rows
@@ -515,69 +676,49 @@ class TypeChecker(NodeVisitor):
             elif type_array == 'unknown':
                 return node.type
             else:
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Subscripted value is neither array nor string\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, 'Subscripted value is neither array nor string')
                 return node.type
 
         indices_num = len(node.ids.elements)
         new_row_num = 1
         new_col_num = 1
         if indices_num > 2:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Indices inconsistent with dimensions \n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, 'Indices inconsistent with dimensions ')
             return node.type
         elif len(node.ids.elements) == 2:
             row_idx = node.ids.elements[0]
             col_idx = node.ids.elements[1]
             if row_idx.type == 'range':
                 if num_rows != 'unknown' and row_idx.end_value.value > num_rows:
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Row index out of range\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Row index out of range')
                 new_row_num = row_idx.end_value.value - row_idx.start_value.value
             elif row_idx.type == 'INTNUM':
                 if num_rows != 'unknown' and row_idx.value >= num_rows:
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Row index out of range\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Row index out of range')
             if col_idx.type == 'range':
                 if num_cols != 'unknown' and col_idx.end_value.value > num_cols:
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Column index out of range\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Column index out of range')
                 new_col_num = col_idx.end_value.value - col_idx.start_value.value
             elif col_idx.type == 'INTNUM':
                 if num_cols != 'unknown' and col_idx.value >= num_cols:
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Column index out of range\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Column index out of range')
             if new_row_num <= 0 or new_col_num <= 0:
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Wrong indexing\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, 'Wrong indexing')
         else:
             row_idx = node.ids.elements[0]
-            if num_rows > 1:
+            if num_rows == 'unknown' or num_rows > 1:
                 new_col_num = num_cols
             else:
                 new_col_num = 1
             if row_idx.type == 'range':
                 if num_rows != 'unknown' and row_idx.end_value.value > num_rows:
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Index out of range\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Index out of range')
                 new_row_num = row_idx.end_value.value - row_idx.start_value.value
             elif row_idx.type == 'INTNUM':
                 if num_rows != 'unknown' and row_idx.value >= num_rows:
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Column index out of range\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, 'Column index out of range')
             if new_row_num <= 0:
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Wrong indexing\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, 'Wrong indexing')
 
         node.num_rows = new_row_num
         node.num_cols = new_col_num
@@ -651,10 +792,8 @@ class TypeChecker(NodeVisitor):
                 type_left = 'array'
             if type_right == 'matrix_binary_operation':
                 type_right = 'array'
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Operation {node.operator} not supported between {type_left} '
-                   f'and {type_right}\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'Operation {node.operator} not supported between {type_left} '
+                                    f'and {type_right}')
             return 'number_binary_operation'
 
         # Check correctness of dimensions for array
@@ -673,11 +812,9 @@ class TypeChecker(NodeVisitor):
             if (expr_left.num_cols != 'unknown' and
                     expr_right.num_rows != 'unknown' and
                     expr_left.num_cols != expr_right.num_rows):
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Inconsistent shape. Cannot {node.operator} '
-                       f'matrices of shape {expr_left.num_rows}x{expr_left.num_cols} '
-                       f'and {expr_right.num_rows}x{expr_right.num_cols}\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, f'Inconsistent shape. Cannot {node.operator} '
+                                        f'matrices of shape {expr_left.num_rows}x{expr_left.num_cols} '
+                                        f'and {expr_right.num_rows}x{expr_right.num_cols}')
                 node.num_rows = expr_left.num_rows
                 node.num_cols = expr_right.num_cols
                 return 'matrix_binary_operation'
@@ -733,10 +870,8 @@ class TypeChecker(NodeVisitor):
                     element_right_type = expr_right.list.elements[0].element_type
                 element_type = self.get_type(node.operator[1], element_left_type, element_right_type)
                 if element_type == 'error_op_not_sup':
-                    print((f'ERROR in line {node.lineno}\n'
-                           f'Operation {node.operator} not supported between array of {type_left} '
-                           f'and array of {type_right}\n'))
-                    self.GOT_ERROR = True
+                    self.error(node.lineno, f'Operation {node.operator} not supported between array of {type_left} '
+                                            f'and array of {type_right}')
                     return 'matrix_binary_operation'
 
             if expr_left.num_rows == 'unknown' or expr_right.num_rows == 'unknown':
@@ -752,11 +887,9 @@ class TypeChecker(NodeVisitor):
             # Matrix dimensions correctness check
             if ((num_cols != 'unknown' and expr_right.num_cols != expr_left.num_cols) or
                     (num_rows != 'unknown' and expr_right.num_rows != expr_left.num_rows)):
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Inconsistent shape. Cannot {node.operator} '
-                       f'matrices of shape {expr_left.num_rows}x{expr_left.num_cols} '
-                       f'and {expr_right.num_rows}x{expr_right.num_cols}\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, f'Inconsistent shape. Cannot {node.operator} '
+                                        f'matrices of shape {expr_left.num_rows}x{expr_left.num_cols} '
+                                        f'and {expr_right.num_rows}x{expr_right.num_cols}')
                 node.num_rows = 'unknown'
                 node.num_cols = 'unknown'
                 node.element_type = 'unknown'
@@ -770,10 +903,8 @@ class TypeChecker(NodeVisitor):
                 node.element_type = element_left_type
                 return result_type
 
-        print((f'ERROR in line {node.lineno}\n'
-               f'Operation {node.operator} not supported between {type_left} '
-               f'and {type_right}\n'))
-        self.GOT_ERROR = True
+        self.error(node.lineno, f'Operation {node.operator} not supported between {type_left} '
+                                f'and {type_right}')
 
         node.num_rows = 'unknown'
         node.num_cols = 'unknown'
@@ -802,10 +933,8 @@ class TypeChecker(NodeVisitor):
         result_type = self.get_type('bool', type_left, type_right)
 
         if result_type == 'error_op_not_sup':
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Operator {node.operator} not supported between {type_left} '
-                   f'and {type_right}\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'Operator {node.operator} not supported between {type_left} '
+                                    f'and {type_right}')
 
         return node.type
 
@@ -813,9 +942,7 @@ class TypeChecker(NodeVisitor):
         parameters = node.parameter
         self.visit(parameters)
         if parameters.num_rows != 1 and parameters.num_cols > 2:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'{parameters} are not valid matrix function arguments\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'{parameters} are not valid matrix function arguments')
         parameter = parameters.elements[0]
         parameter_type = self.visit(parameter)
         if parameter_type == 'ID':
@@ -830,10 +957,8 @@ class TypeChecker(NodeVisitor):
             else:
                 node.num_rows = 'unknown'
         else:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Matrix function {node.function} cannot take '
-                   f'{parameter} as parameter\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'Matrix function {node.function} cannot take '
+                                    f'{parameter} as parameter')
             node.num_rows = 'unknown'
         if parameters.num_cols == 2:
             parameter = parameters.elements[1]
@@ -847,10 +972,8 @@ class TypeChecker(NodeVisitor):
             if parameter_type == 'INTNUM':
                 node.num_cols = parameter.value
             else:
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Matrix function {node.function} cannot take '
-                       f'{node.parameter} as parameter\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, f'Matrix function {node.function} cannot take '
+                                        f'{node.parameter} as parameter')
                 node.num_cols = 'unknown'
         else:
             node.num_cols = node.num_rows
@@ -859,6 +982,17 @@ class TypeChecker(NodeVisitor):
 
         return 'array'
 
+    def visit_BoundValue(self, node):
+        return 'array'
+
+    def visit_Load(self, node):
+        self.check_file_name(node.filename)
+        # Shape and type of elements are known only at runtime
+        node.num_rows = 'unknown'
+        node.num_cols = 'unknown'
+        node.element_type = 'unknown'
+        return 'array'
+
     def visit_UnaryMinus(self, node):
         value = node.value
         value_type = self.visit(value)
@@ -870,12 +1004,11 @@ class TypeChecker(NodeVisitor):
                 value_type = self.visit(value)
 
         if value_type == 'STRING':
-            print((f'ERROR in line {node.lineno}\n'
-                   'Cannot place unary minus before STRING\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, 'Cannot place unary minus before STRING')
         elif value_type == 'array':
             node.num_cols = value.num_cols
             node.num_rows = value.num_rows
+            node.element_type = value.element_type
 
         return value_type
 
@@ -894,15 +1027,21 @@ class TypeChecker(NodeVisitor):
             node.num_cols = value.num_rows
             node.num_rows = value.num_cols
         else:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'Cannot transpose {value_type}\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'Cannot transpose {value_type}')
             value_type = 'TRANSPOSE'
             node.num_cols = 'unknown'
             node.num_rows = 'unknown'
 
         return value_type
 
+    def visit_DeepExpression(self, node):
+        for temporary in node.temporaries:
+            self.visit(temporary)
+        return self.visit(node.expression)
+
+    def visit_Temporary(self, node):
+        return self.visit(node.expression)
+
     # Other
     @staticmethod
     def visit_Identifier(node):
@@ -929,14 +1068,10 @@ class TypeChecker(NodeVisitor):
                 end_type = self.visit(end_value)
 
         if start_type not in ['INTNUM', 'array_element', 'unknown']:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'{start_type} is not a valid type for a range start\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'{start_type} is not a valid type for a range start')
 
         if end_type not in ['INTNUM', 'array_element', 'unknown']:
-            print((f'ERROR in line {node.lineno}\n'
-                   f'{end_type} is not a valid type for a range start\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, f'{end_type} is not a valid type for a range start')
 
         return node.type
 
@@ -950,21 +1085,15 @@ class TypeChecker(NodeVisitor):
                 first_elem.type not in ['matrix_function', 'TRANSPOSE'] and
                 first_elem.list is not None and
                 first_elem.list.elements[0].type == 'array'):
-            print((f'ERROR in line {node.lineno}\n'
-                   'Matrix can have maximum 2 dimensions\n'))
-            self.GOT_ERROR = True
+            self.error(node.lineno, 'Matrix can have maximum 2 dimensions')
             return node.type
         for elem in node.elements[1:]:
             elem_type = self.visit(elem)
             if elem_type != first_elem_type:
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Inconsistent types {first_elem_type} and {elem_type} in the array\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, f'Inconsistent types {first_elem_type} and {elem_type} in the array')
                 return node.type
             elif first_elem_type == 'array' and first_elem.num_cols != elem.num_cols:
-                print((f'ERROR in line {node.lineno}\n'
-                       f'Inconsistent shapes {first_elem.num_cols} and {elem.num_cols} in the array\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, f'Inconsistent shapes {first_elem.num_cols} and {elem.num_cols} in the array')
                 return node.type
 
         node.element_type = first_elem_type
@@ -989,9 +1118,7 @@ class TypeChecker(NodeVisitor):
                     elem_type = self.visit(elem)
 
             if elem_type not in ['INTNUM', 'range', 'unknown']:
-                print((f'ERROR in line {node.lineno}\n'
-                       f'{elem_type} is not a valid array index type\n'))
-                self.GOT_ERROR = True
+                self.error(node.lineno, f'{elem_type} is not a valid array index type')
                 break
 
         return node.type
@@ -1004,6 +1131,9 @@ class TypeChecker(NodeVisitor):
         return node.type
 
     def visit_Instructions(self, node):
+        return run_nested(self.check_Instructions(node))
+
+    def check_Instructions(self, node):
         for elem in node.elements:
-            self.visit(elem)
+            yield self.nested(elem)
         return node.type
@@ -1,3 +1,4 @@
+import argparse
 import sys
 
 import interpreter as inter
@@ -6,7 +7,50 @@ DEBUG = False
 
 if __name__ == '__main__':
 
-    filename = sys.argv[1] if len(sys.argv) > 1 else "../tests5/example0.m"
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('filename', nargs='?', default="../tests5/example0.m")
+    arg_parser.add_argument('--dtype', choices=['int64', 'float64', 'float32'], default='int64',
+                            help='type of elements of created matrices')
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help='number of threads computing element-wise operations on large matrices')
+    arg_parser.add_argument('--sparse-size', type=int, default=None,
+                            help='number of elements from which matrices created by eye and zeros are sparse')
+    arg_parser.add_argument('--out-of-core-size', type=int, default=None,
+                            help='number of elements above which matrices are kept in scratch files')
+    arg_parser.add_argument('--processes', type=int, default=None,
+                            help='number of processes running iterations of parfor loops')
+    arg_parser.add_argument('--matrix-format', choices=['text', 'csv', 'binary'], default='text',
+                            help='format in which printed matrices are written')
+    arg_parser.add_argument('--no-hoist-invariants', dest='hoist_invariants', action='store_false',
+                            help='evaluate loop invariant operations in every iteration')
+    arg_parser.add_argument('--no-counted-loops', dest='counted_loops', action='store_false',
+                            help='run while loops stepping a variable to a bound iteration by iteration')
+    arg_parser.add_argument('--no-eliminate-range-checks', dest='eliminate_range_checks', action='store_false',
+                            help='check indices of elements in for loops on every access')
+    arg_parser.add_argument('--tier-threshold', type=int, default=1000,
+                            help='number of back edges after which loops are compiled for the types of their variables')
+    arg_parser.add_argument('--no-tiering', dest='tiering', action='store_false',
+                            help='run all loops in the tree walker')
+    arg_parser.add_argument('--tier-report', action='store_true',
+                            help='print loops which were compiled to stderr')
+    arg_parser.add_argument('--ir', action='store_true',
+                            help='run the program lowered to the SSA form instead of walking its tree')
+    arg_parser.add_argument('--ir-passes', default=None,
+                            help='comma separated optimization passes run over the SSA form, in order, '
+                                 'from: ' + ', '.join(inter.PASSES))
+    arg_parser.add_argument('--dump-ir', action='store_true',
+                            help='print the SSA form after the passes and their times to stderr')
+    arg_parser.add_argument('--profile', action='store_true',
+                            help='print time spent in every line of the program to stderr')
+    arg_parser.add_argument('--profile-output', default=None,
+                            help='file to which the profile is written, as JSON if its name ends with .json, '
+                                 'otherwise as collapsed stacks')
+    args = arg_parser.parse_args()
+    passes = None if args.ir_passes is None else [name for name in args.ir_passes.split(',') if name]
+    if passes is not None and not set(passes) <= set(inter.PASSES):
+        arg_parser.error(f'unknown passes: {", ".join(name for name in passes if name not in inter.PASSES)}')
+
+    filename = args.filename
     try:
         file = open(filename, "r")
     except IOError:
@@ -29,5 +73,35 @@ if __name__ == '__main__':
     if typeChecker.GOT_ERROR:
         sys.exit(0)
 
-    interpreter = inter.Interpreter()
-    interpreter.visit(ast)
+    profiler = inter.Profiler() if args.profile or args.profile_output else None
+    interpreter = inter.Interpreter(dtype=args.dtype, sparse_size=args.sparse_size, workers=args.workers,
+                                   out_of_core_size=args.out_of_core_size, processes=args.processes,
+                                   matrix_format=args.matrix_format, profiler=profiler,
+                                   hoist_invariants=args.hoist_invariants, counted_loops=args.counted_loops,
+                                   tier_threshold=args.tier_threshold if args.tiering else None,
+                                   eliminate_range_checks=args.eliminate_range_checks)
+    try:
+        if args.ir or args.dump_ir:
+            manager = inter.PassManager(passes)
+            function = manager.run(inter.lower_program(ast))
+            if args.dump_ir:
+                print(function.dump(), file=sys.stderr)
+                print(manager.report(), end='', file=sys.stderr)
+        if args.ir:
+            inter.compile_function(function, interpreter).run()
+        else:
+            interpreter.visit(ast)
+    except inter.ProgramError as error:
+        print(f'Runtime error: {error}')
+        sys.exit(0)
+    finally:
+        if args.tier_report and interpreter.tiers is not None:
+            print(interpreter.tiers.report(), end='', file=sys.stderr)
+        if args.profile:
+            profiler.report(text)
+        if args.profile_output:
+            with open(args.profile_output, 'w') as profile_file:
+                if args.profile_output.endswith('.json'):
+                    profiler.write_json(profile_file)
+                else:
+                    profiler.write_collapsed(profile_file)
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+# Runs program argv[2] with interpreter options argv[3] after limiting the data
+# segment of the process to argv[1] bytes, prints its output
+CAPPED_CHILD = """
+import json
+import resource
+import sys
+
+import interpreter as inter
+
+cap = int(sys.argv[1])
+resource.setrlimit(resource.RLIMIT_DATA, (cap, cap))
+print(inter.run_program(sys.argv[2], **json.loads(sys.argv[3])).output, end='')
+"""
+
+
+@pytest.fixture
+def run_capped():
+    """Returns function running program <text> with interpreter <options> in a
+    child process which may allocate at most <cap> bytes, returning the
+    finished process with its output."""
+
+    def run(text, cap, **options):
+        environment = dict(os.environ, PYTHONPATH=SRC, OPENBLAS_NUM_THREADS='1')
+        return subprocess.run([sys.executable, '-c', CAPPED_CHILD, str(cap), text, json.dumps(options)],
+                              env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+    return run
@@ -0,0 +1,65 @@
+import asyncio
+import io
+import time
+
+import pytest
+
+import interpreter as inter
+
+PROGRAMS = 6
+
+PROGRAM = """
+x = 0;
+for j = 0:5 {{
+    for i = 0:5000 x = i + {number};
+    print {number}, j;
+}}
+"""
+ENDLESS_PROGRAM = 'x = 0;\nwhile (1 == 1) x += 1;\n'
+
+
+def compile_program(text):
+    program, errors = inter.compile_program(text)
+    assert not errors
+    return program
+
+
+def test_interleaved_programs_give_results_of_sync_runs():
+    output = io.StringIO()
+
+    async def run_all():
+        return await asyncio.gather(*(
+            inter.run_async(compile_program(PROGRAM.format(number=number)),
+                            inter.Interpreter(output=output), checkpoint_interval=100)
+            for number in range(PROGRAMS)))
+
+    results = asyncio.run(run_all())
+    lines = output.getvalue().splitlines()
+    # Every program prints its first line before any program prints its last one
+    assert max(lines.index(f'{number}, 0') for number in range(PROGRAMS)) < \
+           min(lines.index(f'{number}, 4') for number in range(PROGRAMS))
+    for number, variables in enumerate(results):
+        result = inter.run_program(PROGRAM.format(number=number))
+        assert variables == result.variables == {'x': 4999 + number}
+        assert [line for line in lines if line.startswith(f'{number},')] == result.output.splitlines()
+
+
+def test_timeout_stops_program():
+    with pytest.raises(TimeoutError):
+        asyncio.run(inter.run_async(compile_program(ENDLESS_PROGRAM), timeout=0.2))
+
+
+def test_cancellation_stops_program():
+    interpreter = inter.Interpreter(output=io.StringIO())
+
+    async def cancel():
+        task = asyncio.create_task(inter.run_async(compile_program(ENDLESS_PROGRAM), interpreter))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel())
+    x = interpreter.memory_stack.get('x')
+    time.sleep(0.1)
+    assert x > 0 and interpreter.memory_stack.get('x') == x
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+import interpreter as inter
+
+PROGRAMS = {
+    # Indices leaving the array in the last iterations, with and without offsets
+    'read past end': 'A = ones(3, 3);\ns = 0;\nfor i = 0:4 {\n    s += A[i, 0];\n    print s;\n}\n',
+    'write past end': 'A = ones(3, 3);\nfor i = 0:3 {\n    A[i + 1, i] = 5;\n    print A;\n}\n',
+    'read before start': 'A = ones(3, 3);\nfor i = 0:3 print A[0, i - 4];\n',
+    # Negative indices count from the end
+    'negative indices': 'A = [[1, 2, 3], [4, 5, 6]];\nfor i = 0:6 print A[1, i - 3];\n',
+    # Indices and arrays bound to new values in the loop are checked on every access
+    'rebound index': 'A = ones(3, 3);\nk = 0;\nfor i = 0:5 {\n    print A[k, 0];\n    k += 1;\n}\n',
+    'rebound array': 'A = ones(2, 2);\nfor i = 0:3 {\n    print A[1, 1];\n    A = ones(1, 1);\n}\n',
+    # Indices stepped by inner loops
+    'inner while loop': 'A = zeros(3, 3);\nfor i = 0:3 {\n    j = 0;\n    while (j <= i + 1) {\n'
+                        '        A[i, j] = j + 1;\n        j += 1;\n    }\n}\nprint A;\n',
+    # Strings and elements read in conditions and ranges
+    'strings': 's = "abcd";\nfor i = 0:3 {\n    s[i] = "X";\n    print s[0, i];\n}\n',
+    'conditions and ranges': 'A = ones(3, 3);\nB = A\';\nfor i = 0:3 {\n    if (A[i, i] > 0) print A[i, i];\n'
+                             '    for j = 0:A[i, i] B[j, i] += 1;\n}\nprint A, B;\n',
+    # Elements in parfor loops and indices which are elements of integer matrices
+    'parfor': 'M = zeros(4, 2);\nparfor i = 0:4 {\n    for j = 0:2 M[i, j] = i + j;\n}\nprint M;\n',
+    'element indices': 'A = ones(2, 2);\nk = A[0, 1];\nfor i = 0:2 print A[i, k], A[k + 1, i];\n',
+}
+
+
+def run(program, eliminate_range_checks):
+    """Returns output of <program>, its global variables and error."""
+    result = inter.run_program(program, processes=1, tier_threshold=None,
+                               eliminate_range_checks=eliminate_range_checks)
+    return result.output, {name: repr(value) for name, value in result.variables.items()}, repr(result.errors)
+
+
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_same_results_with_checks_eliminated(name):
+    program, errors = inter.compile_program(PROGRAMS[name])
+    assert not errors
+    assert run(program, True) == run(program, False)
+
+
+def test_index_out_of_range_still_fails():
+    result = inter.run_program(PROGRAMS['read past end'], processes=1, tier_threshold=None)
+    assert [(error.message, error.lineno) for error in result.errors] == [('Wrong indexing', 4)]
+    assert result.variables['s'] == 3
+
+
+def test_only_safe_elements_unchecked():
+    text = ('A = ones(3, 3);\nk = 1;\nm = 0;\nfor i = 0:3 {\n    s = A[i, 0];\n    t = A[i + 1, 0];\n'
+            '    u = A[k, i - 3];\n    A[2, i] = k;\n    v = A[i, k + 2];\n    w = A[m, 0];\n    m = i;\n}\n')
+    program, errors = inter.compile_program(text)
+    assert not errors
+    unchecked = []
+
+    class Interpreter(inter.Interpreter):
+        def check_bounds(self, node, iterations):
+            super().check_bounds(node, iterations)
+            unchecked.append(sorted(element.lineno for element in self.unchecked_elements))
+
+    interpreter = Interpreter(output=io.StringIO(), processes=1, tier_threshold=None)
+    with pytest.raises(inter.ProgramError):
+        interpreter.visit(program)
+    # A[i + 1, 0] and A[i, k + 2] leave the matrix, m is bound to new values in the loop
+    assert unchecked == [[5, 7, 8]]
@@ -0,0 +1,21 @@
+import numpy as np
+
+from interpreter.buffer_pool import BufferPool
+
+
+def test_least_recently_put_arrays_are_dropped_over_the_size_limit():
+    pool = BufferPool(max_bytes=3 * 800)
+    arrays = [np.empty((10, 10)) for _ in range(2)] + [np.empty((5, 20)), np.empty((20, 5))]
+    for array in arrays:
+        pool.put(array)
+    assert pool.bytes == 3 * 800
+    assert pool.get((10, 10), np.dtype(float)) is arrays[1]
+    assert pool.get((10, 10), np.dtype(float)) is not arrays[0]
+    assert pool.get((5, 20), np.dtype(float)) is arrays[2]
+    assert pool.bytes == 800
+
+
+def test_arrays_larger_than_the_pool_are_not_kept():
+    pool = BufferPool(max_bytes=100)
+    pool.put(np.empty((10, 10)))
+    assert pool.bytes == 0 and not pool.buffers
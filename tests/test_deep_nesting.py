@@ -0,0 +1,129 @@
+import io
+import sys
+import threading
+import time
+
+import pytest
+
+import interpreter as inter
+
+DEPTH = 500
+
+PROGRAMS = {
+    'blocks': 'x = 0;\n' + '{\n' * DEPTH + 'x += 1;\n' + '}\n' * DEPTH + 'print x;\n',
+    'ifs': 'x = 1;\n' + 'if (x == 1) {\n' * DEPTH + 'x += 1;\n' + '}\n' * DEPTH + 'print x;\n',
+    'else ifs': 'x = 7;\n' + ''.join(f'if (x == {i}) x = 0;\nelse ' for i in range(DEPTH)) + 'x = -1;\nprint x;\n',
+    'for loops': 'x = 0;\n' + ''.join(f'for i{k} = 0:1 {{\n' for k in range(DEPTH)) + 'x += 1;\n' + '}\n' * DEPTH
+                 + 'print x;\n',
+    'while loops': 'x = 0;\n' + ''.join(f'y{k} = 0;\nwhile (y{k} < 1) {{\ny{k} += 1;\n' for k in range(DEPTH))
+                   + 'x += 1;\n' + '}\n' * DEPTH + 'print x;\n',
+}
+
+
+def deep_sum(terms):
+    return 'a = 1;\nx = ' + ' + '.join(['a'] * terms) + ';\nprint x;\n'
+
+
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_deeply_nested_statements(name):
+    result = inter.run_program(PROGRAMS[name], processes=1)
+    assert result.ok, result.errors
+    assert result.output == {'blocks': '1\n', 'ifs': '2\n', 'else ifs': '0\n'}.get(name, '1\n')
+
+
+def test_recursion_limit_not_raised():
+    assert sys.getrecursionlimit() == 1000
+
+
+def test_deeply_nested_parfor_body():
+    text = 's = 0;\nparfor i = 0:8 reduce s {\n' + 'if (i >= 0) {\n' * DEPTH + 's += i;\n' + '}\n' * DEPTH + '}\nprint s;\n'
+    result = inter.run_program(text, processes=2)
+    assert result.ok, result.errors
+    assert result.output == '28\n'
+
+
+@pytest.fixture
+def started_threads(monkeypatch):
+    started = []
+    start = threading.Thread.start
+    monkeypatch.setattr(threading.Thread, 'start', lambda thread: started.append(thread) or start(thread))
+    return started
+
+
+def test_nested_statements_run_without_threads(started_threads):
+    program, errors = inter.compile_program(PROGRAMS['for loops'])
+    assert not errors
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1)
+    interpreter.visit(program)
+    assert interpreter.output.target.getvalue() == '1\n'
+    assert started_threads == []
+
+
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_nested_statements_compiled_without_threads(name, started_threads):
+    program, errors = inter.compile_program(PROGRAMS[name])
+    assert not errors
+    function = inter.PassManager(verify=True).run(inter.lower_program(program))
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1)
+    inter.compile_function(function, interpreter).run()
+    assert interpreter.output.target.getvalue() == {'blocks': '1\n', 'ifs': '2\n', 'else ifs': '0\n'}.get(name, '1\n')
+    assert started_threads == []
+
+
+def test_statements_nested_very_deep(started_threads):
+    depth = 20000
+    text = 'x = 1;\n' + 'if (x == 1) {\n' * depth + 'x += 1;\n' + '}\n' * depth + 'print x;\n'
+    program, errors = inter.compile_program(text)
+    assert not errors
+    inter.lower_program(program)
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1)
+    interpreter.visit(program)
+    assert interpreter.output.target.getvalue() == '2\n'
+    assert started_threads == []
+
+
+def test_nested_loops_as_fast_as_flat_loop():
+    # 3 ** 9 iterations of the body and 3 ** 9 / 2 of the outer loops, nested
+    # deeper than statements visited on one thread before
+    depth = 9
+    nested = 'x = 0;\n' + ''.join(f'for i{k} = 0:3 {{\n' for k in range(depth)) + 'x += 1;\n' + '}\n' * depth
+    flat = f'x = 0;\nfor i = 0:{3 ** depth * 3 // 2} {{\nx += 1;\n}}\n'
+
+    def run_time(text):
+        program, errors = inter.compile_program(text)
+        assert not errors
+        times = []
+        for _ in range(3):
+            interpreter = inter.Interpreter(output=io.StringIO(), processes=1, tier_threshold=None)
+            start = time.perf_counter()
+            interpreter.visit(program)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    assert run_time(nested) < 3 * run_time(flat)
+
+
+def test_break_and_continue_leave_nested_statements():
+    text = ('s = 0;\nfor i = 0:10 {\n    if (i == 2) {\n        continue;\n    }\n    j = 0;\n'
+            '    while (j < 10) {\n        j += 1;\n        if (j > i) {\n            {\n                break;\n'
+            '            }\n        }\n        s += j;\n    }\n    if (i == 5) {\n        break;\n    }\n}\n'
+            'print s;\n')
+    result = inter.run_program(text, processes=1)
+    assert result.ok, result.errors
+    assert result.output == f'{sum(j for i in (0, 1, 3, 4, 5) for j in range(1, i + 1))}\n'
+
+
+def test_deep_sum_compiled_in_linear_time():
+    def compile_time(terms):
+        start = time.perf_counter()
+        program, errors = inter.compile_program(deep_sum(terms))
+        assert not errors
+        return time.perf_counter() - start
+
+    compile_time(2000)
+    # Ten times the terms take about ten times as long, visiting every
+    # temporary from each place referring to it took a hundred times
+    assert compile_time(20000) < 30 * compile_time(2000)
+    result = inter.run_program(deep_sum(20000), processes=1)
+    assert result.ok, result.errors
+    assert result.output == '20000\n'
@@ -0,0 +1,81 @@
+import asyncio
+import io
+
+import pytest
+
+import interpreter as inter
+
+PROGRAMS = {
+    # All relations, both steps and block bodies
+    'relations': 'n = 17;\nwhile (n > 0) n -= 5;\nprint n;\nk = -3;\nwhile (k <= 20) {\n    k += 4;\n}\nprint k;\n'
+                 'm = 40;\nwhile (m >= 7) m += -6;\nprint m;\nj = 0;\nwhile (j < 9) j -= -3;\nprint j;\n',
+    # Loops which never run do not evaluate the step
+    'zero trip': 'z = 0;\nn = 0;\nwhile (n > 0) n -= 1 / z;\nprint n;\nm = 5;\nwhile (m < 5) m += 1;\nprint m;\n',
+    'one trip': 'n = 4;\nwhile (n <= 4) n += 10;\nprint n;\n',
+    # Bounds given by expressions, steps by variables
+    'expressions': 'd = 3;\nn = 10;\nwhile (n < d * d + 7) n += d;\nprint n;\ne = -2;\nwhile (n > 0 - d) n += e;\n'
+                   'print n;\n',
+    # Floats are stepped one by one, as their sums round differently
+    'float accumulator': 'x = 0.0;\nwhile (x < 1) x += 0.1;\nprint x;\n',
+    'float bound': 'n = 0;\nwhile (n < 2.5) n += 1;\nprint n;\n',
+    'float step': 'n = 0;\nwhile (n < 3) n += 0.75;\nprint n;\n',
+    # Loops doing something else are not counted loops
+    'printing': 'n = 5;\nwhile (n > 0) {\n    n -= 2;\n    print n;\n}\n',
+    'bound changed': 'n = 5;\nm = 1;\nwhile (n > m) n -= 1;\nprint n, m;\n',
+    'break': 'n = 0;\nwhile (n < 100) {\n    n += 3;\n    if (n > 10)\n        break;\n}\nprint n;\n',
+    'for break': 's = 0;\nfor i = 0:10 {\n    if (i == 4) break;\n    s += i;\n}\nk = 0;\n'
+                 'while (k < s) k += 2;\nprint s, k;\n',
+    'nested': 's = 0;\nfor i = 0:4 {\n    n = 0;\n    while (n < i * 3) n += 2;\n    s += n;\n}\nprint s;\n',
+}
+
+
+def run(program, counted_loops):
+    """Returns output of <program> and number of steps it executed."""
+    interpreter = inter.Interpreter(output=io.StringIO(), counted_loops=counted_loops)
+    steps = [0]
+    step = interpreter.step
+
+    def counted_step(count=1):
+        steps[0] += count
+        step(count)
+
+    # Compiled loops count steps only when there is a checkpoint
+    interpreter.step = counted_step
+    interpreter.checkpoint = lambda: None
+    interpreter.visit(program)
+    return interpreter.output.target.getvalue(), steps[0]
+
+
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_closed_form_same_as_iterated(name):
+    program, errors = inter.compile_program(PROGRAMS[name])
+    assert not errors
+    assert run(program, True) == run(program, False)
+
+
+def test_counted_loops_found():
+    program, errors = inter.compile_program(PROGRAMS['relations'] + PROGRAMS['break'])
+    assert not errors
+    loops = [node for node in program.instructions_opt.elements if isinstance(node, inter.While)]
+    assert [loop.update is not None for loop in loops] == [True, True, True, True, False]
+
+
+def test_closed_form_loop_makes_one_checkpoint():
+    program, errors = inter.compile_program('n = 0;\nwhile (n < 10000000) n += 1;\n')
+    assert not errors
+    interpreter = inter.Interpreter(output=io.StringIO())
+    checkpoints = []
+    interpreter.checkpoint = lambda: checkpoints.append(interpreter.steps_to_checkpoint)
+    interpreter.visit(program)
+    assert interpreter.memory_stack.get('n') == 10000000
+    # 10000002 steps were counted, the next checkpoint is due after 10001000
+    assert checkpoints == [998]
+    assert interpreter.steps_to_checkpoint == 998
+
+
+def test_closed_form_loop_in_async_run():
+    program, errors = inter.compile_program('n = 0;\nwhile (n < 1000000000) n += 1;\n')
+    assert not errors
+    # Making a checkpoint every 1000 iterations would take minutes
+    variables = asyncio.run(inter.run_async(program, timeout=10))
+    assert variables == {'n': 1000000000}
@@ -0,0 +1,32 @@
+import io
+
+import numpy as np
+
+import interpreter as inter
+
+
+def run(interpreter, text):
+    variables = interpreter.memory_stack.stack[0].variables
+    program, errors = inter.compile_program(text, dict(variables))
+    assert not errors
+    interpreter.visit(program)
+    return variables
+
+
+def test_float_matrix_updated_with_int_matrix_in_place():
+    interpreter = inter.Interpreter(output=io.StringIO())
+    variables = run(interpreter, 'B = ones(3, 3);\nA = B ./ B;\n')
+    target = variables['A']
+    run(interpreter, 'A += B;\n')
+    assert variables['A'] is target
+    assert np.array_equal(target, np.full((3, 3), 2.0))
+
+
+def test_int_matrix_divided_gets_new_float_matrix():
+    interpreter = inter.Interpreter(output=io.StringIO())
+    variables = run(interpreter, 'A = ones(2, 2);\n')
+    target = variables['A']
+    run(interpreter, 'A /= 2;\n')
+    assert variables['A'] is not target
+    assert variables['A'].dtype.kind == 'f'
+    assert np.array_equal(target, np.ones((2, 2)))
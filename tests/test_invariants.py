@@ -0,0 +1,67 @@
+import glob
+import os
+
+import pytest
+
+import interpreter as inter
+from interpreter.invariants import statements
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests5')
+
+PROGRAMS = {
+    'hoisted': 'A = ones(20, 20);\nB = eye(20);\nD = zeros(20, 20);\nn = 5;\ns = 0;\nfor i = 0:n {\n'
+               '    D = (A\' * B) .+ D;\n    for j = 0:30 {\n        s += n * 2 - 1 + j;\n    }\n}\n'
+               'print s, D[0, 0];\n',
+    # B shares data of A, so A' changes with B
+    'aliased': 'A = ones(3, 3);\nB = A;\nE = eye(3);\nfor i = 0:3 {\n    C = A\' .+ E;\n    B[0, 1] = i;\n'
+               '    print C;\n}\n',
+    # A is written in the loop, so A' is not invariant
+    'written': 'A = ones(3, 3);\nE = eye(3);\nfor i = 0:3 {\n    C = A\' .+ E;\n    A[0, 1] = i;\n    print C;\n}\n',
+    'written in while loop': 'A = ones(2, 2);\nk = 0;\nwhile (k < 3) {\n    print A\' .* A;\n    A[1, 0] += 1;\n'
+                             '    k += 1;\n}\n',
+    # Transposes bound to variables are views of cached values
+    'bound transpose': 'A = ones(2, 2);\nfor i = 0:3 {\n    C = (A .+ A)\';\n    C[0, 1] = i;\n    print C;\n}\n',
+    # Values bound to variables are new arrays
+    'bound value': 'A = ones(2, 2);\nfor i = 0:3 {\n    C = A .* A;\n    C += A;\n    print C;\n}\n',
+    # Loops which never run do not evaluate invariants
+    'no iterations': 'z = 0;\nfor i = 1:0 {\n    print 1 / z;\n}\nprint 1;\n',
+    # Invariants of inner loops are evaluated again in each run of them
+    'inner loop': 'x = 1;\nfor i = 0:3 {\n    x = i;\n    for j = 0:2 print x * 10 + j;\n}\n',
+    # While loops re-evaluate their conditions
+    'while condition': 'n = 3;\nk = 0;\nwhile (k < n * 2) {\n    k += 1;\n    print k + n * n;\n}\n',
+}
+for filename in sorted(glob.glob(os.path.join(EXAMPLES, '*.m'))):
+    with open(filename) as file:
+        PROGRAMS[os.path.basename(filename)] = file.read()
+
+
+def compile_program(text):
+    try:
+        program, errors = inter.compile_program(text)
+    except Exception:
+        # Type checker fails on some of the example programs
+        program, errors = None, True
+    if errors:
+        pytest.skip('program is not valid')
+    return program
+
+
+def count_invariants(program):
+    return sum(len(getattr(node, 'invariants', ())) for node in statements(program.instructions_opt))
+
+
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_same_output_without_hoisting(name):
+    program = compile_program(PROGRAMS[name])
+    hoisted = inter.run_program(program, hoist_invariants=True, processes=1)
+    assert hoisted.output == inter.run_program(program, hoist_invariants=False, processes=1).output
+
+
+def test_invariants_found():
+    # A' * B and n * 2 - 1
+    assert count_invariants(compile_program(PROGRAMS['hoisted'])) == 2
+
+
+@pytest.mark.parametrize('name', ['aliased', 'written', 'written in while loop'])
+def test_changed_operands_not_hoisted(name):
+    assert count_invariants(compile_program(PROGRAMS[name])) == 0
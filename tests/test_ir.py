@@ -0,0 +1,99 @@
+import io
+import os
+
+import pytest
+
+import interpreter as inter
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FILES = ['example0.m', 'fibonacci.m', 'pi.m', 'primes.m', 'sqrt.m', 'test.m', 'triangle.m']
+
+PROGRAMS = {
+    'break and continue': 'k = 0;\nfor i = 0:10 {\n    if (i == 2) continue;\n    if (i == 7) break;\n    k += i;\n}\n'
+                          'print k;\nj = 3;\nwhile (j > 0) {\n    j -= 1;\n    if (j == 1) continue;\n    print j;\n}\n',
+    'loop variable reused': 'for i = 0:3 print i;\nfor j = 3:0 print j;\nk = 0;\nfor i = 0:2 k += i;\nprint k;\n',
+    'branches leave loop': 'n = 0;\nwhile (n < 10) {\n    n += 1;\n    if (n > 3) break; else continue;\n    print n;\n}\n'
+                           'print n;\n',
+    'constant conditions': 'if (1 < 2) print 1; else print 2;\nx = 2 * 3 + 4;\nprint x, x * 2 + 1, -x;\n'
+                           'while (1 > 2) print 3;\n',
+    'common subexpressions': 'a = 3;\nb = a * a + 1;\nc = a * a + 1;\na += 1;\nd = a * a + 1;\nprint b, c, d;\n',
+    'dead code': 'a = 1;\nb = a + 2;\nb = 5;\nfor i = 1:3 c = 1 / i;\nprint b;\n',
+    'shared matrices': 'A = ones(3, 3);\nB = A;\nB[0, 1] = 5;\nA[1, 1] += 2;\nprint A;\nC = A\';\nC[2, 0] = 7;\n'
+                       'print A;\nD = [1, 2, 3];\nD[0, 1:3] = [7, 8];\nprint D, D[0, 2];\n',
+    'strings': 's = "abcdef";\nprint s[0, 1:3];\ns[1] = "X";\nprint s;\n',
+    'products': 'A = ones(2, 3);\nB = ones(3, 4);\nC = ones(4, 2);\nprint A * B * C, -(A .+ A) .* A;\n',
+    'parfor': 's = 0;\nM = zeros(4, 2);\nparfor i = 0:4 reduce s {\n    s += i * i;\n    M[i, 0] = i;\n}\n'
+              'print s, M;\n',
+    'return': 'x = 1;\nfor i = 0:5 {\n    x *= 2;\n    if (x > 4) return;\n}\nprint x;\n',
+    'error': 'x = 1;\nprint x;\nA = ones(2, 2);\nfor i = 0:4 {\n    print i;\n    A[i, 0] = 1;\n}\n',
+    'deep expression': 'a = 1;\nx = ' + ' + '.join(['a'] * 300) + ';\nprint x;\n',
+}
+
+
+def output(run):
+    """Returns what <run> prints, with the error which stopped it."""
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1)
+    try:
+        run(interpreter)
+    except inter.ProgramError as error:
+        return f'{interpreter.output.target.getvalue()}{error}\n'
+    except inter.exceptions.ReturnValueException:
+        pass
+    return interpreter.output.target.getvalue()
+
+
+def lower(text, passes):
+    program, errors = inter.compile_program(text)
+    assert not errors
+    # With verify every pass must leave a well formed function
+    return program, inter.PassManager(passes, verify=True).run(inter.lower_program(program))
+
+
+def assert_same_output(text, passes):
+    program, function = lower(text, passes)
+    expected = output(lambda interpreter: interpreter.visit(program))
+    assert output(lambda interpreter: inter.compile_function(function, interpreter).run()) == expected
+
+
+@pytest.mark.parametrize('passes', [[]] + [[name] for name in inter.DEFAULT_PASSES] + [None])
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_same_output_as_interpreter(name, passes):
+    assert_same_output(PROGRAMS[name], passes)
+
+
+@pytest.mark.parametrize('passes', [[], None])
+@pytest.mark.parametrize('filename', FILES)
+def test_example_same_output_as_interpreter(filename, passes):
+    with open(os.path.join(ROOT, 'tests5', filename)) as file:
+        assert_same_output(file.read(), passes)
+
+
+def opcodes(function):
+    return [value.opcode for value in function.values()]
+
+
+def test_passes_simplify():
+    _, unoptimized = lower(PROGRAMS['constant conditions'], [])
+    _, optimized = lower(PROGRAMS['constant conditions'], None)
+    assert 'binary' in opcodes(unoptimized) and 'branch' in opcodes(unoptimized)
+    assert 'binary' not in opcodes(optimized) and 'compare' not in opcodes(optimized)
+    assert len(optimized.blocks) < len(unoptimized.blocks)
+
+    _, unoptimized = lower(PROGRAMS['common subexpressions'], [])
+    _, optimized = lower(PROGRAMS['common subexpressions'], ['eliminate_common_subexpressions'])
+    assert opcodes(optimized).count('binary') < opcodes(unoptimized).count('binary')
+
+    _, optimized = lower(PROGRAMS['dead code'], None)
+    # Division may fail, so it stays even though its result is not used
+    assert [value.attribute for value in optimized.values() if value.opcode == 'binary'].count('/') == 1
+    assert 'b' not in [name for value in optimized.values() for name in value.names]
+
+
+def test_pass_manager_reports_passes():
+    manager = inter.PassManager(verify=True)
+    program, errors = inter.compile_program(PROGRAMS['constant conditions'])
+    assert not errors
+    manager.run(inter.lower_program(program))
+    assert [name for name, _, _ in manager.timings] == inter.DEFAULT_PASSES
+    assert manager.timings[0][2]
+    assert manager.report().splitlines()[-1].startswith('total')
@@ -0,0 +1,23 @@
+import asyncio
+
+import interpreter as inter
+
+
+def test_strings_returned_as_str():
+    result = inter.run_program('s = "ab";\ns = s + "cd";\nt = s[1:3];\nn = 1;\n')
+    assert result.ok
+    assert result.variables == {'s': 'abcd', 't': 'cd', 'n': 1}
+    assert all(type(result.variables[name]) is str for name in 'st')
+
+
+def test_strings_returned_as_str_by_async_run():
+    program, errors = inter.compile_program('s = "ab";\ns = s * 2;\n')
+    assert not errors
+    variables = asyncio.run(inter.run_async(program))
+    assert type(variables['s']) is str and variables['s'] == 'abab'
+
+
+def test_errors_reported():
+    result = inter.run_program('x = 1;\nx = y;\n')
+    assert not result.ok
+    assert result.variables == {}
@@ -0,0 +1,55 @@
+import io
+
+import numpy as np
+import pytest
+
+import interpreter as inter
+
+LITERAL = '[[1, 2], [3, 4]]'
+
+
+def run(text, **options):
+    program, errors = inter.compile_program(text)
+    assert not errors
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1, **options)
+    interpreter.visit(program)
+    return interpreter
+
+
+@pytest.mark.parametrize('tier_threshold', [None, 1])
+def test_literal_assigned_twice_not_shared(tier_threshold):
+    text = (f'A = zeros(2, 2);\nB = zeros(2, 2);\nfor i = 0:2 {{\n    C = {LITERAL};\n    if (i == 0) B = C;\n'
+            f'    A = C;\n}}\nA[0, 0] = 9;\nA += 1;\nD = {LITERAL};\nD[1, 1] *= 5;\n')
+    interpreter = run(text, tier_threshold=tier_threshold)
+    get = interpreter.memory_stack.get
+    np.testing.assert_array_equal(get('B'), [[1, 2], [3, 4]])
+    np.testing.assert_array_equal(get('A'), [[10, 3], [4, 5]])
+    np.testing.assert_array_equal(get('D'), [[1, 2], [3, 20]])
+    for template in interpreter.array_templates.values():
+        assert not template.flags.writeable
+        np.testing.assert_array_equal(template, [[1, 2], [3, 4]])
+
+
+def evaluated(program):
+    """Makes <program> evaluate all its array literals element by element."""
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, inter.ast.Array) and hasattr(node, 'values'):
+            del node.values
+        stack.extend(child for _, _, child in inter.deep_expressions.slots(node) if isinstance(child, inter.ast.Node))
+    return program
+
+
+def test_same_output_as_evaluated_literals():
+    text = ('for i = 0:3 {\n    A = [[1, 2], [3, 4]];\n    A[0, 0] += i;\n    B = A .+ [[1, 1], [1, 1]];\n'
+            '    print A, B;\n}\nF = [[-1.5, 2.0], [0.5, -1.0]];\nS = ["ab", "c"];\nprint F, S, [-1, -2];\n')
+    program, errors = inter.compile_program(text)
+    assert not errors
+    prebuilt = inter.Interpreter(output=io.StringIO(), processes=1)
+    prebuilt.visit(program)
+    assert len(prebuilt.array_templates) == 5
+    plain = inter.Interpreter(output=io.StringIO(), processes=1)
+    plain.visit(evaluated(program))
+    assert not plain.array_templates
+    assert prebuilt.output.target.getvalue() == plain.output.target.getvalue()
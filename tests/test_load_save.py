@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+
+import interpreter as inter
+
+MEMORY_CAP = 128 * 2 ** 20
+
+
+def test_round_trip(tmp_path):
+    first, second = tmp_path / 'first.npy', tmp_path / 'second.npy'
+    result = inter.run_program(f'A = [[1, 2, 3], [4, 5, 6]];\nsave("{first}", A);\nB = load("{first}");\n'
+                               f'B[0, 0] = 7;\nsave("{second}", B\');\nC = load("{first}");\n', processes=1)
+    assert result.ok, result.errors
+    np.testing.assert_array_equal(result.variables['C'], [[1, 2, 3], [4, 5, 6]])
+    np.testing.assert_array_equal(np.load(second), [[7, 4], [2, 5], [3, 6]])
+    # Loaded matrices are mapped, assignments to them are not written back
+    assert isinstance(result.variables['B'], np.memmap)
+
+
+def test_sparse_matrix_round_trip(tmp_path):
+    filename = tmp_path / 'eye.npy'
+    result = inter.run_program(f'A = eye(1000);\nA[3, 7] = 2;\nsave("{filename}", A);\nB = load("{filename}");\n'
+                               f'print B[3, 7], B[999, 999], B[7, 3];\n', sparse_size=10 ** 6, processes=1)
+    assert result.ok, result.errors
+    assert result.output == '2, 1, 0\n'
+
+
+def test_missing_file_reported(tmp_path):
+    result = inter.run_program(f'A = load("{tmp_path / "missing.npy"}");\n', processes=1)
+    assert [error.message.split(':')[0] for error in result.errors] == [f'Cannot load {tmp_path / "missing.npy"}']
+
+
+def test_matrix_larger_than_memory_cap(tmp_path, run_capped):
+    rows, cols = 4096, 8192
+    matrix = np.lib.format.open_memmap(tmp_path / 'matrix.npy', mode='w+', dtype=np.float64, shape=(rows, cols))
+    for start in range(0, rows, 256):
+        matrix[start:start + 256] = np.arange(start, start + 256)[:, None]
+    matrix.flush()
+    del matrix
+    text = (f'A = load("{tmp_path / "matrix.npy"}");\ns = 0.0;\nfor i = 0:{rows} s += A[i, 7];\nprint s;\n'
+            f'save("{tmp_path / "corner.npy"}", A[0:100, 0:100]);\n')
+
+    # Read-only mappings do not count to the data segment, unlike copy-on-write ones
+    child = run_capped(text, MEMORY_CAP, mmap_mode='r', processes=1)
+    assert child.returncode == 0, child.stderr
+    assert child.stdout == f'{float(sum(range(rows)))}\n'
+    corner = np.load(tmp_path / 'corner.npy')
+    assert corner.shape == (100, 100) and corner[99, 0] == 99
+
+    # Reading the whole matrix into memory fails
+    child = run_capped(text, MEMORY_CAP, mmap_mode=None, processes=1)
+    assert 'MemoryError' in child.stdout
+
+
+def test_save_to_loaded_file(tmp_path):
+    dense, sparse = tmp_path / 'dense.npy', tmp_path / 'sparse.npy'
+    np.save(dense, np.arange(6).reshape(2, 3))
+    np.save(sparse, np.ones((1000, 1000), dtype=int))
+    result = inter.run_program(f'B = load("{dense}");\nB[0, 0] = 7;\nsave("{dense}", B);\nprint B[1, 2];\n'
+                               f'C = load("{dense}");\nD = load("{sparse}");\nS = eye(1000);\nS[3, 7] = 2;\n'
+                               f'save("{sparse}", S);\nprint D[999, 0];\n', sparse_size=10 ** 6, processes=1)
+    assert result.ok, result.errors
+    # Matrices stay mapped from the replaced files
+    assert result.output == '5\n1\n'
+    np.testing.assert_array_equal(np.load(dense), [[7, 1, 2], [3, 4, 5]])
+    np.testing.assert_array_equal(result.variables['C'], [[7, 1, 2], [3, 4, 5]])
+    saved = np.load(sparse)
+    assert saved[3, 7] == 2 and saved.trace() == 1000 and saved.sum() == 1002
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['dense.npy', 'sparse.npy']
+
+
+def test_failed_save_reported(tmp_path):
+    filename = tmp_path / 'missing' / 'A.npy'
+    result = inter.run_program(f'A = ones(2, 2);\nsave("{filename}", A);\n', processes=1)
+    assert [error.message for error in result.errors] == \
+        [f"Cannot save {filename}: [Errno 2] No such file or directory: '{filename}.{os.getpid()}.tmp'"]
@@ -0,0 +1,40 @@
+import numpy as np
+
+import interpreter as inter
+
+MEMORY_CAP = 128 * 2 ** 20
+ELEMENT_WISE_SIZE = 4096
+PRODUCT_SIZE = 2048
+
+PROGRAM = f"""
+A = ones({ELEMENT_WISE_SIZE}, {ELEMENT_WISE_SIZE});
+B = A .+ A';
+B *= 3;
+C = -(B .- A);
+print C[{ELEMENT_WISE_SIZE - 1}, 0];
+D = ones({PRODUCT_SIZE}, {PRODUCT_SIZE});
+E = D * D';
+print E[0, {PRODUCT_SIZE - 1}];
+"""
+
+
+def test_tiled_results_same_as_in_memory_ones():
+    text = ('A = ones(300, 200);\nA[7, 3] = 5;\nB = A\' .+ A\';\nC = -(B .- A\');\nC += 1;\nD = A * B;\n'
+            'print C[3, 7], D[7, 7];\nprint D[0:2, 0:3];\n')
+    tiled = inter.run_program(text, dtype='float64', out_of_core_size=1000, processes=1)
+    in_memory = inter.run_program(text, dtype='float64', processes=1)
+    assert tiled.ok, tiled.errors
+    assert isinstance(tiled.variables['D'], np.memmap)
+    assert tiled.output == in_memory.output
+    for name in 'ABCD':
+        np.testing.assert_array_equal(tiled.variables[name], in_memory.variables[name])
+
+
+def test_matrices_larger_than_memory_cap(run_capped):
+    child = run_capped(PROGRAM, MEMORY_CAP, dtype='float64', out_of_core_size=2 ** 20, processes=1)
+    assert child.returncode == 0, child.stderr
+    assert child.stdout == f'-5.0\n{float(PRODUCT_SIZE)}\n'
+
+    # Without the out-of-core mode the matrices do not fit
+    child = run_capped(PROGRAM, MEMORY_CAP, dtype='float64', processes=1)
+    assert 'MemoryError' in child.stdout
@@ -0,0 +1,48 @@
+import io
+
+import numpy as np
+
+import interpreter as inter
+
+
+def compile_errors(text):
+    return [error.message for error in inter.compile_program(text, output=io.StringIO())[1]]
+
+
+def test_read_of_alias_of_sliced_array_rejected():
+    errors = compile_errors('A = ones(8, 1);\nB = A;\nparfor i = 1:8 {\n    A[i, 0] = B[i - 1, 0] + 1;\n}\n')
+    assert errors == ['B may share data with A, which is written in parfor loop']
+
+
+def test_alias_through_transpose_rejected():
+    errors = compile_errors('A = ones(8, 8);\nC = A\';\nparfor i = 0:8 {\n    A[i, 0] = C[0, i];\n}\n')
+    assert errors == ['C may share data with A, which is written in parfor loop']
+
+
+def test_sliced_array_updated():
+    result = inter.run_program('A = ones(8, 1);\nB = ones(8, 1);\nparfor i = 1:8 {\n'
+                               '    A[i, 0] = B[i - 1, 0] + i;\n}\n', processes=1)
+    assert not result.errors
+    np.testing.assert_array_equal(result.variables['A'][:, 0], [1, 2, 3, 4, 5, 6, 7, 8])
+
+
+def test_workers_get_interpreter_options():
+    interpreter = inter.Interpreter(dtype=float, sparse_size=64, parallel_size=128, out_of_core_size=256,
+                                    matrix_format='binary', counted_loops=False, tier_threshold=None, processes=4)
+    options = interpreter.worker_options()
+    assert options['workers'] == options['processes'] == 1
+    assert options['tier_threshold'] is None
+    worker = inter.Interpreter(**options)
+    for name in ['dtype', 'sparse_size', 'mmap_mode', 'order_products', 'hoist_invariants', 'counted_loops',
+                 'eliminate_range_checks']:
+        assert getattr(worker, name) == getattr(interpreter, name)
+    assert worker.tiled.threshold == 128 and worker.out_of_core.threshold == 256
+    assert worker.output.matrix_format == 'binary'
+
+
+def test_parfor_in_processes():
+    text = 's = 0;\nM = zeros(8, 1);\nparfor i = 0:8 reduce s {\n    s += i;\n    M[i, 0] = i * 0.5;\n}\n'
+    result = inter.run_program(text, dtype=float, processes=2)
+    assert not result.errors
+    assert result.variables['s'] == 28
+    np.testing.assert_array_equal(result.variables['M'][:, 0], np.arange(8) * 0.5)
@@ -0,0 +1,34 @@
+import operator as op
+
+import pytest
+
+from interpreter.rope import Rope
+
+
+def error(function, *operands):
+    with pytest.raises(TypeError) as info:
+        function(*operands)
+    return str(info.value)
+
+
+@pytest.mark.parametrize('function, operands', [
+    (op.add, ('abc', 1.5)),
+    (op.add, (1.5, 'abc')),
+    (op.mul, ('abc', 1.5)),
+    (op.mul, (1.5, 'abc')),
+    (op.lt, ('abc', 1)),
+])
+def test_failed_operations_report_strings(function, operands):
+    ropes = [Rope.from_str(operand) if isinstance(operand, str) else operand for operand in operands]
+    assert error(function, *ropes) == error(function, *operands)
+
+
+def test_reflected_comparison_reports_string():
+    assert 'Rope' not in error(op.ge, 1, Rope.from_str('abc'))
+
+
+def test_operations_on_ropes():
+    rope = Rope.from_str('ab')
+    assert str('x' + rope + 'y') == 'xaby'
+    assert str(rope * 3) == 'ababab'
+    assert rope < 'b' and rope >= 'ab' and rope == 'ab'
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from interpreter.shared import SharedMatrix
+
+
+@pytest.fixture(params=['shared memory', 'temporary file'])
+def publish(request, monkeypatch):
+    if request.param == 'temporary file':
+        monkeypatch.setattr(SharedMatrix, 'SHARED_MEMORY_DIR', None)
+    elif SharedMatrix.SHARED_MEMORY_DIR is None:
+        pytest.skip('no shared memory directory')
+    return SharedMatrix.publish
+
+
+def test_attached_matrices_share_data(publish):
+    handle = publish(np.arange(6).reshape(2, 3), mode='c')
+    try:
+        first, second = handle.attach(), handle.attach()
+        np.testing.assert_array_equal(first, [[0, 1, 2], [3, 4, 5]])
+        # Copy-on-write mappings do not see each other's changes
+        first[0, 0] = 7
+        assert second[0, 0] == 0
+    finally:
+        handle.unlink()
+
+
+def test_empty_matrix(publish):
+    handle = publish(np.zeros((0, 3)))
+    try:
+        assert handle.attach().shape == (0, 3)
+    finally:
+        handle.unlink()
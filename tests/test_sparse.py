@@ -0,0 +1,62 @@
+import io
+
+import numpy as np
+
+import interpreter as inter
+from interpreter.sparse import SparseMatrix
+
+
+def run(text, **options):
+    program, errors = inter.compile_program(text)
+    assert not errors
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1, **options)
+    interpreter.visit(program)
+    return interpreter
+
+
+def test_matrices_are_dense_by_default():
+    interpreter = run('A = zeros(1000, 1000);\n')
+    assert isinstance(interpreter.memory_stack.get('A'), np.ndarray)
+
+
+def test_sparse_matrix_printed_like_dense_one():
+    text = 'A = eye(1000);\nA[0, 999] = 7;\nA[500, 3] = 2;\nprint A;\nprint A[0:2, 0:5];\n'
+    sparse = run(text, sparse_size=10 ** 6).output.target.getvalue()
+    dense = run(text).output.target.getvalue()
+    assert sparse == dense
+
+
+def test_assignment_to_sparse_matrix_seen_by_aliases():
+    interpreter = run('S = zeros(1000, 1000);\nB = S;\nS[0:100, 0:1000] = ones(100, 1000);\n', sparse_size=10 ** 6)
+    assert interpreter.memory_stack.get('B') is interpreter.memory_stack.get('S')
+    assert interpreter.memory_stack.get('B')[99, 999] == 1
+
+
+def test_transpose_is_view():
+    matrix = SparseMatrix((2, 3))
+    transposed = matrix.T
+    transposed[2, 1] = 5
+    assert matrix[1, 2] == 5
+    assert transposed.T.elements is matrix.elements
+    np.testing.assert_array_equal(transposed.toarray(), matrix.toarray().T)
+
+
+def test_submatrix_is_view_like_dense_one():
+    text = ('A = zeros(1000, 1000);\nA[1, 1] = 5;\nB = A[0:2, 0:3];\nB[0, 0] = 42;\nB[1, 1] += 1;\nB[1, 2] = 7;\n'
+            'A[1, 0] = 3;\nprint A[0:3, 0:4];\nprint B;\n')
+    sparse = run(text, sparse_size=10 ** 6)
+    dense = run(text)
+    assert isinstance(sparse.memory_stack.get('B'), SparseMatrix)
+    assert sparse.output.target.getvalue() == dense.output.target.getvalue()
+    np.testing.assert_array_equal(dense.memory_stack.get('A')[0:2, 0:3], [[42, 0, 0], [3, 6, 7]])
+
+
+def test_views_of_views():
+    matrix = SparseMatrix((5, 6))
+    view = matrix[1:5, 2:6][1:3, 0:2].T
+    view[1, 0] = 9
+    assert matrix[2, 3] == 9
+    assert list(view.elements) == [(1, 0)] and (1, 0) in view.elements and (0, 1) not in view.elements
+    np.testing.assert_array_equal(view.toarray(), matrix.toarray()[1:5, 2:6][1:3, 0:2].T)
+    del view.elements[1, 0]
+    assert not matrix.elements
@@ -0,0 +1,86 @@
+import io
+
+import pytest
+
+import interpreter as inter
+from interpreter.exceptions import ReturnValueException
+
+PROGRAMS = {
+    # Variables changing type between runs of a compiled loop
+    'type change between runs': 'x = 1;\nfor k = 0:4 {\n    if (k == 2) x = 0.5;\n    s = 0;\n'
+                                '    for i = 0:20 s += x;\n    print s;\n}\n',
+    # and inside a run of it
+    'type change in loop': 'x = 1;\ns = 0;\nfor i = 0:50 {\n    if (i == 20) x = 0.5;\n    s += x;\n}\nprint s, x;\n',
+    'matrix type change': 'A = ones(2, 2);\nt = 0;\nfor i = 0:40 {\n    t += A[0, 0];\n'
+                          '    if (i == 15) A = [[0.25, 1.5], [2.5, 3.5]];\n}\nprint t;\n',
+    # Matrices written through other variables sharing their data
+    'aliased writes': 'A = zeros(3, 3);\nB = A;\ns = 0;\nfor i = 0:50 {\n    B[1, 1] += 1;\n    s += A[1, 1];\n}\n'
+                      'print s, A;\n',
+    'aliased transpose': 'A = zeros(2, 3);\nC = A\';\ns = 0;\nfor i = 0:30 {\n    A[0, 2] = i;\n    s += C[2, 0];\n}\n'
+                         'print s;\n',
+    # Errors inside compiled loops leave variables as they were before the statement
+    'index error': 's = 0;\nA = ones(2, 2);\nfor i = 0:50 {\n    s += i;\n    if (i > 30) t = A[0, i];\n}\n',
+    'division by zero': 'n = 10;\nx = 100;\nwhile (n > -5) {\n    n -= 1;\n    x /= n;\n}\n',
+    # Returns, breaks and continues
+    'return': 's = 0;\nfor i = 0:100 {\n    s += i;\n    if (s > 1000) return;\n}\nprint s;\n',
+    'break and continue in while': 'n = 0;\nm = 0;\nwhile (n < 500) {\n    n += 1;\n    if (n == 300) break;\n'
+                                   '    if (n > 100) continue;\n    m += n;\n}\nprint n, m;\n',
+    'break and continue in for': 's = 0;\nfor i = 0:100 {\n    if (i < 5) continue;\n    for j = 0:100 {\n'
+                                 '        if (j > i) break;\n        s += j;\n    }\n    if (s > 5000) break;\n}\n'
+                                 'print s;\n',
+    'nested break': 'c = 0;\nfor i = 0:30 {\n    j = 0;\n    while (j < 100) {\n        j += 1;\n'
+                    '        if (j == i) break;\n        c += 1;\n    }\n}\nprint c;\n',
+    # Loop invariants and counted loops inside compiled loops
+    'invariants': 'A = ones(3, 3);\nB = eye(3);\ns = 0;\nfor i = 0:100 {\n    C = A * B;\n    s += C[0, 0];\n}\n'
+                  'print s;\nn = 4;\nfor k = 0:5 {\n    t = 0;\n    for j = 0:50 t += n * 3 + A[1, 1] + k;\n'
+                  '    print t;\n}\n',
+    'counted loops': 'z = 0;\nfor k = 0:20 {\n    n = k;\n    while (n > 0) n -= 3;\n    m = 0;\n'
+                     '    while (m > 0) m -= 1 / z;\n    print n, m;\n}\n',
+    # Element assignments and strings inside compiled loops
+    'element assignments': 'A = zeros(20, 20);\nfor i = 0:20\n    for j = 0:20\n        A[i, j] = i * j + 1;\n'
+                           'print A[19, 19], A;\nw = "a";\nfor i = 0:30 {\n    w[0] = "b";\n    print w;\n}\n',
+}
+
+
+def run(program, threshold):
+    """Returns output of <program>, its global variables, error and number of
+    steps it executed, and the interpreter."""
+    interpreter = inter.Interpreter(output=io.StringIO(), processes=1, tier_threshold=threshold)
+    steps = [0]
+    step = interpreter.step
+
+    def counted_step(count=1):
+        steps[0] += count
+        step(count)
+
+    # Compiled loops count steps only when there is a checkpoint
+    interpreter.step = counted_step
+    interpreter.checkpoint = lambda: None
+    error = None
+    try:
+        interpreter.visit(program)
+    except inter.ProgramError as program_error:
+        error = program_error
+    except ReturnValueException:
+        pass
+    variables = {name: repr(value) for name, value in interpreter.memory_stack.stack[0].variables.items()}
+    return (interpreter.output.target.getvalue(), variables, repr(error), steps[0]), interpreter
+
+
+@pytest.mark.parametrize('threshold', [1, 3])
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_tiered_same_as_tree_walker(name, threshold):
+    program, errors = inter.compile_program(PROGRAMS[name])
+    assert not errors
+    tiered, interpreter = run(program, threshold)
+    assert interpreter.tiers.history
+    assert tiered == run(program, None)[0]
+
+
+def test_deoptimized_when_types_change():
+    program, errors = inter.compile_program(PROGRAMS['type change between runs'])
+    assert not errors
+    _, interpreter = run(program, 3)
+    inner = [code for code in interpreter.tiers.history if code.node.lineno == 5]
+    # Compiled for integers, then for floats
+    assert len(inner) == 2 and inner[0].deoptimizations == 1